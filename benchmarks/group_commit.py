@@ -0,0 +1,96 @@
+"""
+Webhooks/sec with the group commit writer on and off.
+
+    python -m benchmarks.group_commit [threads] [webhooks per thread]
+
+Uses a temporary SQLite database unless DATABASE_URL_SQLALCHEMY is set.
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+if "DATABASE_URL_SQLALCHEMY" not in os.environ:
+    DB_FILE = os.path.join(tempfile.mkdtemp(), "bench.db")
+    os.environ["DATABASE_URL_SQLALCHEMY"] = "sqlite:///" + DB_FILE
+
+from app import app
+from db import db
+from security import talisman
+import services.models.signals as signals
+from services.models.signals import SignalModel
+from services.models.tickers import TickerModel
+from services.models.group_commit import SIGNAL_WRITER
+
+THREADS = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+WEBHOOKS = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+BODY = {
+    "passphrase": "webhook",
+    "ticker": "BENCH",
+    "order_action": "buy",
+    "order_contracts": 100,
+    "order_price": 1.5,
+    "mar_pos": "long",
+    "mar_pos_size": 100,
+    "pre_mar_pos": "flat",
+    "pre_mar_pos_size": 0,
+}
+
+
+def post_webhooks(errors):
+
+    client = app.test_client()
+    for _ in range(WEBHOOKS):
+        response = client.post("/v4/webhook", json=BODY)
+        if response.status_code >= 300:
+            errors.append(response.status_code)
+
+
+def run(group_commit: bool) -> float:
+
+    signals.GROUP_COMMIT = group_commit
+    commits = SIGNAL_WRITER.commits
+    errors = []
+
+    threads = [
+        threading.Thread(target=post_webhooks, args=(errors,)) for _ in range(THREADS)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    total = THREADS * WEBHOOKS
+    print(
+        "group commit {:3}: {:8.1f} webhooks/sec, {} commits, {} errors".format(
+            "on" if group_commit else "off",
+            total / elapsed,
+            SIGNAL_WRITER.commits - commits if group_commit else total,
+            len(errors),
+        )
+    )
+    return total / elapsed
+
+
+if __name__ == "__main__":
+    talisman.force_https = False
+
+    with app.app_context():
+        db.create_all()
+        if not TickerModel.find_by_symbol("BENCH"):
+            TickerModel("BENCH", "STK", "SMART", "NASDAQ", "USD", "LMT", 1, 0, 0, 0).insert()
+        db.session.remove()
+
+    # the first request runs the before_first_request handlers
+    app.test_client().get("/v4/signals/0")
+
+    print("{} threads x {} webhooks".format(THREADS, WEBHOOKS))
+    run(False)
+    run(True)
+
+    with app.app_context():
+        print("signals:", SignalModel.query.count())
@@ -0,0 +1,103 @@
+"""
+Serialization throughput of the signal lists: model instances & json()
+against the row tuples & the list encoder.
+
+    python -m benchmarks.list_serialization [signals]
+
+Uses a temporary SQLite database unless DATABASE_URL_SQLALCHEMY is set.
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+if "DATABASE_URL_SQLALCHEMY" not in os.environ:
+    DB_FILE = os.path.join(tempfile.mkdtemp(), "bench.db")
+    os.environ["DATABASE_URL_SQLALCHEMY"] = "sqlite:///" + DB_FILE
+
+from app import app
+from db import db
+from services.models.signals import SignalModel, JSON_ROWS
+from services.resources import encoder
+
+SIGNALS = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+REPEAT = 3
+
+
+def create_signals() -> None:
+
+    db.create_all()
+    db.session.query(SignalModel).delete()
+    db.session.bulk_insert_mappings(
+        SignalModel,
+        [
+            {
+                "ticker": "NYSE:LNT-1.25*NYSE:FTS",
+                "order_action": "buy" if index % 2 else "sell",
+                "order_contracts": 100,
+                "order_price": 1.5,
+                "mar_pos": "long",
+                "mar_pos_size": 100,
+                "pre_mar_pos": "flat",
+                "pre_mar_pos_size": 0,
+                "order_comment": "bench",
+                "order_status": "filled",
+                "ticker_type": "pair",
+                "ticker1": "LNT",
+                "ticker2": "FTS",
+                "hedge_param": 1.25,
+                "order_id1": index,
+                "order_id2": index + 1,
+                "price1": 50.25,
+                "price2": 40.125,
+                "fill_price": 0.09375,
+                "slip": 0.001,
+            }
+            for index in range(SIGNALS)
+        ],
+    )
+    db.session.commit()
+
+
+def instances() -> str:
+
+    items = SignalModel.get_rows("0").all()
+    return json.dumps({"signals": [item.json() for item in items]})
+
+
+def row_tuples() -> str:
+
+    rows = SignalModel.get_rows("0", rows=True).all()
+    return encoder.dumps({"signals": [JSON_ROWS.json(row) for row in rows]})
+
+
+def measure(label, function) -> None:
+
+    best = None
+    for _ in range(REPEAT):
+        db.session.remove()  # no instances left in the identity map
+        start = time.perf_counter()
+        body = function()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+
+    print(
+        "{:28}: {:8.1f} ms, {:9.0f} signals/sec, {:6.0f} kB".format(
+            label, best * 1000, SIGNALS / best, len(body) / 1024
+        )
+    )
+
+
+if __name__ == "__main__":
+    with app.app_context():
+        create_signals()
+
+        print("{} signals, orjson installed: {}".format(SIGNALS, encoder.orjson is not None))
+        encoder.ORJSON = False
+        measure("instances + json()", instances)
+        measure("row tuples + json module", row_tuples)
+
+        if encoder.orjson is not None:
+            encoder.ORJSON = True
+            measure("row tuples + orjson", row_tuples)
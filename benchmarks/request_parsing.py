@@ -0,0 +1,53 @@
+"""
+Per-request parse cost of reqparse and the compiled schemas.
+
+    python -m benchmarks.request_parsing [iterations]
+"""
+import sys
+import timeit
+
+from app import app
+from services.resources.signals import SignalWebhook, SignalUpdateOrder
+
+ITERATIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+
+WEBHOOK = {
+    "passphrase": "webhook",
+    "timestamp": "2022-01-03 09:30:00",
+    "ticker": "NYSE:LNT-1.25*NYSE:FTS",
+    "order_action": "buy",
+    "order_contracts": 100,
+    "order_price": 1.5,
+    "mar_pos": "long",
+    "mar_pos_size": 100,
+    "pre_mar_pos": "flat",
+    "pre_mar_pos_size": 0,
+}
+
+ORDER = {
+    "passphrase": "webhook",
+    "order_id": 12,
+    "symbol": "LNT",
+    "price": 10.5,
+    "filled_qty": 100,
+}
+
+
+def measure(name, resource, body):
+
+    with app.test_request_context("/", method="POST", json=body):
+        for label, parse in (
+            ("reqparse", resource.parser.parse_args),
+            ("schema", resource.schema.parse),
+        ):
+            seconds = min(timeit.repeat(parse, number=ITERATIONS, repeat=3))
+            print(
+                "{:18} {:8}: {:7.2f} us/request".format(
+                    name, label, seconds / ITERATIONS * 1e6
+                )
+            )
+
+
+if __name__ == "__main__":
+    measure("SignalWebhook", SignalWebhook, WEBHOOK)
+    measure("SignalUpdateOrder", SignalUpdateOrder, ORDER)
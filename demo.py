@@ -4,11 +4,12 @@ Routes and functions used for the frontend demo
 import os
 from app import app, configs
 from flask import render_template, request, flash, redirect, url_for
-from services.models.signals import SignalModel
+from services.models.signals import SignalModel, ORDER_BOOK
 from services.models.tickers import TickerModel
 from services.models.account import AccountModel
 from services.models.pairs import PairModel
 from services.models.session import SessionModel
+from services.models.changes import ChangeModel
 from datetime import datetime
 from datetime import timedelta
 import pytz
@@ -45,10 +46,8 @@ def dashboard():
 
     access_token = request.cookies.get("access_token")
 
-    SessionModel.delete_expired()  # clean expired session data
-
     if access_token:
-        simplesession = SessionModel.find_by_value(access_token[-10:])
+        simplesession = SessionModel.find_active(access_token[-10:])
     else:
         simplesession = None
 
@@ -132,10 +131,8 @@ def dashboard_list():
 
     access_token = request.cookies.get("access_token")
 
-    SessionModel.delete_expired()  # clean expired session data
-
     if access_token:
-        simplesession = SessionModel.find_by_value(access_token[-10:])
+        simplesession = SessionModel.find_active(access_token[-10:])
     else:
         simplesession = None
 
@@ -216,10 +213,8 @@ def positions():
 
     access_token = request.cookies.get("access_token")
 
-    SessionModel.delete_expired()  # clean expired session data
-
     if access_token:
-        simplesession = SessionModel.find_by_value(access_token[-10:])
+        simplesession = SessionModel.find_active(access_token[-10:])
     else:
         simplesession = None
 
@@ -310,10 +305,8 @@ def positions():
 def watchlist():
     access_token = request.cookies.get("access_token")
 
-    SessionModel.delete_expired()  # clean expired session data
-
     if access_token:
-        simplesession = SessionModel.find_by_value(access_token[-10:])
+        simplesession = SessionModel.find_active(access_token[-10:])
     else:
         simplesession = None
 
@@ -668,6 +661,37 @@ def calculate_watchlist():
             print(e)
 
 
+def prune_changes():
+    with app.app_context():  # being executed outside the app context
+        try:
+            print("***Changes pruned:", ChangeModel.prune())
+        except Exception as e:
+            print("***Changes prune Err***")
+            print(e)
+
+
+def sweep_sessions():
+    with app.app_context():  # being executed outside the app context
+        try:
+            print("***Sessions swept:", SessionModel.delete_expired())
+        except Exception as e:
+            print("***Session sweep Err***")
+            print(e)
+
+
+def check_order_book():
+    with app.app_context():  # being executed outside the app context
+        try:
+            problems = ORDER_BOOK.check()
+            if problems:
+                print("***Order book differs, loading again***")
+                print("\n".join(problems))
+                ORDER_BOOK.reset()
+        except Exception as e:
+            print("***Order book check Err***")
+            print(e)
+
+
 # scheduler for email notifications and sma calculation below
 
 from apscheduler.schedulers.background import BackgroundScheduler
@@ -695,4 +719,25 @@ def init_scheduler():
             minutes=int(configs.get("SMA", "SMA_CALC_PERIOD")),
         )
 
+    # Prune the change log kept for the event streams & the signal changes
+    scheduler.add_job(
+        prune_changes,
+        "interval",
+        minutes=configs.getint("EVENTS", "PRUNE_PERIOD_MIN", fallback=60),
+    )
+
+    # Delete the expired sessions, the pages only check their expiry
+    scheduler.add_job(
+        sweep_sessions,
+        "interval",
+        minutes=configs.getint("CACHE", "SESSION_SWEEP_PERIOD_MIN", fallback=10),
+    )
+
+    # Compare the in-memory order book with the signals table
+    scheduler.add_job(
+        check_order_book,
+        "interval",
+        minutes=configs.getint("EVENTS", "BOOK_CHECK_PERIOD_MIN", fallback=60),
+    )
+
     scheduler.start()
@@ -12,9 +12,52 @@ from jwt import ExpiredSignatureError
 def create_tables():
     from app import db
     from services.resources.users import UserRegister
+    from services.models.signals import SignalModel, ORDER_BOOK
+    from services.models.migrations import run_migrations
+    from services.models.slip_rollups import SlipRollupModel
 
     db.create_all()
+    run_migrations()  # changes of the existing tables
     UserRegister.default_users()
+    SignalModel.backfill_legs()
+    SlipRollupModel.backfill()
+    ORDER_BOOK.sync()  # active signals read once, then from the change log
+
+
+# Rebuild the slip rollups from the signals table: flask backfill-rollups
+@app.cli.command("backfill-rollups")
+def backfill_rollups():
+    from app import db
+    from services.models.slip_rollups import SlipRollupModel
+
+    db.create_all()
+    print("slip rollups rebuilt:", SlipRollupModel.rebuild())
+
+
+# Compare the order book with the active signals of the database: flask check-order-book
+@app.cli.command("check-order-book")
+def check_order_book():
+    import sys
+    from app import db
+    from services.models.signals import ORDER_BOOK
+
+    db.create_all()
+    problems = ORDER_BOOK.check()
+    for problem in problems:
+        print(problem)
+
+    if problems:
+        sys.exit(1)
+    print("order book consistent:", len(ORDER_BOOK.signals), "active signals")
+
+
+# Drain the webhooks queued before a restart
+@app.before_first_request
+def start_webhook_workers():
+    from services.resources.signals import WEBHOOK_ASYNC, webhook_workers
+
+    if WEBHOOK_ASYNC:
+        webhook_workers().start(app)
 
 
 # If necessary to check admin rights, is_admin can be used
@@ -6,10 +6,17 @@ from flask_restful import Api
 from services.resources.pairs import PairRegister, PairList, Pair
 from services.resources.signals import (
     SignalWebhook,
+    SignalWebhookBatch,
+    SignalReceipt,
     SignalUpdateOrder,
+    SignalUpdateOrderBatch,
+    SignalExecutions,
     SignalList,
     SignalListTicker,
     SignalListStatus,
+    SignalWaitingPoll,
+    SignalChanges,
+    SignalSlip,
     Signal,
 )
 from services.resources.tickers import TickerRegister, TickerUpdatePNL, TickerList, Ticker
@@ -22,13 +29,19 @@ from services.resources.users import (
     TokenRefresh,
 )
 from services.resources.account import PNLRegister, PNLList, PNL
+from services.resources.latency import Latency
+from services.resources.events import EventStream
 
 
 api = Api(app)
 
 
 api.add_resource(SignalWebhook, "/v4/webhook")
+api.add_resource(SignalWebhookBatch, "/v4/webhooks")
+api.add_resource(SignalReceipt, "/v4/webhook/receipt/<string:receipt>")
 api.add_resource(SignalUpdateOrder, "/v4/signal/order")
+api.add_resource(SignalUpdateOrderBatch, "/v4/signal/orders")
+api.add_resource(SignalExecutions, "/v4/signal/executions/<string:rowid>")
 api.add_resource(SignalList, "/v4/signals/<string:number_of_items>")
 api.add_resource(
     SignalListStatus,
@@ -37,6 +50,9 @@ api.add_resource(
 api.add_resource(
     SignalListTicker, "/v4/signals/ticker/<string:ticker_name>/<string:number_of_items>"
 )
+api.add_resource(SignalSlip, "/v4/signals/slip/<string:ticker_name>")
+api.add_resource(SignalWaitingPoll, "/v4/signals/waiting/poll")
+api.add_resource(SignalChanges, "/v4/signals/changes")
 api.add_resource(Signal, "/v4/signal/<string:rowid>")
 
 api.add_resource(PairRegister, "/v4/pair")
@@ -58,3 +74,7 @@ api.add_resource(TokenRefresh, "/v4/refresh")
 api.add_resource(PNLRegister, "/v4/pnl")
 api.add_resource(PNLList, "/v4/pnls/<string:number_of_items>")
 api.add_resource(PNL, "/v4/pnl/<string:rowid>")
+
+api.add_resource(Latency, "/v4/stats/latency")
+
+api.add_resource(EventStream, "/v4/events")
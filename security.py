@@ -28,7 +28,9 @@ csrf = SeaSurf(app)
 # these routes are to be reached from external sources with a passphrase
 csrf._exempt_urls = (
     "/v4/webhook",
+    "/v4/webhooks",
     "/v4/signal/order",
+    "/v4/signal/orders",
     "/v4/ticker/pnl",
 )
 
@@ -2,7 +2,12 @@
 import re
 from typing import Dict, List  # for type hinting
 from db import db
+from services.models.updates import update_row
+from services.models.rows import JSONRows
+from services.models.changes import ChangeModel, loaded_json
 from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
 from sqlalchemy.sql import (
     func,
 )  # 'sqlalchemy' is being installed together with 'flask-sqlalchemy'
@@ -10,6 +15,22 @@ from sqlalchemy.sql import (
 
 AccountJSON = Dict[str, float]  # custom type hint
 
+# columns written by update()
+UPDATE_FIELDS = (
+    "timestamp",
+    "AvailableFunds",
+    "BuyingPower",
+    "DailyPnL",
+    "GrossPositionValue",
+    "MaintMarginReq",
+    "NetLiquidation",
+    "RealizedPnL",
+    "UnrealizedPnL",
+)
+
+# keys of json()
+JSON_FIELDS = ("rowid",) + UPDATE_FIELDS
+
 
 class AccountModel(db.Model):
     __tablename__ = "account"
@@ -79,30 +100,36 @@ class AccountModel(db.Model):
 
     def update(self, rowid) -> None:
 
-        item_to_update = self.query.filter_by(rowid=rowid).first()
-
-        item_to_update.timestamp = self.timestamp
-        item_to_update.AvailableFunds = self.AvailableFunds
-        item_to_update.BuyingPower = self.BuyingPower
-        item_to_update.DailyPnL = self.DailyPnL
-        item_to_update.GrossPositionValue = self.GrossPositionValue
-        item_to_update.MaintMarginReq = self.MaintMarginReq
-        item_to_update.NetLiquidation = self.NetLiquidation
-        item_to_update.RealizedPnL = self.RealizedPnL
-        item_to_update.UnrealizedPnL = self.UnrealizedPnL
-
+        update_row(self, "rowid", rowid, UPDATE_FIELDS)
         db.session.commit()
 
     @classmethod
-    def get_rows(cls, number_of_items) -> List:
+    def get_rows(cls, number_of_items, before: int = None, rows: bool = False) -> List:
+        query = cls.query if before is None else cls.query.filter(cls.rowid < before)
+        query = JSON_ROWS.project(query, rows=rows)
 
         if number_of_items == "0":
             # return cls.query.order_by(desc("rowid")).all() # needs from sqlalchemy import desc
-            return cls.query.order_by(cls.rowid.desc())  # better, no need to import
+            return query.order_by(cls.rowid.desc())  # better, no need to import
         else:
-            return cls.query.order_by(cls.rowid.desc()).limit(number_of_items)
+            return query.order_by(cls.rowid.desc()).limit(number_of_items)
 
     def delete(self) -> None:
 
         db.session.delete(self)
         db.session.commit()
+
+
+# row tuples of the list resources, mapped to the json() dicts
+JSON_ROWS = JSONRows(AccountModel, JSON_FIELDS, {"timestamp": str})
+
+
+# Change log: new PNL records, see services/models/changes.py
+
+
+@event.listens_for(AccountModel, "after_insert")
+def _log_insert(mapper, connection, target):
+
+    ChangeModel.record(
+        object_session(target), "pnl", "insert", loaded_json(target, JSON_ROWS)
+    )
@@ -0,0 +1,183 @@
+"""
+Change log of the signals, ticker PNLs & account PNLs
+(see /v4/events & /v4/signals/changes)
+
+A row is inserted for each inserted, updated or deleted signal, ticker PNL
+update and account PNL record, in the flush (or bulk update) that makes
+the change, so it is committed or rolled back together with it. seq is
+the change sequence number, the event id of the Server-Sent Events.
+Rows older than RETENTION_HOURS are pruned, except the last one, which
+keeps the sequence & tells the too old 'since' values (see seq_range).
+
+The readers (event streams, /v4/signals/changes, the order book) keep the
+last seq they got and read the ones after it, so the changes have to be
+committed in seq order: a lower seq committed after a higher one was read
+would be skipped for good. The transactions writing the logged tables are
+serialized by lock_log() for that, from their first write to the commit.
+"""
+import json
+from datetime import datetime, timedelta
+from itertools import chain
+from typing import Dict, List, Tuple, Union  # for type hinting
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+
+from app import configs
+from db import db
+from services.models.table_stamps import mark_changed
+
+ChangeJSON = Dict[str, Union[str, int]]  # custom type hint
+
+# topics of the changes, in the order of the ?topics= argument
+TOPICS = ("signal", "ticker", "pnl")
+
+# hours to keep the changes, clients with an older sequence resync the lists
+RETENTION_HOURS = configs.getint("EVENTS", "RETENTION_HOURS", fallback=72)
+
+# tables with logged changes, their writers take the log lock first
+LOGGED_TABLES = ("signals", "tickers", "account")
+# PostgreSQL advisory lock of the change log writers
+LOG_LOCK_KEY = 7061697273
+
+
+def lock_log(session) -> None:
+    # serializes the transactions writing the change log until their commit or rollback,
+    # SQLite writers are serialized by the database lock already
+
+    transaction = session.get_transaction()
+    if transaction is not None and session.info.get("log_locked") is transaction:
+        return  # held by the transaction
+
+    connection = session.connection()
+    if connection.dialect.name == "postgresql":
+        connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": LOG_LOCK_KEY})
+
+    session.info["log_locked"] = session.get_transaction()
+
+
+class ChangeModel(db.Model):
+    __tablename__ = "changes"
+    # sequence numbers of the pruned rows are not reused
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    seq = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    timestamp = db.Column(db.DateTime(timezone=False))  # UTC, see prune()
+    topic = db.Column(db.String(20), nullable=False)  # one of TOPICS
+    event = db.Column(db.String(20), nullable=False)  # "insert", "update", "status", "delete"...
+    data = db.Column(db.Text)  # json of the item after the change
+
+    def __init__(self, topic: str, event: str, data: str):
+        self.topic = topic
+        self.event = event
+        self.data = data
+
+    def json(self) -> ChangeJSON:
+        return {
+            "seq": self.seq,
+            "timestamp": str(self.timestamp),
+            "topic": self.topic,
+            "event": self.event,
+            "data": self.data,
+        }
+
+    @classmethod
+    def record(cls, session, topic: str, event: str, item: dict) -> None:
+        # session: the one flushing the change (mapper events) or running the bulk update
+
+        lock_log(session)
+        session.connection().execute(
+            cls.__table__.insert().values(
+                timestamp=datetime.utcnow(),
+                topic=topic,
+                event=event,
+                data=json.dumps(item, default=str),
+            )
+        )
+        mark_changed(session, cls.__tablename__)
+
+    @classmethod
+    def get_after(cls, seq: int, topics=TOPICS, number_of_items: int = 100) -> List:
+        # (seq, topic, event, data) rows of the changes after seq, oldest first
+
+        return (
+            db.session.query(cls.seq, cls.topic, cls.event, cls.data)
+            .filter(cls.seq > seq, cls.topic.in_(topics))
+            .order_by(cls.seq)
+            .limit(number_of_items)
+            .all()
+        )
+
+    @classmethod
+    def last_seq(cls) -> int:
+
+        return db.session.query(func.max(cls.seq)).scalar() or 0
+
+    @classmethod
+    def seq_range(cls) -> Tuple[int, int]:
+        # (first, last) sequence numbers kept, (0, 0) if nothing was logged
+
+        first, last = db.session.query(func.min(cls.seq), func.max(cls.seq)).one()
+        return first or 0, last or 0
+
+    @classmethod
+    def prune(cls, hours: int = RETENTION_HOURS) -> int:
+
+        cutoff = datetime.utcnow() - timedelta(hours=hours)
+        last = cls.last_seq()
+
+        count = cls.query.filter(cls.timestamp < cutoff, cls.seq < last).delete(
+            synchronize_session=False
+        )
+        db.session.commit()
+
+        return count
+
+
+# Log lock: taken before the row locks of the flush or bulk update writing a logged table,
+# so that the writers wait for each other in one order
+
+
+@event.listens_for(Session, "before_flush")
+def _lock_log_flush(session, flush_context, instances):
+
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if obj.__tablename__ in LOGGED_TABLES:
+            lock_log(session)
+            return
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _lock_log_bulk(orm_execute_state):
+
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+
+    mapper = orm_execute_state.bind_mapper
+    if mapper and mapper.local_table.name in LOGGED_TABLES:
+        lock_log(orm_execute_state.session)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _release_log_lock(session, transaction):
+    # released by the database with the transaction, or with a rolled back savepoint
+
+    if transaction.parent is None or transaction.nested:
+        session.info.pop("log_locked", None)
+
+
+def loaded_json(target, json_rows) -> dict:
+    # json() of an item in a mapper event, with the loaded columns only:
+    # the expired ones (e.g. server defaults after an insert) would be selected in the flush
+
+    values = inspect(target).dict
+    item = {}
+
+    for key in json_rows.keys:
+        if key in values:
+            value = values[key]
+            format_value = json_rows.formats.get(key)
+            item[key] = format_value(value) if format_value else value
+
+    return item
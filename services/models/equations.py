@@ -0,0 +1,190 @@
+"""
+Memoized parser for the ticker equations sent by Tradingview webhooks
+e.g. "NYSE:LNT-1.25*NYSE:FTS"
+"""
+import re
+import threading
+from collections import OrderedDict, namedtuple
+
+from app import configs
+from services.models.registry import REGISTRY
+
+# hedge constant of a leg
+HEDGE_PATTERN = re.compile(r"[-+]?\d*\.\d+|\d+")
+
+EQUATION_CACHE_SIZE = configs.getint("CACHE", "EQUATION_CACHE_SIZE", fallback=1024)
+
+Leg = namedtuple(
+    "Leg",
+    [
+        "text",  # NYSE:FTS*1.25
+        "exchange",  # NYSE
+        "symbol",  # FTS (Tradingview format)
+        "hedges",  # ('1.25',)
+        "ib_symbol",  # FTS (Interactive Brokers format), "" if unknown
+        "known",  # ticker is registered
+        "currency_match",
+    ],
+)
+
+Equation = namedtuple(
+    "Equation",
+    [
+        "ticker_type",  # single, pair or None if not parsed
+        "legs",
+        "hedge_param",  # hedge constant of the 2nd leg
+        "success",
+        "currency_match",
+    ],
+)
+
+
+def _parse_leg(text: str) -> Leg:
+
+    hedges = tuple(HEDGE_PATTERN.findall(text))
+
+    if hedges:
+        text_clean = text.replace(hedges[0], "")
+    else:
+        text_clean = text
+
+    split = text_clean.replace("*", "").rsplit(":", maxsplit=1)
+    symbol = split[-1]
+    exchange = split[0] if len(split) == 2 else ""
+
+    ib_symbol = ""
+    currency_match = True
+
+    # check if the ticker security type is CASH or CRYPTO
+    item = REGISTRY.ticker(symbol)
+
+    if item:
+        # refer to test cases
+        if item.sectype == "CASH":
+            fx1 = symbol[0:3]  # get the first 3 char # USD
+            fx2 = symbol[-3:]  # get the last 3 char # CAD
+            ib_symbol = fx1 + "." + fx2
+            currency_match = fx2 == item.currency
+
+        elif item.sectype == "CRYPTO":
+            cry2 = symbol[-3:]  # get last 3 char
+            cry1 = symbol[0 : (len(symbol.replace(".", "")) - 3)]
+            ib_symbol = cry1 + "." + cry2
+            # TODO: improve validity check
+            # check if valid crypto pair, accepts only USD pairs
+            currency_match = cry2 == item.currency
+
+        elif "." in symbol:  # For Class A,B type tickers EXP: BF.A BF.B
+            ib_symbol = symbol.replace(".", " ")  # convert Tradingview -> IB format
+        else:
+            ib_symbol = "".join(char for char in symbol if char.isalnum())
+
+    return Leg(text, exchange, symbol, hedges, ib_symbol, bool(item), currency_match)
+
+
+def parse_equation(equation: str) -> Equation:
+
+    eq12 = equation.split("-")  # check if pair or single
+
+    if len(eq12) > 2:
+        return Equation(None, (), None, False, True)
+
+    legs = tuple(_parse_leg(text) for text in eq12)
+
+    success = all(leg.known and leg.currency_match for leg in legs)
+    currency_match = all(leg.currency_match for leg in legs)
+
+    # hedge constant is not expected for the 1st ticker
+    if legs[0].hedges:
+        success = False
+
+    if len(legs) == 1:
+        return Equation("single", legs, None, success, currency_match)
+
+    hedge_param = legs[1].hedges[0] if legs[1].hedges else 1
+
+    return Equation("pair", legs, hedge_param, success, currency_match)
+
+
+class EquationCache:
+    """
+    Bounded LRU cache of parsed equations.
+    Entries are dropped when the registry reports a change for one of their tickers.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._equations = OrderedDict()
+        self._by_symbol = {}  # symbol -> set of equations using it
+
+    def parse(self, equation: str) -> Equation:
+
+        REGISTRY.refresh()  # the changes of other workers
+
+        with self._lock:
+            parsed = self._equations.get(equation)
+            if parsed is not None:
+                self._equations.move_to_end(equation)
+                self.hits += 1
+                return parsed
+            self.misses += 1
+            generation = self._generation
+
+        parsed = parse_equation(equation)
+
+        with self._lock:
+            # do not keep what was parsed before an invalidation
+            if generation != self._generation:
+                return parsed
+
+            self._equations[equation] = parsed
+            for leg in parsed.legs:
+                self._by_symbol.setdefault(leg.symbol, set()).add(equation)
+            if len(self._equations) > self.maxsize:
+                self._discard(next(iter(self._equations)))
+
+        return parsed
+
+    def invalidate(self, symbols=None) -> None:
+
+        with self._lock:
+            self._generation += 1
+
+            if symbols is None:
+                self._equations.clear()
+                self._by_symbol.clear()
+                return
+
+            for symbol in symbols:
+                for equation in self._by_symbol.pop(symbol, ()):
+                    self._discard(equation)
+
+    def info(self) -> dict:
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._equations),
+            "maxsize": self.maxsize,
+        }
+
+    def _discard(self, equation) -> None:
+
+        parsed = self._equations.pop(equation, None)
+
+        if parsed:
+            for leg in parsed.legs:
+                equations = self._by_symbol.get(leg.symbol)
+                if equations:
+                    equations.discard(equation)
+                    if not equations:
+                        del self._by_symbol[leg.symbol]
+
+
+EQUATIONS = EquationCache(EQUATION_CACHE_SIZE)
+
+REGISTRY.add_listener(EQUATIONS.invalidate)
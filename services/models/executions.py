@@ -0,0 +1,58 @@
+from typing import Dict, List, Union  # for type hinting
+from db import db
+from sqlalchemy.sql import func
+
+ExecutionJSON = Dict[str, Union[str, float, int]]  # custom type hint
+
+
+class ExecutionModel(db.Model):
+    """
+    Append-only ledger of the executions of the signal legs.
+    An execution is the quantity filled since the previous order status update,
+    the running totals are kept on the signal (see SignalModel.add_execution).
+    """
+
+    __tablename__ = "executions"
+    __table_args__ = (db.Index("ix_executions_signal", "signal_rowid", "rowid"),)
+
+    rowid = db.Column(
+        db.Integer, primary_key=True, autoincrement=True
+    )  # using 'rowid' as the default key
+    timestamp = db.Column(
+        db.DateTime(timezone=False), server_default=func.current_timestamp()
+    )
+    signal_rowid = db.Column(db.Integer, nullable=False)
+    order_id = db.Column(db.Integer)
+    symbol = db.Column(db.String)
+    leg = db.Column(db.Integer)  # 1 or 2
+    qty = db.Column(db.Float)
+    price = db.Column(db.Float)
+
+    def __init__(
+        self, signal_rowid: int, order_id: int, symbol: str, leg: int, qty: float, price: float
+    ):
+        self.signal_rowid = signal_rowid
+        self.order_id = order_id
+        self.symbol = symbol
+        self.leg = leg
+        self.qty = qty
+        self.price = price
+
+    def json(self) -> ExecutionJSON:
+        return {
+            "rowid": self.rowid,
+            "timestamp": str(self.timestamp),
+            "signal_rowid": self.signal_rowid,
+            "order_id": self.order_id,
+            "symbol": self.symbol,
+            "leg": self.leg,
+            "qty": self.qty,
+            "price": self.price,
+        }
+
+    @classmethod
+    def find_by_signal(cls, signal_rowid) -> List["ExecutionModel"]:
+
+        return (
+            cls.query.filter_by(signal_rowid=signal_rowid).order_by(cls.rowid).all()
+        )
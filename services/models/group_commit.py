@@ -0,0 +1,203 @@
+"""
+Group commit for the signal inserts.
+Inserts arriving within a few milliseconds are written by a single writer
+thread in one transaction, so concurrent webhooks share one commit (one fsync on SQLite).
+A caller waits GROUP_COMMIT_TIMEOUT seconds at most, then inserts the signal
+itself if the writer has not taken it yet.
+"""
+import queue
+import threading
+import time
+
+from flask import current_app
+
+from db import db
+from app import configs
+from services.models.signal_keys import SignalKeyModel, RECENT_KEYS
+
+GROUP_COMMIT = configs.getboolean("WEBHOOK", "GROUP_COMMIT", fallback=False)
+# time to wait for more inserts after the first one
+GROUP_COMMIT_WINDOW_MS = configs.getfloat("WEBHOOK", "GROUP_COMMIT_WINDOW_MS", fallback=5)
+# maximum number of signals in one transaction
+GROUP_COMMIT_MAX = configs.getint("WEBHOOK", "GROUP_COMMIT_MAX", fallback=100)
+# seconds a caller waits for the writer
+GROUP_COMMIT_TIMEOUT = configs.getfloat("WEBHOOK", "GROUP_COMMIT_TIMEOUT", fallback=10)
+
+WRITER_ERR = "the signal writer did not answer in time."
+
+
+class PendingInsert:
+    """
+    A signal (and its idempotency key) waiting for the writer.
+    Either taken by the writer or cancelled by the caller, never both.
+    """
+
+    def __init__(self, item, key: str):
+        self.item = item
+        self.key = key
+        self.error = None
+        self._taken = False
+        self._cancelled = False
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+    def take(self) -> bool:
+        # by the writer, False if the caller gave up
+
+        with self._lock:
+            if not self._cancelled:
+                self._taken = True
+            return self._taken
+
+    def cancel(self) -> bool:
+        # by the caller, False if the writer is writing it
+
+        with self._lock:
+            if not self._taken:
+                self._cancelled = True
+            return self._cancelled
+
+    def wait(self, timeout: float = None) -> bool:
+        # False if not written within the timeout
+
+        if not self._done.wait(timeout):
+            return False
+        if self.error is not None:
+            raise self.error
+        return True
+
+    def finish(self, error: Exception = None) -> None:
+
+        with self._lock:
+            if self._done.is_set():
+                return  # the first result only
+            self.error = error
+            self._done.set()
+
+
+class GroupCommitWriter:
+    """
+    insert() hands a transient object to the writer thread and blocks until
+    it is committed. Each caller gets its own rowid, or its own exception:
+    if the group fails, the inserts are retried one by one.
+    """
+
+    def __init__(self, window_ms: float, max_size: int, timeout: float = GROUP_COMMIT_TIMEOUT):
+        self.window = window_ms / 1000
+        self.max_size = max_size
+        self.timeout = timeout
+        self.commits = 0
+        self._pending = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def insert(self, item, key: str = None) -> bool:
+        # False if the caller is to insert the item, the writer did not take it in time
+
+        self._start()
+
+        pending = PendingInsert(item, key)
+        self._pending.put(pending)
+        if pending.wait(self.timeout):
+            return True
+
+        if pending.cancel():
+            print("Writer error occurred - ", WRITER_ERR)
+            return False
+
+        # being written, may be committed later
+        raise TimeoutError(WRITER_ERR)
+
+    def _start(self) -> None:
+
+        with self._lock:
+            # also after an error that stopped the thread
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run,
+                    args=(current_app._get_current_object(),),
+                    name="signal-writer",
+                    daemon=True,
+                )
+                self._thread.start()
+
+    def _run(self, app) -> None:
+
+        with app.app_context():
+            # committed objects are handed back to other threads, do not expire them
+            session = db.create_scoped_session({"expire_on_commit": False})
+
+            while True:
+                group = []
+                try:
+                    self._collect(group)
+                    self._write_group(session, group)
+
+                except Exception as e:
+                    # the callers still waiting get the error, the writer goes on
+                    print("Writer error occurred - ", e)
+                    for pending in group:
+                        pending.finish(e)
+
+    def _collect(self, group) -> None:
+        # the inserts of one transaction, the cancelled ones are skipped
+
+        while not group:
+            pending = self._pending.get()
+            if pending.take():
+                group.append(pending)
+
+        deadline = time.monotonic() + self.window
+
+        while len(group) < self.max_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                pending = self._pending.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if pending.take():
+                group.append(pending)
+
+    def _write_group(self, session, group) -> None:
+
+        try:
+            self._write(session, group)
+        except Exception:
+            # find the failing inserts
+            for pending in group:
+                pending.item.rowid = None
+                try:
+                    self._write(session, [pending])
+                except Exception as e:
+                    pending.finish(e)
+        finally:
+            session.remove()
+
+    def _write(self, session, group) -> None:
+
+        try:
+            session.add_all(pending.item for pending in group)
+            if any(pending.key for pending in group):
+                session.flush()  # get the rowids
+                session.add_all(
+                    SignalKeyModel(pending.key, pending.item.rowid)
+                    for pending in group
+                    if pending.key
+                )
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+
+        self.commits += 1
+        session.expunge_all()
+
+        for pending in group:
+            if pending.key:
+                RECENT_KEYS.put(pending.key, pending.item.rowid)
+            pending.finish()
+
+
+SIGNAL_WRITER = GroupCommitWriter(GROUP_COMMIT_WINDOW_MS, GROUP_COMMIT_MAX)
@@ -0,0 +1,166 @@
+"""
+In-process latency histograms of the webhook & order fill stages
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+# linear sub-buckets per power of two, 2^8 keeps the relative error under 1%
+SUB_BUCKET_BITS = 8
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+HALF_BUCKETS = SUB_BUCKETS >> 1
+
+# timer of the request handled by the thread
+_current = threading.local()
+
+
+class Histogram:
+    """
+    HDR-style histogram of durations recorded in microseconds.
+    Values are counted in log-linear buckets, so recording is O(1)
+    and the memory does not grow with the number of samples.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = []
+        self.total = 0
+        self.max = 0
+
+    @staticmethod
+    def _index(value: int) -> int:
+
+        shift = value.bit_length() - SUB_BUCKET_BITS
+        if shift <= 0:
+            return value
+        return shift * HALF_BUCKETS + (value >> shift)
+
+    @staticmethod
+    def _highest(index: int) -> int:
+        # highest value counted in the bucket
+
+        if index < SUB_BUCKETS:
+            return index
+        shift = index // HALF_BUCKETS - 1
+        mantissa = index - shift * HALF_BUCKETS
+        return ((mantissa + 1) << shift) - 1
+
+    def record(self, seconds: float) -> None:
+
+        value = max(round(seconds * 1e6), 0)
+        index = self._index(value)
+
+        with self._lock:
+            if index >= len(self.counts):
+                self.counts.extend([0] * (index + 1 - len(self.counts)))
+            self.counts[index] += 1
+            self.total += 1
+            self.max = max(self.max, value)
+
+    def percentile(self, percent: float) -> int:
+        # in microseconds
+
+        with self._lock:
+            target = max(math.ceil(self.total * percent / 100), 1)
+            count = 0
+            for index, bucket in enumerate(self.counts):
+                count += bucket
+                if count >= target:
+                    return min(self._highest(index), self.max)
+        return 0
+
+    def json(self) -> dict:
+        # milliseconds
+
+        return {
+            "count": self.total,
+            "p50": self.percentile(50) / 1000,
+            "p95": self.percentile(95) / 1000,
+            "p99": self.percentile(99) / 1000,
+            "max": self.max / 1000,
+        }
+
+
+class LatencyStats:
+    """Histograms by endpoint and stage"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+
+    def histogram(self, name: str) -> Histogram:
+
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, Histogram())
+        return histogram
+
+    def json(self) -> dict:
+
+        return {
+            name: histogram.json()
+            for name, histogram in sorted(self._histograms.items())
+        }
+
+    def reset(self) -> None:
+
+        with self._lock:
+            self._histograms = {}
+
+
+LATENCY = LatencyStats()
+
+
+class StageTimer:
+    """Durations of the stages of one request"""
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.start = time.perf_counter()
+        self.stages = []  # (stage, seconds)
+
+    def add(self, name: str, seconds: float) -> None:
+
+        self.stages.append((name, seconds))
+
+    def finish(self) -> None:
+        # record the stages and the total duration
+
+        self.add("total", time.perf_counter() - self.start)
+
+        for name, seconds in self.stages:
+            LATENCY.histogram(self.endpoint + "." + name).record(seconds)
+
+    def server_timing(self) -> str:
+        # value of the Server-Timing header
+
+        return ", ".join(
+            "{};dur={:.3f}".format(name, seconds * 1000) for name, seconds in self.stages
+        )
+
+    def __enter__(self):
+        _current.timer = self
+        return self
+
+    def __exit__(self, *args):
+        _current.timer = None
+        self.finish()
+
+
+@contextmanager
+def stage(name: str):
+    # times a stage of the current request, does nothing outside of a timed request
+
+    timer = getattr(_current, "timer", None)
+
+    if timer is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(name, time.perf_counter() - start)
@@ -0,0 +1,170 @@
+"""
+Schema migrations of existing databases
+
+db.create_all() creates the missing tables only. Changes of the existing
+tables (columns, indexes) are listed here and applied once, in order, by
+run_migrations(). Applied versions are kept in the schema_migrations table.
+Each migration checks the schema first, so that it is a no-op on a database
+created from the current models. When two workers apply it at once, the
+loser fails on the record (IntegrityError) or on the schema change itself
+("duplicate column"), then finds the version recorded, or runs the
+migration once more, which sees the schema changed.
+"""
+from collections import namedtuple
+
+from sqlalchemy import inspect, select
+from sqlalchemy.exc import IntegrityError, OperationalError, ProgrammingError
+from sqlalchemy.sql import func
+
+from db import db
+
+Migration = namedtuple("Migration", ["version", "name", "upgrade"])
+
+
+class MigrationModel(db.Model):
+    __tablename__ = "schema_migrations"
+
+    rowid = db.Column(
+        db.Integer, primary_key=True, autoincrement=True
+    )  # using 'rowid' as the default key
+    version = db.Column(db.Integer, unique=True, nullable=False)
+    name = db.Column(db.String)
+    timestamp = db.Column(
+        db.DateTime(timezone=False), server_default=func.current_timestamp()
+    )
+
+    def __init__(self, version: int, name: str):
+        self.version = version
+        self.name = name
+
+    def json(self) -> dict:
+        return {
+            "version": self.version,
+            "name": self.name,
+            "timestamp": str(self.timestamp),
+        }
+
+
+def add_indexes(connection, table) -> None:
+    # creates the indexes of the model table missing from the database
+
+    for index in table.indexes:
+        index.create(bind=connection, checkfirst=True)
+
+
+def add_columns(connection, table, names) -> None:
+    # adds the model columns missing from the database table
+
+    existing = {column["name"] for column in inspect(connection).get_columns(table.name)}
+
+    for name in names:
+        if name in existing:
+            continue
+        column = table.c[name]
+        connection.exec_driver_sql(
+            "ALTER TABLE {} ADD COLUMN {} {}".format(
+                table.name,
+                connection.dialect.identifier_preparer.quote(name),
+                column.type.compile(dialect=connection.dialect),
+            )
+        )
+
+
+def _signal_indexes(connection) -> None:
+    from services.models.signals import SignalModel
+
+    add_indexes(connection, SignalModel.__table__)
+
+
+def _signal_fill_totals(connection) -> None:
+    from services.models.signals import SignalModel
+
+    add_columns(
+        connection,
+        SignalModel.__table__,
+        ("filled_qty1", "filled_qty2", "notional1", "notional2"),
+    )
+
+
+def _session_indexes(connection) -> None:
+    from services.models.session import SessionModel
+
+    add_indexes(connection, SessionModel.__table__)
+
+
+def _signal_key_orphans(connection) -> None:
+    # keys of the signals deleted before their keys were deleted with them
+    from services.models.signals import SignalModel
+    from services.models.signal_keys import SignalKeyModel
+
+    keys = SignalKeyModel.__table__
+    signals = SignalModel.__table__
+    connection.execute(
+        keys.delete().where(
+            ~select(signals.c.rowid).where(signals.c.rowid == keys.c.signal_rowid).exists()
+        )
+    )
+
+
+# append only, never renumber
+MIGRATIONS = (
+    Migration(1, "signal_indexes", _signal_indexes),
+    Migration(2, "signal_fill_totals", _signal_fill_totals),
+    Migration(3, "session_indexes", _session_indexes),
+    Migration(4, "signal_key_orphans", _signal_key_orphans),
+    Migration(5, "signal_timestamp_index", _signal_indexes),
+)
+
+
+def run_migrations(migrations=MIGRATIONS) -> list:
+    # applies the migrations not recorded yet, returns the applied versions
+
+    table = MigrationModel.__table__
+    table.create(bind=db.engine, checkfirst=True)
+
+    with db.engine.connect() as connection:
+        applied = {row.version for row in connection.execute(table.select())}
+
+    versions = []
+
+    for migration in sorted(migrations):
+        if migration.version in applied:
+            continue
+
+        try:
+            _apply(migration)
+        except IntegrityError:
+            continue  # applied by another worker
+        except (OperationalError, ProgrammingError) as e:
+            # e.g. "duplicate column": the same change made by another worker
+            if _recorded(migration.version):
+                continue
+            print("Migration error occurred, retrying - ", e)
+            try:
+                _apply(migration)  # the schema is checked again
+            except IntegrityError:
+                continue
+
+        versions.append(migration.version)
+
+    return versions
+
+
+def _apply(migration) -> None:
+
+    # the schema change & its record share the transaction where supported
+    with db.engine.begin() as connection:
+        migration.upgrade(connection)
+        connection.execute(
+            MigrationModel.__table__.insert(),
+            {"version": migration.version, "name": migration.name},
+        )
+
+
+def _recorded(version: int) -> bool:
+
+    table = MigrationModel.__table__
+    with db.engine.connect() as connection:
+        return connection.execute(
+            table.select().where(table.c.version == version)
+        ).first() is not None
@@ -0,0 +1,170 @@
+"""
+Change notifications for the long polls (/v4/signals/waiting/poll) & event streams (/v4/events)
+
+A waiting request sleeps on a condition instead of querying the database
+again and again. Commits of the worker notify the condition, commits of
+the other workers are seen through the table stamp, checked every
+CHECK_INTERVAL_MS with a stat() call.
+
+A waiting request holds a request thread of the worker (uwsgi 'threads',
+see uwsgi.ini). The long polls & the event streams share HELD_THREADS,
+which leaves SPARE_THREADS for the other requests, e.g. the webhooks that
+wake them up.
+"""
+import threading
+import time
+from typing import Optional  # for type hinting
+
+from app import configs
+from services.models.stamps import VersionStamp
+from services.models.table_stamps import TABLE_STAMPS, add_listener
+
+# how often the waiting requests check the stamp for the commits of other workers
+CHECK_INTERVAL = configs.getint("LONGPOLL", "CHECK_INTERVAL_MS", fallback=200) / 1000
+# requests allowed to wait at once in a worker, the others are answered right away
+MAX_WAITERS = configs.getint("LONGPOLL", "MAX_WAITERS", fallback=8)
+# request threads of a worker left to the other requests while polls & streams wait
+SPARE_THREADS = configs.getint("LONGPOLL", "SPARE_THREADS", fallback=2)
+
+
+def request_threads() -> Optional[int]:
+    # request threads of the uwsgi worker, None if not run by uwsgi (e.g. flask run)
+
+    try:
+        import uwsgi
+    except ImportError:
+        return None
+
+    value = uwsgi.opt.get("threads", 1)
+    if isinstance(value, list):
+        value = value[-1]  # the last one given
+    if isinstance(value, bytes):
+        value = value.decode()
+
+    try:
+        return max(int(value), 1)
+    except (TypeError, ValueError):
+        return 1
+
+
+def held_threads(threads: Optional[int]) -> Optional[int]:
+    # request threads the waiting requests may hold, None if not limited
+
+    if threads is None:
+        return None
+
+    return max(threads - SPARE_THREADS, 0)
+
+
+class ThreadBudget:
+    """
+    Request threads of the worker the waiting requests may hold at once.
+    acquire() does not block, it returns False when all of them are held.
+    """
+
+    def __init__(self, size: Optional[int]):
+        self.size = size  # None: not limited
+        self.held = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bool:
+
+        with self._lock:
+            if self.size is not None and self.held >= self.size:
+                return False
+            self.held += 1
+            return True
+
+    def release(self) -> None:
+
+        with self._lock:
+            self.held -= 1
+
+
+# shared by the long polls & the event streams of the worker
+HELD_THREADS = ThreadBudget(held_threads(request_threads()))
+
+
+class ChangeNotifier:
+    """
+    Wakes the requests waiting for a change of a table.
+    wait_for(check, timeout) calls check() (a query) once, then again after
+    each change, until it returns a non-empty result or the timeout ends.
+    The requests over max_waiters, or with no thread left in the budget,
+    get the result of the first check right away.
+    """
+
+    def __init__(
+        self, stamp: VersionStamp, max_waiters: int = MAX_WAITERS, budget: ThreadBudget = None
+    ):
+        self._condition = threading.Condition()
+        self._generation = 0  # local commits
+        self._stamp = stamp
+        self._max_waiters = max_waiters
+        self._budget = budget
+        self.waiters = 0
+
+    def notify(self) -> None:
+
+        with self._condition:
+            self._generation += 1
+            self._condition.notify_all()
+
+    def wait_for(self, check, timeout: float):
+
+        # read before the check, so a commit right after it is not missed
+        generation = self._generation
+        stamp = self._stamp.read()
+
+        result = check()
+        if result or timeout <= 0:
+            return result
+
+        with self._condition:
+            if self.waiters >= self._max_waiters:
+                return result
+            if self._budget is not None and not self._budget.acquire():
+                return result
+            self.waiters += 1
+
+        deadline = time.monotonic() + timeout
+        try:
+            while not result:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+
+                with self._condition:
+                    self._condition.wait_for(
+                        lambda: self._generation != generation,
+                        min(remaining, CHECK_INTERVAL),
+                    )
+                    changed_here = self._generation != generation
+                    generation = self._generation
+
+                # commits of the other workers
+                new_stamp = self._stamp.read()
+                if changed_here or new_stamp != stamp:
+                    stamp = new_stamp
+                    result = check()
+
+        finally:
+            with self._condition:
+                self.waiters -= 1
+                if self._budget is not None:
+                    self._budget.release()
+
+        return result
+
+
+# the waiting signals are read from the order book, synced with the change log
+SIGNAL_CHANGES = ChangeNotifier(TABLE_STAMPS["changes"], budget=HELD_THREADS)
+add_listener("changes", SIGNAL_CHANGES.notify)
+
+
+# event streams allowed at once in a worker (/v4/events), each holds a thread
+MAX_STREAMS = configs.getint("EVENTS", "MAX_STREAMS", fallback=4)
+
+# the streams are counted by the resource, all of them can wait
+CHANGE_EVENTS = ChangeNotifier(TABLE_STAMPS["changes"], MAX_STREAMS)
+add_listener("changes", CHANGE_EVENTS.notify)
@@ -0,0 +1,271 @@
+"""
+In-memory book of the active (not yet terminal) signals
+
+The waiting signal lists, the long poll & the email notifier (check_latest)
+select the signals by status, which reads the whole signals table. The book
+keeps the status, order ids & tickers of the active signals of the worker,
+so those queries read the rows of the listed rowids only, up to MAX_ROWIDS.
+The terminal error states are not kept, they would stay for good: those
+signals are selected by status (ix_signals_status).
+
+The book is loaded from the database on first use, then brought up to date
+from the change log (services/models/changes.py) when its last seq shows a
+commit, of this worker or another one, on any host: one primary key lookup,
+the stamp files of the host do not see the other hosts. It is loaded again
+when the changes it needs were pruned, or after a bulk delete of signals.
+The changes are committed in seq order (see lock_log), so none is skipped.
+"""
+import json
+import threading
+from collections import defaultdict, namedtuple
+from typing import List, Optional  # for type hinting
+
+from sqlalchemy import func, select
+
+from app import configs
+from db import db
+from services.models.changes import ChangeModel
+
+# signals the order updates & executions are still expected for
+ACTIVE_STATUSES = ("waiting", "rerouted", "part.filled")
+
+# rowids selected with an IN list at most (bind parameters), more are selected by status
+MAX_ROWIDS = configs.getint("EVENTS", "BOOK_MAX_ROWIDS", fallback=500)
+
+# columns of the signals kept in the book
+BookEntry = namedtuple(
+    "BookEntry", ["order_status", "order_id1", "order_id2", "ticker1", "ticker2"]
+)
+
+# changes read at once while syncing
+SYNC_BATCH = 1000
+
+
+def index_keys(entry: BookEntry) -> tuple:
+    # (order ids, tickers) a signal is found by
+
+    order_ids = [key for key in (entry.order_id1, entry.order_id2) if key is not None]
+    tickers = [key for key in (entry.ticker1, entry.ticker2) if key]
+    return order_ids, tickers
+
+
+class OrderBook:
+    """
+    Active signals by rowid, with the rowids by order id & by ticker.
+    The public methods sync the book first, all of them hold the lock.
+    """
+
+    def __init__(self, table):
+        # table: signals table
+
+        self.table = table
+        self._lock = threading.RLock()
+        self.seq = None  # last change applied, None until loaded
+        self.signals = {}
+        self.by_order_id = defaultdict(set)
+        self.by_ticker = defaultdict(set)
+
+    def reset(self) -> None:
+        # loaded again on next use
+
+        with self._lock:
+            self.seq = None
+
+    def sync(self) -> None:
+
+        changes = ChangeModel.__table__
+
+        with self._lock:
+            # a connection of its own: the changes committed only
+            with db.engine.connect() as connection:
+                # read before the changes, so a commit right after them is not missed
+                last = connection.execute(select(func.max(changes.c.seq))).scalar() or 0
+                if self.seq == last:
+                    return
+
+                if self.seq is None or self.seq > last or not self._apply_changes(connection):
+                    self._load(connection)
+                else:
+                    self.seq = max(self.seq, last)  # the changes of the other topics
+
+    def latest(self, statuses) -> Optional[int]:
+        # rowid of the most recent signal with one of the statuses
+
+        with self._lock:
+            self.sync()
+            return max(
+                (
+                    rowid
+                    for rowid, entry in self.signals.items()
+                    if entry.order_status in statuses
+                ),
+                default=None,
+            )
+
+    def rowids(self, statuses, before: int = None, after: int = None) -> List[int]:
+        # rowids of the signals with one of the statuses, most recent first
+
+        with self._lock:
+            self.sync()
+            return sorted(
+                (
+                    rowid
+                    for rowid, entry in self.signals.items()
+                    if entry.order_status in statuses
+                    and (before is None or rowid < before)
+                    and (after is None or rowid > after)
+                ),
+                reverse=True,
+            )
+
+    def find(self, order_id, ticker: str = None) -> List[int]:
+        # rowids of the active signals with the order id (& ticker), most recent first
+
+        with self._lock:
+            self.sync()
+            rowids = self.by_order_id.get(order_id, set())
+            if ticker is not None:
+                rowids = rowids & self.by_ticker.get(ticker, set())
+            return sorted(rowids, reverse=True)
+
+    def check(self) -> List[str]:
+        # differences between the book and the database, empty if consistent
+
+        with self._lock:
+            problems = self._compare()
+            if problems:
+                # once more, a commit may come between the sync & the read
+                problems = self._compare()
+
+            return problems
+
+    def _compare(self) -> List[str]:
+
+        self.sync()
+        with db.engine.connect() as connection:
+            expected = self._read_active(connection)
+
+        problems = []
+        for rowid in sorted(set(self.signals) | set(expected)):
+            if self.signals.get(rowid) != expected.get(rowid):
+                problems.append(
+                    "signal {}: book {}, database {}".format(
+                        rowid, self.signals.get(rowid), expected.get(rowid)
+                    )
+                )
+
+        by_order_id, by_ticker = self._index(self.signals)
+        if by_order_id != {key: ids for key, ids in self.by_order_id.items() if ids}:
+            problems.append("order id map differs from the signals of the book")
+        if by_ticker != {key: ids for key, ids in self.by_ticker.items() if ids}:
+            problems.append("ticker map differs from the signals of the book")
+
+        return problems
+
+    def _read_active(self, connection) -> dict:
+
+        columns = [self.table.c[field] for field in BookEntry._fields]
+        result = connection.execute(
+            select(self.table.c.rowid, *columns).where(
+                self.table.c.order_status.in_(ACTIVE_STATUSES)
+            )
+        )
+        return {row[0]: BookEntry(*row[1:]) for row in result}
+
+    def _load(self, connection) -> None:
+
+        changes = ChangeModel.__table__
+        # read first: the changes committed while loading are applied again
+        seq = connection.execute(select(func.max(changes.c.seq))).scalar() or 0
+
+        self.signals = {}
+        self.by_order_id.clear()
+        self.by_ticker.clear()
+        for rowid, entry in self._read_active(connection).items():
+            self._add(rowid, entry)
+
+        self.seq = seq
+
+    def _apply_changes(self, connection) -> bool:
+        # applies the signal changes after seq, False if the book is to be loaded
+
+        changes = ChangeModel.__table__
+        start = self.seq
+
+        while True:
+            rows = connection.execute(
+                select(changes.c.seq, changes.c.event, changes.c.data)
+                .where((changes.c.seq > self.seq) & (changes.c.topic == "signal"))
+                .order_by(changes.c.seq)
+                .limit(SYNC_BATCH)
+            ).all()
+
+            for row in rows:
+                if not self._apply(row.event, json.loads(row.data)):
+                    return False
+                self.seq = row.seq
+
+            if len(rows) < SYNC_BATCH:
+                break
+
+        # read after the changes: the ones pruned before start or another database
+        first, last = connection.execute(
+            select(func.min(changes.c.seq), func.max(changes.c.seq))
+        ).one()
+        return (first or 0) - 1 <= start <= (last or 0)
+
+    def _apply(self, event: str, item: dict) -> bool:
+        # False if the change cannot be applied (bulk delete, missing columns)
+
+        if event == "reset":
+            return False
+
+        rowid = item["rowid"]
+        entry = self.signals.get(rowid)
+        if entry:
+            self._remove(rowid)
+
+        if event == "delete":
+            return True
+
+        values = entry._asdict() if entry else {}
+        values.update((field, item[field]) for field in BookEntry._fields if field in item)
+
+        if values.get("order_status") not in ACTIVE_STATUSES:
+            return True
+        if len(values) < len(BookEntry._fields):
+            return False
+
+        self._add(rowid, BookEntry(**values))
+        return True
+
+    def _add(self, rowid: int, entry: BookEntry) -> None:
+
+        self.signals[rowid] = entry
+        order_ids, tickers = index_keys(entry)
+        for order_id in order_ids:
+            self.by_order_id[order_id].add(rowid)
+        for ticker in tickers:
+            self.by_ticker[ticker].add(rowid)
+
+    def _remove(self, rowid: int) -> None:
+
+        order_ids, tickers = index_keys(self.signals.pop(rowid))
+        for order_id in order_ids:
+            self.by_order_id[order_id].discard(rowid)
+        for ticker in tickers:
+            self.by_ticker[ticker].discard(rowid)
+
+    @staticmethod
+    def _index(signals) -> tuple:
+
+        by_order_id = defaultdict(set)
+        by_ticker = defaultdict(set)
+        for rowid, entry in signals.items():
+            order_ids, tickers = index_keys(entry)
+            for order_id in order_ids:
+                by_order_id[order_id].add(rowid)
+            for ticker in tickers:
+                by_ticker[ticker].add(rowid)
+
+        return dict(by_order_id), dict(by_ticker)
@@ -1,8 +1,19 @@
 from typing import Dict, List, Union  # for type hinting
 from db import db
+from sqlalchemy.orm import load_only
+from services.models.updates import update_row
+from services.models.rows import JSONRows
 
 PairJSON = Dict[str, Union[str, float, int]]  # custom type hint
 
+# columns written by update()
+UPDATE_FIELDS = (
+    "hedge", "status", "notes", "contracts", "act_price", "sma", "sma_dist", "std"
+)
+
+# keys of json(), the columns a sparse fieldset (?fields=) can select
+JSON_FIELDS = ("name", "ticker1", "ticker2") + UPDATE_FIELDS
+
 
 class PairModel(db.Model):
     __tablename__ = "pairs"
@@ -49,7 +60,11 @@ class PairModel(db.Model):
         self.sma_dist = sma_dist
         self.std = std
 
-    def json(self) -> PairJSON:
+    def json(self, fields=None) -> PairJSON:
+        if fields is not None:
+            # sparse fieldset, the other columns may not be loaded
+            return {field: getattr(self, field) for field in fields}
+
         return {
             "name": self.name,
             "ticker1": self.ticker1,
@@ -65,9 +80,11 @@ class PairModel(db.Model):
         }
 
     @classmethod
-    def find_by_name(cls, name: str) -> "PairModel":
+    def find_by_name(cls, name: str, fields=None) -> "PairModel":
+
+        query = cls.query if fields is None else cls.query.options(load_only(*fields))
 
-        return cls.query.filter_by(name=name).first()
+        return query.filter_by(name=name).first()
 
         # KEEPING THE SQL CODE THAT FUNCTIONS THE SAME FOR COMPARISON PURPOSES:
         #
@@ -119,17 +136,7 @@ class PairModel(db.Model):
 
     def update(self) -> None:
 
-        item_to_update = self.query.filter_by(name=self.name).first()
-
-        item_to_update.hedge = self.hedge
-        item_to_update.status = self.status
-        item_to_update.notes = self.notes
-        item_to_update.contracts = self.contracts
-        item_to_update.act_price = self.act_price
-        item_to_update.sma = self.sma
-        item_to_update.sma_dist = self.sma_dist
-        item_to_update.std = self.std
-
+        update_row(self, "name", self.name, UPDATE_FIELDS)
         db.session.commit()
 
         # KEEPING THE SQL CODE THAT FUNCTIONS THE SAME FOR COMPARISON PURPOSES:
@@ -153,13 +160,17 @@ class PairModel(db.Model):
         #         connection.close()
 
     @classmethod
-    def get_rows(cls, number_of_items) -> List:
+    def get_rows(
+        cls, number_of_items, before: int = None, fields=None, rows: bool = False
+    ) -> List:
+        query = cls.query if before is None else cls.query.filter(cls.rowid < before)
+        query = JSON_ROWS.project(query, fields, rows)
 
         if number_of_items == "0":
             # return cls.query.order_by(desc("rowid")).all() # needs from sqlalchemy import desc
-            return cls.query.order_by(cls.rowid.desc())  # better, no need to import
+            return query.order_by(cls.rowid.desc())  # better, no need to import
         else:
-            return cls.query.order_by(cls.rowid.desc()).limit(number_of_items).all()
+            return query.order_by(cls.rowid.desc()).limit(number_of_items).all()
 
         # KEEPING THE SQL CODE THAT FUNCTIONS THE SAME FOR COMPARISON PURPOSES:
 
@@ -251,3 +262,7 @@ class PairModel(db.Model):
             return cls.query.filter(cls.status == -1)
         else:
             return cls.query.filter(cls.status == -1).limit(number_of_items).all()
+
+
+# row tuples of the list resources, mapped to the json() dicts
+JSON_ROWS = JSONRows(PairModel, JSON_FIELDS)
@@ -0,0 +1,194 @@
+"""
+In-process registry of tickers and pairs.
+Used by the webhook validation path (splitticker & check_ticker_status)
+to avoid repeating the same lookups for every signal.
+"""
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+from itertools import chain
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from services.models.pairs import PairModel
+from services.models.tickers import TickerModel
+from services.models.stamps import VersionStamp
+
+TickerEntry = namedtuple("TickerEntry", ["symbol", "sectype", "currency", "active"])
+PairEntry = namedtuple("PairEntry", ["name", "ticker1", "ticker2", "hedge", "status"])
+
+# columns that change the result of the webhook validation
+TICKER_FIELDS = ("symbol", "sectype", "currency", "active")
+PAIR_FIELDS = ("name", "hedge", "status")
+
+
+class Registry:
+    """
+    Read-through cache of TickerEntry/PairEntry snapshots.
+    Unknown names are cached as None until the next invalidation.
+    Local writes invalidate it on commit, writes of other workers
+    are noticed through the version stamp.
+    """
+
+    def __init__(self, stamp: VersionStamp):
+        self._lock = threading.Lock()
+        self._local = threading.local()  # snapshot flag of the thread
+        self._tickers = {}
+        self._pairs = {}
+        self._generation = 0
+        self._listeners = []
+        self._stamp = stamp
+        self._version = stamp.read()
+
+    def ticker(self, symbol: str) -> TickerEntry:
+
+        self.refresh()
+        try:
+            return self._tickers[symbol]
+        except KeyError:
+            pass
+
+        generation = self._generation
+        item = TickerModel.find_by_symbol(symbol)
+        entry = (
+            TickerEntry(item.symbol, item.sectype, item.currency, item.active)
+            if item
+            else None
+        )
+        self._store(self._tickers, symbol, entry, generation)
+
+        return entry
+
+    def pair(self, name: str) -> PairEntry:
+
+        self.refresh()
+        try:
+            return self._pairs[name]
+        except KeyError:
+            pass
+
+        generation = self._generation
+        item = PairModel.find_by_name(name)
+        entry = (
+            PairEntry(item.name, item.ticker1, item.ticker2, item.hedge, item.status)
+            if item
+            else None
+        )
+        self._store(self._pairs, name, entry, generation)
+
+        return entry
+
+    def invalidate(self, symbols=None) -> None:
+        # symbols: tickers known to be changed, None if unknown (clears everything)
+
+        self._clear(symbols)
+        self._version = self._stamp.bump()
+
+    def add_listener(self, listener) -> None:
+        # listener(symbols) is called whenever the registry is cleared
+        self._listeners.append(listener)
+
+    @contextmanager
+    def snapshot(self):
+        # checks the version stamp once for a batch of lookups,
+        # local commits still invalidate the entries
+
+        self.refresh()
+        self._local.pinned = True
+        try:
+            yield self
+        finally:
+            self._local.pinned = False
+
+    def refresh(self) -> None:
+        # cheap check for the changes made by other workers
+
+        if getattr(self._local, "pinned", False):
+            return
+
+        version = self._stamp.read()
+        if version != self._version:
+            self._version = version
+            self._clear(None)  # changed by another worker
+
+    def _clear(self, symbols) -> None:
+
+        with self._lock:
+            self._generation += 1
+            self._tickers = {}
+            self._pairs = {}
+
+        for listener in self._listeners:
+            listener(symbols)
+
+    def _store(self, cache, key, entry, generation) -> None:
+
+        with self._lock:
+            # do not keep what was read before an invalidation
+            if generation == self._generation:
+                cache[key] = entry
+
+
+REGISTRY = Registry(VersionStamp("registry"))
+
+
+# Invalidation: collect changes during the flush, apply them after the commit
+
+
+def _changed(obj, fields) -> bool:
+
+    attrs = inspect(obj).attrs
+    return any(attrs[field].history.has_changes() for field in fields)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_registry_changes(session, flush_context):
+
+    symbols = session.info.setdefault("registry_symbols", set())
+
+    for obj in chain(session.new, session.deleted):
+        if isinstance(obj, TickerModel):
+            symbols.add(obj.symbol)
+        elif isinstance(obj, PairModel):
+            symbols.update((obj.ticker1, obj.ticker2))
+
+    for obj in session.dirty:
+        if isinstance(obj, TickerModel) and _changed(obj, TICKER_FIELDS):
+            symbols.add(obj.symbol)
+        elif isinstance(obj, PairModel) and _changed(obj, PAIR_FIELDS):
+            symbols.update((obj.ticker1, obj.ticker2))
+
+    if not symbols:
+        session.info.pop("registry_symbols")
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_registry_bulk_changes(orm_execute_state):
+    # bulk updates & deletes, Query.update/delete() or session.execute(update(...))
+
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+
+    mapper = orm_execute_state.bind_mapper
+    if mapper and mapper.class_ in (TickerModel, PairModel):
+        # rows are unknown, clear everything on commit
+        orm_execute_state.session.info["registry_all"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_registry_changes(session):
+
+    symbols = session.info.pop("registry_symbols", None)
+
+    if session.info.pop("registry_all", False):
+        REGISTRY.invalidate()
+    elif symbols:
+        REGISTRY.invalidate(symbols)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_registry_changes(session):
+
+    session.info.pop("registry_symbols", None)
+    session.info.pop("registry_all", None)
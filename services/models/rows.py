@@ -0,0 +1,64 @@
+"""
+Row tuple read path of the list resources
+
+Model instances are built (identity map, attribute state) only for json()
+to read them back. The lists select the columns as row tuples instead and
+map them to the same dicts with key/index pairs computed once per model.
+"""
+from sqlalchemy.orm import load_only
+
+
+class JSONRows:
+    """Maps the row tuples of a model query to the dicts of its json()"""
+
+    def __init__(self, model, keys, formats=None):
+        # keys: json() keys in order, all of them columns of the model
+        # formats: key -> function applied to the column value, e.g. str for timestamps
+
+        self.model = model
+        self.keys = tuple(keys)
+        self.formats = formats or {}
+        self._layout = self.layout(self.keys)
+
+    def project(self, query, fields=None, rows=False):
+        # rows: the query selects rowid & the columns of the fields as row tuples,
+        # otherwise the model instances with the columns of the fields loaded (all if None)
+
+        if rows:
+            keys = self.keys if fields is None else fields
+            columns = [self.model.rowid] + [
+                getattr(self.model, key) for key in keys if key != "rowid"
+            ]
+            return query.with_entities(*columns)
+
+        if fields is not None:
+            return query.options(load_only(*fields))  # sparse fieldset
+
+        return query
+
+    def layout(self, keys) -> tuple:
+        # (key, index in the row tuple) pairs & the formatted keys
+
+        indexes = []
+        position = 1  # rowid is the first column
+        for key in keys:
+            if key == "rowid":
+                indexes.append((key, 0))
+            else:
+                indexes.append((key, position))
+                position += 1
+
+        formats = tuple((key, self.formats[key]) for key in keys if key in self.formats)
+
+        return tuple(indexes), formats
+
+    def json(self, row, fields=None) -> dict:
+        # dict of a row selected by project(..., fields, rows=True), same as json(fields)
+
+        indexes, formats = self._layout if fields is None else self.layout(fields)
+
+        item = {key: row[index] for key, index in indexes}
+        for key, format_value in formats:
+            item[key] = format_value(item[key])
+
+        return item
@@ -1,11 +1,36 @@
-from typing import Dict, List  # for type hinting
-from db import db
-from sqlalchemy.sql import func
+"""
+Simple server side sessions of the demo pages
+
+The pages look the session up on each view. The lookups are kept in the
+memory of the worker for SESSION_TTL_SEC, so the views do not read the table,
+and expired sessions are told by their expiry, while the rows are deleted
+by a periodic sweep (see demo.py). A commit changing the table, e.g. a logout
+in any worker, bumps its table stamp, which clears the cached lookups.
+"""
+import threading
+import time
+from collections import OrderedDict, namedtuple
 from datetime import datetime
+from typing import Dict, List, Optional  # for type hinting
+
 import pytz
+from sqlalchemy.sql import func
+
+from app import configs
+from db import db
+from services.models.stamps import VersionStamp
+from services.models.table_stamps import TABLE_STAMPS, add_listener
 
 UserJSON = Dict[str, str]  # custom type hint
 
+# seconds a session lookup is served from the memory of the worker
+SESSION_TTL_SEC = configs.getint("CACHE", "SESSION_TTL_SEC", fallback=30)
+# number of session lookups to keep, including the ones not found
+SESSION_CACHE_SIZE = configs.getint("CACHE", "SESSION_CACHE_SIZE", fallback=1024)
+
+# columns of a cached session
+SessionRow = namedtuple("SessionRow", ["rowid", "value", "expiry"])
+
 
 class SessionModel(db.Model):
     __tablename__ = "simplesession"
@@ -18,6 +43,7 @@ class SessionModel(db.Model):
     expiry = db.Column(
         db.DateTime(timezone=False),
         server_default=func.timezone("UTC", func.current_timestamp()),
+        index=True,  # for the sweep
     )
 
     def __init__(self, value: str, expiry: datetime):
@@ -27,10 +53,46 @@ class SessionModel(db.Model):
     def json(self) -> UserJSON:
         return {"value": self.value}
 
+    def is_expired(self, date_now: datetime = None) -> bool:
+
+        date_now = date_now or datetime.now(tz=pytz.utc)
+        expiry = self.expiry
+        if expiry.tzinfo is None:  # stored as UTC
+            expiry = expiry.replace(tzinfo=pytz.utc)
+
+        return expiry < date_now
+
     @classmethod
-    def find_by_value(cls, value) -> "SessionModel":
+    def find_by_value(cls, value) -> Optional["SessionModel"]:
+        # a copy of the session, not attached to the database session
 
-        return cls.query.filter_by(value=value).first()
+        row = SESSION_CACHE.get(value, cls._read)
+        if row is None:
+            return None
+
+        item = cls(row.value, row.expiry)
+        item.rowid = row.rowid
+        return item
+
+    @classmethod
+    def find_active(cls, value) -> Optional["SessionModel"]:
+        # None for the expired sessions not swept yet as well
+
+        item = cls.find_by_value(value)
+        if item is None or item.is_expired():
+            return None
+
+        return item
+
+    @classmethod
+    def _read(cls, value) -> Optional[SessionRow]:
+
+        row = (
+            db.session.query(cls.rowid, cls.value, cls.expiry)
+            .filter_by(value=value)
+            .first()
+        )
+        return SessionRow(*row) if row else None
 
     @classmethod
     def get_all(cls) -> List:
@@ -44,9 +106,17 @@ class SessionModel(db.Model):
 
     def delete(self) -> None:
 
-        db.session.delete(self)
+        SessionModel.delete_by_value(self.value)
+
+    @classmethod
+    def delete_by_value(cls, value) -> int:
+        # e.g. on logout, the copies returned by find_by_value can't be deleted by the ORM
+
+        count = cls.query.filter_by(value=value).delete()
         db.session.commit()
 
+        return count
+
     @staticmethod
     def delete_all() -> None:
 
@@ -54,9 +124,87 @@ class SessionModel(db.Model):
         db.session.commit()
 
     @classmethod
-    def delete_expired(cls) -> None:
+    def delete_expired(cls) -> int:
 
         date_now = datetime.now(tz=pytz.utc)
 
-        cls.query.filter(cls.expiry < date_now).delete()
+        count = cls.query.filter(cls.expiry < date_now).delete()
         db.session.commit()
+
+        return count
+
+
+class SessionCache:
+    """
+    Bounded cache of the session lookups (value -> SessionRow or None), kept for ttl seconds.
+    Cleared after the local commits changing the sessions, and when the table
+    stamp shows a commit of another worker.
+    """
+
+    def __init__(self, stamp: VersionStamp, ttl: float, maxsize: int):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._stamp = stamp
+        self._seen = None  # stamp of the cached lookups
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._rows = OrderedDict()  # value -> (monotonic deadline, SessionRow or None)
+
+    def get(self, value, read) -> Optional[SessionRow]:
+        # read(value): the lookup in the database
+
+        # read before the lookup, so a commit right after it is not missed
+        stamp = self._stamp.read()
+        now = time.monotonic()
+
+        with self._lock:
+            if stamp != self._seen:
+                self._clear()
+                self._seen = stamp
+
+            cached = self._rows.get(value)
+            if cached is not None and cached[0] > now:
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+            generation = self._generation
+
+        row = read(value)
+
+        with self._lock:
+            # do not keep what was read before an invalidation
+            if generation == self._generation and self.ttl > 0:
+                self._rows[value] = (now + self.ttl, row)
+                self._rows.move_to_end(value)
+                if len(self._rows) > self.maxsize:
+                    self._rows.popitem(last=False)
+
+        return row
+
+    def clear(self) -> None:
+
+        with self._lock:
+            self._clear()
+
+    def info(self) -> dict:
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._rows),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+        }
+
+    def _clear(self) -> None:
+
+        self._generation += 1
+        self._rows.clear()
+
+
+SESSION_CACHE = SessionCache(
+    TABLE_STAMPS[SessionModel.__tablename__], SESSION_TTL_SEC, SESSION_CACHE_SIZE
+)
+add_listener(SessionModel.__tablename__, SESSION_CACHE.clear)
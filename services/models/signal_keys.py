@@ -0,0 +1,108 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Union  # for type hinting
+from db import db
+from sqlalchemy.sql import func
+
+from app import configs
+
+KeyJSON = Dict[str, Union[str, int]]  # custom type hint
+
+# number of recent idempotency keys kept in memory
+IDEMPOTENCY_WINDOW = configs.getint("WEBHOOK", "IDEMPOTENCY_WINDOW", fallback=10000)
+
+
+class RecentKeys:
+    """
+    Bounded window of the recently registered keys -> signal rowids.
+    Misses fall back to the unique index of the signal_keys table.
+    The keys of a deleted signal are deleted with it (see signals.py).
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._keys = OrderedDict()
+
+    def get(self, key: str) -> int:
+
+        with self._lock:
+            return self._keys.get(key)
+
+    def put(self, key: str, rowid: int) -> None:
+
+        with self._lock:
+            self._keys[key] = rowid
+            if len(self._keys) > self.maxsize:
+                self._keys.popitem(last=False)
+
+    def discard(self, rowid: int) -> None:
+        # keys of a deleted signal
+
+        with self._lock:
+            for key in [key for key, value in self._keys.items() if value == rowid]:
+                del self._keys[key]
+
+    def clear(self) -> None:
+
+        with self._lock:
+            self._keys.clear()
+
+
+RECENT_KEYS = RecentKeys(IDEMPOTENCY_WINDOW)
+
+
+class SignalKeyModel(db.Model):
+    __tablename__ = "signal_keys"
+
+    rowid = db.Column(
+        db.Integer, primary_key=True, autoincrement=True
+    )  # using 'rowid' as the default key
+    key = db.Column(db.String, unique=True, nullable=False)
+    signal_rowid = db.Column(db.Integer)
+    timestamp = db.Column(
+        db.DateTime(timezone=False), server_default=func.current_timestamp()
+    )
+
+    def __init__(self, key: str, signal_rowid: int):
+        self.key = key
+        self.signal_rowid = signal_rowid
+
+    def json(self) -> KeyJSON:
+        return {
+            "key": self.key,
+            "signal_rowid": self.signal_rowid,
+            "timestamp": str(self.timestamp),
+        }
+
+    @classmethod
+    def find_by_key(cls, key) -> "SignalKeyModel":
+
+        return cls.query.filter_by(key=key).first()
+
+    @classmethod
+    def find_rowid(cls, key) -> int:
+        # rowid of the signal registered with the key, None if the key is new
+        # or its signal was deleted (a replay registers it again)
+        from services.models.signals import SignalModel
+
+        rowid = RECENT_KEYS.get(key)
+
+        if rowid is not None:
+            # by primary key: the signal may be deleted by another worker
+            if db.session.query(SignalModel.rowid).filter_by(rowid=rowid).first():
+                return rowid
+            RECENT_KEYS.discard(rowid)
+            return None
+
+        row = (
+            db.session.query(cls.signal_rowid)
+            .join(SignalModel, SignalModel.rowid == cls.signal_rowid)
+            .filter(cls.key == key)
+            .first()
+        )
+        if row:
+            rowid = row.signal_rowid
+            RECENT_KEYS.put(key, rowid)
+
+        return rowid
@@ -0,0 +1,56 @@
+from typing import Dict, Union  # for type hinting
+from db import db
+
+LegJSON = Dict[str, Union[str, int]]  # custom type hint
+
+
+class SignalLegModel(db.Model):
+    """
+    Order id & symbol of each leg of a signal, kept in sync by the signal mapper events.
+    Lookups join back to the signals table and check the signal columns again,
+    so a stale leg (e.g. left by a bulk delete) never returns a wrong signal.
+    """
+
+    __tablename__ = "signal_legs"
+    __table_args__ = (
+        db.Index("ix_signal_legs_order", "order_id", "symbol", "signal_rowid"),
+        db.Index("ix_signal_legs_signal", "signal_rowid"),
+    )
+
+    rowid = db.Column(
+        db.Integer, primary_key=True, autoincrement=True
+    )  # using 'rowid' as the default key
+    order_id = db.Column(db.Integer, nullable=False)
+    symbol = db.Column(db.String)
+    signal_rowid = db.Column(db.Integer, nullable=False)
+    leg = db.Column(db.Integer)  # 1 or 2
+
+    def __init__(self, order_id: int, symbol: str, signal_rowid: int, leg: int):
+        self.order_id = order_id
+        self.symbol = symbol
+        self.signal_rowid = signal_rowid
+        self.leg = leg
+
+    def json(self) -> LegJSON:
+        return {
+            "order_id": self.order_id,
+            "symbol": self.symbol,
+            "signal_rowid": self.signal_rowid,
+            "leg": self.leg,
+        }
+
+    @staticmethod
+    def rows(signal, rowid: int = None) -> list:
+        # leg rows of a signal, as inserted by the mapper events,
+        # rowid: row written with the signal's values, if not its own
+
+        rowid = signal.rowid if rowid is None else rowid
+
+        return [
+            {"order_id": order_id, "symbol": symbol, "signal_rowid": rowid, "leg": leg}
+            for leg, order_id, symbol in (
+                (1, signal.order_id1, signal.ticker1),
+                (2, signal.order_id2, signal.ticker2),
+            )
+            if order_id is not None
+        ]
@@ -1,25 +1,78 @@
 import os
 import re
+import math
 from typing import Dict, List, Union  # for type hinting
 from db import db
 from datetime import datetime
 from sqlalchemy.sql import (
     func,
 )  # 'sqlalchemy' is being installed together with 'flask-sqlalchemy'
-
-from services.models.pairs import PairModel
-from services.models.tickers import TickerModel
+from sqlalchemy import event, inspect, select, literal, case
+from sqlalchemy.orm import load_only, object_session, Session
+
+from services.models.registry import REGISTRY
+from services.models.equations import EQUATIONS
+from services.models.signal_keys import SignalKeyModel, RECENT_KEYS
+from services.models.group_commit import SIGNAL_WRITER, GROUP_COMMIT
+from services.models.signal_legs import SignalLegModel
+from services.models.executions import ExecutionModel
+from services.models.slip_rollups import SlipRollupModel, ROLLUP_FIELDS, whole_days
+from services.models.updates import update_row
+from services.models.rows import JSONRows
+from services.models.changes import ChangeModel, loaded_json
+from services.models.order_book import OrderBook, ACTIVE_STATUSES, MAX_ROWIDS
 
 from app import configs
 
 SignalJSON = Dict[str, Union[str, float, int]]  # custom type hint
 
+# columns written by update(), the fill totals are kept by add_execution
+UPDATE_FIELDS = (
+    "ticker",
+    "timestamp",
+    "order_action",
+    "order_contracts",
+    "order_price",
+    "mar_pos",
+    "mar_pos_size",
+    "pre_mar_pos",
+    "pre_mar_pos_size",
+    "order_comment",
+    "order_status",
+    "ticker_type",
+    "ticker1",
+    "ticker2",
+    "hedge_param",
+    "order_id1",
+    "order_id2",
+    "price1",
+    "price2",
+    "fill_price",
+    "slip",
+    "error_msg",
+    "status_msg",
+)
+
+# keys of json(), the columns a sparse fieldset (?fields=) can select
+JSON_FIELDS = ("rowid", "timestamp") + tuple(
+    field for field in UPDATE_FIELDS if field != "timestamp"
+)
+
 # Passphrase is required to register webhooks (& to update account positions & PNL)
 PASSPHRASE = os.environ.get("WEBHOOK_PASSPHRASE", configs.get("SECRET", "WEBHOOK_PASSPHRASE"))
 
 
 class SignalModel(db.Model):
     __tablename__ = "signals"
+    __table_args__ = (
+        # lists of a pair / single ticker, also used by the date ranges & slip averages
+        db.Index("ix_signals_pair", "ticker1", "ticker2", "rowid"),
+        db.Index("ix_signals_single", "ticker1", "ticker_type", "rowid"),
+        # lists by status & the latest waiting signal
+        db.Index("ix_signals_status", "order_status", "rowid"),
+        # signals stamped at the end of the slip averages (see SlipRollupModel.get_stats)
+        db.Index("ix_signals_timestamp", "timestamp"),
+    )
 
     rowid = db.Column(
         db.Integer, primary_key=True, autoincrement=True
@@ -54,6 +107,12 @@ class SignalModel(db.Model):
     error_msg = db.Column(db.String)
     status_msg = db.Column(db.String)
 
+    # Running totals of the executions ledger, see add_execution
+    filled_qty1 = db.Column(db.Float)
+    filled_qty2 = db.Column(db.Float)
+    notional1 = db.Column(db.Float)
+    notional2 = db.Column(db.Float)
+
     def __init__(
         self,
         timestamp: datetime,
@@ -104,7 +163,14 @@ class SignalModel(db.Model):
         self.error_msg = error_msg
         self.status_msg = status_msg
 
-    def json(self) -> SignalJSON:
+    def json(self, fields=None) -> SignalJSON:
+        if fields is not None:
+            # sparse fieldset, the other columns may not be loaded
+            return {
+                field: str(self.timestamp) if field == "timestamp" else getattr(self, field)
+                for field in fields
+            }
+
         return {
             "rowid": self.rowid,
             "timestamp": str(self.timestamp),
@@ -132,6 +198,69 @@ class SignalModel(db.Model):
             "status_msg": self.status_msg,
         }
 
+    def add_execution(self, leg: int, filled_qty: float, price: float) -> ExecutionModel:
+        # records the quantity filled since the last order status of the leg
+        # filled_qty & price: cumulative filled quantity & average fill price of the order,
+        # returns None if nothing new is filled (repeated or late order status)
+
+        filled = getattr(self, "filled_qty%d" % leg) or 0
+        qty = filled_qty - filled
+
+        if qty <= 0:
+            return None
+
+        # the running totals give the price of the new quantity
+        notional = filled_qty * price
+        execution_price = (notional - (getattr(self, "notional%d" % leg) or 0)) / qty
+
+        setattr(self, "filled_qty%d" % leg, filled_qty)
+        setattr(self, "notional%d" % leg, notional)
+        setattr(self, "price%d" % leg, price)  # VWAP of the leg
+
+        execution = ExecutionModel(
+            self.rowid,
+            getattr(self, "order_id%d" % leg),
+            getattr(self, "ticker%d" % leg),
+            leg,
+            qty,
+            round(execution_price, 6),
+        )
+        db.session.add(execution)  # committed with the signal
+
+        return execution
+
+    def remaining(self, leg: int) -> float:
+        # contracts of the leg not filled yet, the second leg keeps the hedge ratio
+
+        if leg == 1:
+            contracts = math.floor(self.order_contracts)
+        else:
+            contracts = math.floor(self.order_contracts * self.hedge_param)
+
+        return contracts - (getattr(self, "filled_qty%d" % leg) or 0)
+
+    def fills(self) -> dict:
+        # running totals of the legs
+
+        legs = [(1, self.ticker1)]
+        if self.ticker_type == "pair":
+            legs.append((2, self.ticker2))
+
+        return {
+            "fill_price": self.fill_price,
+            "slip": self.slip,
+            "legs": [
+                {
+                    "leg": leg,
+                    "symbol": symbol,
+                    "filled_qty": getattr(self, "filled_qty%d" % leg) or 0,
+                    "vwap": getattr(self, "price%d" % leg),
+                    "remaining": self.remaining(leg),
+                }
+                for leg, symbol in legs
+            ],
+        }
+
     @staticmethod
     def passphrase_wrong(passphrase) -> bool:
         if passphrase == PASSPHRASE:
@@ -139,9 +268,11 @@ class SignalModel(db.Model):
         return True
 
     @classmethod
-    def find_by_rowid(cls, rowid) -> "SignalModel":
+    def find_by_rowid(cls, rowid, fields=None) -> "SignalModel":
+
+        query = cls.query if fields is None else cls.query.options(load_only(*fields))
 
-        return cls.query.filter_by(rowid=rowid).first()
+        return query.filter_by(rowid=rowid).first()
 
         # KEEPING THE SQL CODE THAT FUNCTIONS THE SAME FOR COMPARISON PURPOSES:
 
@@ -170,11 +301,23 @@ class SignalModel(db.Model):
         #
         # return None
 
-    def insert(self) -> None:
+    def insert(self, key: str = None) -> None:
+        # key: idempotency key of the signal, unique in signal_keys
+
+        # shares the commit with the concurrent inserts,
+        # unless the writer did not take it in time
+        if GROUP_COMMIT and SIGNAL_WRITER.insert(self, key):
+            return
 
         db.session.add(self)
+        if key:
+            db.session.flush()  # get the rowid
+            db.session.add(SignalKeyModel(key, self.rowid))
         db.session.commit()
 
+        if key:
+            RECENT_KEYS.put(key, self.rowid)
+
         # KEEPING THE SQL CODE THAT FUNCTIONS THE SAME FOR COMPARISON PURPOSES:
 
         # connection = sqlite3.connect('data.db', timeout=10)
@@ -200,33 +343,52 @@ class SignalModel(db.Model):
         #     if connection:
         #         connection.close()  # disconnect the database even if exception occurs
 
+    @staticmethod
+    def insert_all(items: List["SignalModel"], keys: List[str] = None) -> None:
+        # insert a batch of signals in a single transaction,
+        # keys: idempotency keys in the order of the items (or None)
+
+        db.session.add_all(items)
+        if keys and any(keys):
+            db.session.flush()  # get the rowids
+            db.session.add_all(
+                SignalKeyModel(key, item.rowid) for item, key in zip(items, keys) if key
+            )
+        db.session.commit()
+
+        for item, key in zip(items, keys or ()):
+            if key:
+                RECENT_KEYS.put(key, item.rowid)
+
+    @staticmethod
+    def update_all(items: List["SignalModel"]) -> None:
+        # commit the changes of a batch of loaded signals in a single transaction
+
+        db.session.add_all(items)
+        db.session.commit()
+
     def update(self, rowid) -> None:
 
-        item_to_update = self.query.filter_by(rowid=rowid).first()
-
-        item_to_update.ticker = self.ticker
-        item_to_update.timestamp = self.timestamp
-        item_to_update.order_action = self.order_action
-        item_to_update.order_contracts = self.order_contracts
-        item_to_update.order_price = self.order_price
-        item_to_update.mar_pos = self.mar_pos
-        item_to_update.mar_pos_size = self.mar_pos_size
-        item_to_update.pre_mar_pos = self.pre_mar_pos
-        item_to_update.pre_mar_pos_size = self.pre_mar_pos_size
-        item_to_update.order_comment = self.order_comment
-        item_to_update.order_status = self.order_status
-        item_to_update.ticker_type = self.ticker_type
-        item_to_update.ticker1 = self.ticker1
-        item_to_update.ticker2 = self.ticker2
-        item_to_update.hedge_param = self.hedge_param
-        item_to_update.order_id1 = self.order_id1
-        item_to_update.order_id2 = self.order_id2
-        item_to_update.price1 = self.price1
-        item_to_update.price2 = self.price2
-        item_to_update.fill_price = self.fill_price
-        item_to_update.slip = self.slip
-        item_to_update.error_msg = self.error_msg
-        item_to_update.status_msg = self.status_msg
+        previous = None
+        if not (inspect(self).persistent and self.rowid == rowid):
+            # slip & status of the row written over, to update its rollup & log the change
+            columns = ROLLUP_FIELDS + ("order_status",)
+            previous = (
+                db.session.query(*[getattr(SignalModel, field) for field in columns])
+                .filter(SignalModel.rowid == rowid)
+                .first()
+            )
+
+        if update_row(self, "rowid", rowid, UPDATE_FIELDS):
+            # written without the mapper events
+            connection = db.session.connection()
+            _replace_legs(connection, self, rowid)
+            if previous:
+                SlipRollupModel.add(connection, previous._mapping, -1)
+            SlipRollupModel.add(connection, _rollup_values(self))
+            changed = previous is None or previous.order_status != self.order_status
+            item = dict(loaded_json(self, JSON_ROWS), rowid=rowid)
+            ChangeModel.record(db.session(), "signal", "status" if changed else "update", item)
 
         db.session.commit()
 
@@ -256,13 +418,19 @@ class SignalModel(db.Model):
         #         connection.close()
 
     @classmethod
-    def get_rows(cls, number_of_items) -> List:
+    def get_rows(
+        cls, number_of_items, before: int = None, fields=None, rows: bool = False
+    ) -> List:
+        # before: rowid of the last item of the previous page (keyset pagination)
+
+        query = cls.query if before is None else cls.query.filter(cls.rowid < before)
+        query = JSON_ROWS.project(query, fields, rows)
 
         if number_of_items == "0":
             # return cls.query.order_by(desc("rowid")).all() # needs from sqlalchemy import desc
-            return cls.query.order_by(cls.rowid.desc())  # better, no need to import
+            return query.order_by(cls.rowid.desc())  # better, no need to import
         else:
-            return cls.query.order_by(cls.rowid.desc()).limit(number_of_items)
+            return query.order_by(cls.rowid.desc()).limit(number_of_items)
 
         # KEEPING THE SQL CODE THAT FUNCTIONS THE SAME FOR COMPARISON PURPOSES:
 
@@ -322,7 +490,16 @@ class SignalModel(db.Model):
         #         connection.close()
 
     @classmethod
-    def get_list_ticker(cls, ticker_name, number_of_items) -> List:
+    def get_list_ticker(
+        cls,
+        ticker_name,
+        number_of_items,
+        before: int = None,
+        fields=None,
+        rows: bool = False,
+    ) -> List:
+        query = cls.query if before is None else cls.query.filter(cls.rowid < before)
+        query = JSON_ROWS.project(query, fields, rows)
 
         pair = False
 
@@ -336,7 +513,7 @@ class SignalModel(db.Model):
         if number_of_items == "0":
             if pair:
                 return (
-                    cls.query.filter(
+                    query.filter(
                         (cls.ticker1 == ticker1) & (cls.ticker2 == ticker2)
                     )
                     .order_by(cls.rowid.desc())
@@ -344,7 +521,7 @@ class SignalModel(db.Model):
                 )
             else:
                 return (
-                    cls.query.filter(cls.ticker1 == ticker1)
+                    query.filter(cls.ticker1 == ticker1)
                     .filter(cls.ticker_type == "single")
                     .order_by(cls.rowid.desc())
                     .all()
@@ -352,7 +529,7 @@ class SignalModel(db.Model):
         else:
             if pair:
                 return (
-                    cls.query.filter(
+                    query.filter(
                         (cls.ticker1 == ticker1) & (cls.ticker2 == ticker2)
                     )
                     .order_by(cls.rowid.desc())
@@ -360,7 +537,7 @@ class SignalModel(db.Model):
                 )
             else:
                 return (
-                    cls.query.filter(cls.ticker1 == ticker1)
+                    query.filter(cls.ticker1 == ticker1)
                     .filter(cls.ticker_type == "single")
                     .order_by(cls.rowid.desc())
                     .limit(number_of_items)
@@ -428,47 +605,65 @@ class SignalModel(db.Model):
                 )
 
     @classmethod
-    def get_list_status(cls, order_status, number_of_items) -> List:
+    def get_list_status(
+        cls,
+        order_status,
+        number_of_items,
+        before: int = None,
+        fields=None,
+        rows: bool = False,
+    ) -> List:
+        query = cls.query if before is None else cls.query.filter(cls.rowid < before)
+        query = JSON_ROWS.project(query, fields, rows)
+
+        if order_status == "waiting":
+            statuses = ("waiting", "rerouted")
+        else:
+            statuses = (order_status,)
+        query = query.filter(cls.order_status.in_(statuses))
+
+        if order_status in ACTIVE_STATUSES:
+            # rowids of the active signals from the order book, the rows by primary key
+            rowids = ORDER_BOOK.rowids(statuses, before)
+            if number_of_items != "0":
+                rowids = rowids[: int(number_of_items)]
+            if len(rowids) <= MAX_ROWIDS:
+                query = query.filter(cls.rowid.in_(rowids))
 
         if number_of_items == "0":
-            if order_status == "waiting":
-                return (
-                    cls.query.filter(
-                        (cls.order_status == "waiting")
-                        | (cls.order_status == "rerouted")
-                    )
-                    .order_by(cls.rowid.desc())
-                    .all()
-                )
-            else:
-                return (
-                    cls.query.filter_by(order_status=order_status)
-                    .order_by(cls.rowid.desc())
-                    .all()
-                )
+            return query.order_by(cls.rowid.desc()).all()
         else:
-            if order_status == "waiting":
-                return (
-                    cls.query.filter(
-                        (cls.order_status == "waiting")
-                        | (cls.order_status == "rerouted")
-                    )
-                    .order_by(cls.rowid.desc())
-                    .limit(number_of_items)
-                )
-            else:
-                return (
-                    cls.query.filter_by(order_status=order_status)
-                    .order_by(cls.rowid.desc())
-                    .limit(number_of_items)
-                )
+            return query.order_by(cls.rowid.desc()).limit(number_of_items)
+
+    @classmethod
+    def get_waiting_after(cls, rowid, number_of_items, rows: bool = False) -> List:
+        # waiting & rerouted signals registered after rowid, oldest first (long poll)
+
+        statuses = ("waiting", "rerouted")
+        # the oldest ones of the order book, no query while there are none
+        rowids = ORDER_BOOK.rowids(statuses, after=rowid)[-number_of_items:]
+        if not rowids:
+            return []
+
+        if len(rowids) > MAX_ROWIDS:
+            query = cls.query.filter(cls.rowid > rowid)
+        else:
+            query = cls.query.filter(cls.rowid.in_(rowids))
+        query = JSON_ROWS.project(query, rows=rows)
+
+        return (
+            query.filter(cls.order_status.in_(statuses))
+            .order_by(cls.rowid)
+            .limit(number_of_items)
+            .all()
+        )
 
     def check_ticker_status(self) -> bool:
 
         # check if ticker is registered and trade status is active
         if self.ticker_type == "pair":
             pair_name = self.ticker1 + "-" + self.ticker2
-            pair = PairModel.find_by_name(pair_name)
+            pair = REGISTRY.pair(pair_name)
             # check if pair exists
             if pair:
                 # check trade status
@@ -491,7 +686,7 @@ class SignalModel(db.Model):
                 return False
 
         else:
-            ticker = TickerModel.find_by_symbol(self.ticker1)
+            ticker = REGISTRY.ticker(self.ticker1)
             # check if ticker exists
             if ticker:
                 # check trade status
@@ -510,283 +705,106 @@ class SignalModel(db.Model):
 
     def splitticker(self,) -> bool:
 
-        success_flag = True
-        currency_match = True
-        ticker_pair1 = ""
-        ticker_pair2 = ""
-
-        eq12 = self.ticker.split("-")  # check if pair or single
-        # print(eq12)  # ['LNT', '1.25*NYSE:FTS']
-
-        if len(eq12) <= 2:
-
-            eq1_hedge = re.findall(
-                r"[-+]?\d*\.\d+|\d+", eq12[0]
-            )  # hedge constant for the 1st ticker
-            # print("eq1_hedge: ", eq1_hedge)  # []
-
-            if len(eq1_hedge) > 0:
-                eq1 = eq12[0].replace(eq1_hedge[0], "")
-            else:
-                eq1 = eq12[0]  # LNT
-
-            eq1 = eq1.replace("*", "")
-            # print("eq1: ", eq1)  # LNT
-
-            eq1_split = eq1.rsplit(":", maxsplit=1)
-            eq1_ticker_almost = eq1_split[len(eq1_split) - 1]
-
-            # print("eq1_split: ", eq1_split)  # ['LNT']
-            # print("eq1_ticker_almost: ", eq1_ticker_almost)  # LNT
-
-            # check if the ticker security type is CASH or CRYPTO
-            item = TickerModel.find_by_symbol(eq1_ticker_almost)
-
-            if item:
-                # print("item found")
-
-                # refer to test cases
-                if item.sectype == "CASH":
-
-                    fx1 = eq1_ticker_almost[0:3]  # get the first 3 char # USD
-                    fx2 = eq1_ticker_almost[-3:]  # get the last 3 char # CAD
-                    ticker_pair1 = fx1 + "." + fx2
-
-                    # check for currency mismatch
-                    if fx2 != item.currency:
-                        currency_match = False
-                        success_flag = False
-
-                elif item.sectype == "CRYPTO":
-                    cry2 = eq1_ticker_almost[-3:]  # get last 3 char
-                    ticker_pair1 = eq1_ticker_almost.replace(".", "")
-                    cry1 = eq1_ticker_almost[
-                        0 : (len(ticker_pair1) - 3)
-                    ]  # get the first 3 char
-                    ticker_pair1 = cry1 + "." + cry2
-
-                    # TODO: improve validity check
-                    # check if valid crypto pair, accepts only USD pairs
-                    if cry2 != item.currency:
-                        currency_match = False
-                        success_flag = False
-
-                else:
-
-                    if (
-                        "." in eq1_ticker_almost
-                    ):  # For Class A,B type tickers EXP: BF.A BF.B
-                        ticker_pair1 = eq1_ticker_almost.replace(
-                            ".", " "
-                        )  # convert Tradingview -> IB format
-                    else:
-                        ticker_pair1 = "".join(
-                            char for char in eq1_ticker_almost if char.isalnum()
-                        )
-
-            else:
-                success_flag = False
-                self.status_msg = "unknown ticker!"
-
-            # print("ticker_pair1: ", ticker_pair1)  # LNT
-
-            if len(eq1_hedge) != 0:
-                if eq1_hedge[0] != 1:
-                    success_flag = False
-
-            # print("problem_flag_first: ", success_flag)
-
-            self.ticker_type = "single"
-            self.ticker1 = ticker_pair1
-
-        if len(eq12) == 2:
-
-            eq2_hedge = re.findall(
-                r"[-+]?\d*\.\d+|\d+", eq12[1]
-            )  # hedge constant fot the 2nd ticker
-            # print("eq2_hedge: ", eq2_hedge)  # ['1.25']
-
-            if len(eq2_hedge) > 0:
-                eq2 = eq12[1].replace(eq2_hedge[0], "")
-            else:
-                eq2 = eq12[1]  # *NYSE:FTS
-
-            eq2 = eq2.replace("*", "")
-
-            # print("eq2: ", eq2)  # NYSE:FTS
-
-            eq2_split = eq2.rsplit(":", maxsplit=1)
-            eq2_ticker_almost = eq2_split[len(eq2_split) - 1]
-
-            # print("eq2_split: ", eq2_split)  # ['NYSE', 'FTS']
-            # print("eq2_ticker_almost: ", eq2_ticker_almost)  # FTS
-
-            # check if the ticker security type is CASH or CRYPTO
-            item = TickerModel.find_by_symbol(eq2_ticker_almost)
-
-            if item:
-                # print("item found")
-
-                if item.sectype == "CASH":
-                    fx1 = eq2_ticker_almost[0:3]  # get the first 3 char # USD
-                    fx2 = eq2_ticker_almost[-3:]  # get the last 3 char # CAD
-                    ticker_pair2 = fx1 + "." + fx2
-
-                    # check for currency mismatch
-                    if fx2 != item.currency:
-                        currency_match = False
-                        success_flag = False
-
-                elif item.sectype == "CRYPTO":
-                    cry2 = eq2_ticker_almost[-3:]  # get last 3 char
-                    ticker_pair2 = eq2_ticker_almost.replace(".", "")
-                    cry1 = eq2_ticker_almost[
-                        0 : (len(ticker_pair2) - 3)
-                    ]  # get the first 3 char
-                    ticker_pair2 = cry1 + "." + cry2
-
-                    # TODO: improve validity check
-                    # check if valid cryptopair, accepts only USD pairs
-                    if cry2 != item.currency:
-                        currency_match = False
-                        success_flag = False
-                else:
-
-                    if (
-                        "." in eq2_ticker_almost
-                    ):  # For Class A,B type tickers EXP: BF.A BF.B
-                        ticker_pair2 = eq2_ticker_almost.replace(
-                            ".", " "
-                        )  # convert Tradingview -> IB format
-                    else:
-                        ticker_pair2 = "".join(
-                            char for char in eq2_ticker_almost if char.isalnum()
-                        )
-
-            else:
-                success_flag = False
-                self.status_msg = "unknown ticker!"
-
-            # print("ticker_pair2: ", ticker_pair2)  # FTS
-
-            if len(eq2_hedge) == 0:
-                hedge_const = 1
-            else:
-                hedge_const = eq2_hedge[0]
-
-            # print("hedge_const: ", hedge_const)  # False
-            # print("problem_flag_final: ", success_flag)
-            # print("ticker_type: ", self.ticker_type)
+        # Split the received webhook equation into tickers and hedge parameters
+        # parsed equations are cached, refer to services/models/equations.py
+        equation = EQUATIONS.parse(self.ticker)
 
-            self.ticker_type = "pair"
-            self.ticker2 = ticker_pair2
-            self.hedge_param = hedge_const
+        if equation.ticker_type:
+            self.ticker_type = equation.ticker_type
+            self.ticker1 = equation.legs[0].ib_symbol
 
-        if len(eq12) > 2:
-            success_flag = False
+        if equation.ticker_type == "pair":
+            self.ticker2 = equation.legs[1].ib_symbol
+            self.hedge_param = equation.hedge_param
 
-        if not success_flag:
+        if not equation.success:
             self.order_status = "error"
             self.status_msg = "problematic ticker!"
-            if not currency_match:
+            if not equation.currency_match:
                 self.status_msg = "currency mismatch!"
 
-        return success_flag
+        return equation.success
 
     @classmethod
     def get_avg_slip(cls, ticker_name, start_date, end_date) -> dict:
 
-        slip_dic = {}
-
-        pair = False
-
-        tickers = ticker_name.split("-")  # check if pair or single
-        ticker1 = tickers[0]
-        ticker2 = ""
-        if len(tickers) == 2:
-            ticker2 = tickers[1]
-            pair = True
+        days = whole_days(start_date, end_date)
+        if days and days[0] <= days[1]:
+            # one rollup row per day & action instead of the signals,
+            # the range includes the signals stamped at end_date
+            stats = SlipRollupModel.get_stats(ticker_name, *days, end_date=end_date)
+        else:
+            stats = cls.get_slip_stats(ticker_name, start_date, end_date)
 
-        if pair:
-            slip_dic["buy"] = (
-                db.session.query(db.func.avg(cls.slip))
-                .filter(
-                    (cls.ticker1 == ticker1)
-                    & (cls.ticker2 == ticker2)
-                    & (cls.timestamp <= end_date)
-                    & (cls.timestamp >= start_date)
-                    & (cls.order_action == "buy")
-                )
-                .scalar()
-            )
+        return {
+            "buy": stats["buy"]["avg"],
+            "sell": stats["sell"]["avg"],
+            "avg": stats["all"]["avg"],
+        }
 
-            slip_dic["sell"] = (
-                db.session.query(db.func.avg(cls.slip))
-                .filter(
-                    (cls.ticker1 == ticker1)
-                    & (cls.ticker2 == ticker2)
-                    & (cls.timestamp <= end_date)
-                    & (cls.timestamp >= start_date)
-                    & (cls.order_action == "sell")
-                )
-                .scalar()
-            )
+    @classmethod
+    def get_slip_stats(cls, ticker_name, start_date=None, end_date=None) -> dict:
+        # count, avg, min, max & stddev of the slips (all, buy & sell) in a single query
 
-            slip_dic["avg"] = (
-                db.session.query(db.func.avg(cls.slip))
-                .filter(
-                    (cls.ticker1 == ticker1)
-                    & (cls.ticker2 == ticker2)
-                    & (cls.timestamp <= end_date)
-                    & (cls.timestamp >= start_date)
-                )
-                .scalar()
-            )
+        tickers = ticker_name.split("-")  # check if pair or single
 
+        if len(tickers) == 2:
+            criteria = [(cls.ticker1 == tickers[0]) & (cls.ticker2 == tickers[1])]
         else:
-            slip_dic["buy"] = (
-                db.session.query(db.func.avg(cls.slip))
-                .filter(
-                    (cls.ticker1 == ticker1)
-                    & (cls.timestamp <= end_date)
-                    & (cls.timestamp >= start_date)
-                    & (cls.order_action == "buy")
-                )
-                .filter(cls.ticker_type == "single")
-                .scalar()
-            )
+            criteria = [(cls.ticker1 == tickers[0]) & (cls.ticker_type == "single")]
 
-            slip_dic["sell"] = (
-                db.session.query(db.func.avg(cls.slip))
-                .filter(
-                    (cls.ticker1 == ticker1)
-                    & (cls.timestamp <= end_date)
-                    & (cls.timestamp >= start_date)
-                    & (cls.order_action == "sell")
-                )
-                .filter(cls.ticker_type == "single")
-                .scalar()
-            )
+        if start_date is not None:
+            criteria.append(cls.timestamp >= start_date)
+        if end_date is not None:
+            criteria.append(cls.timestamp <= end_date)
 
-            slip_dic["avg"] = (
-                db.session.query(db.func.avg(cls.slip))
-                .filter(
-                    (cls.ticker1 == ticker1)
-                    & (cls.timestamp <= end_date)
-                    & (cls.timestamp >= start_date)
-                )
-                .filter(cls.ticker_type == "single")
-                .scalar()
-            )
+        groups = {
+            "all": cls.slip,
+            "buy": case((cls.order_action == "buy", cls.slip)),
+            "sell": case((cls.order_action == "sell", cls.slip)),
+        }
 
-        return slip_dic
+        columns = []
+        for slip in groups.values():
+            columns += [
+                func.count(slip),
+                func.avg(slip),
+                func.min(slip),
+                func.max(slip),
+                func.sum(slip * slip),
+            ]
+
+        row = db.session.query(*columns).filter(*criteria).one()
+
+        stats = {}
+        for index, group in enumerate(groups):
+            count, avg, min_slip, max_slip, squares = row[index * 5: index * 5 + 5]
+
+            # sample standard deviation, sqlite has no stddev function
+            stddev = None
+            if count > 1:
+                variance = (squares - count * avg * avg) / (count - 1)
+                stddev = math.sqrt(max(variance, 0))
+
+            stats[group] = {
+                "count": count,
+                "avg": avg,
+                "min": min_slip,
+                "max": max_slip,
+                "stddev": stddev,
+            }
+
+        return stats
 
     @classmethod
     def find_by_orderid(cls, orderid) -> "SignalModel":
 
+        # legs are read with an index, the signal columns are checked again
         return (
-            cls.query.filter((cls.order_id1 == orderid) | (cls.order_id2 == orderid))
-            .order_by(cls.rowid.desc())
+            cls.query.join(SignalLegModel, SignalLegModel.signal_rowid == cls.rowid)
+            .filter(SignalLegModel.order_id == orderid)
+            .filter((cls.order_id1 == orderid) | (cls.order_id2 == orderid))
+            .order_by(SignalLegModel.signal_rowid.desc())
             .first()
         )  # get the most recent order in case of a multiple order id situation
 
@@ -794,28 +812,60 @@ class SignalModel(db.Model):
     # multiple order id situation happens a lot, better to double-check the ticker
     def find_by_orderid_ticker(cls, orderid, ticker) -> "SignalModel":
         return (
-            cls.query.filter(
+            cls.query.join(SignalLegModel, SignalLegModel.signal_rowid == cls.rowid)
+            .filter(
+                (SignalLegModel.order_id == orderid) & (SignalLegModel.symbol == ticker)
+            )
+            .filter(
                 ((cls.ticker1 == ticker) | (cls.ticker2 == ticker))
                 & ((cls.order_id1 == orderid) | (cls.order_id2 == orderid))
             )
-            .order_by(cls.rowid.desc())
+            .order_by(SignalLegModel.signal_rowid.desc())
             .first()
         )  # get the most recent order in case of a multiple order id situation
 
-    @classmethod
-    def check_latest(cls) -> "SignalModel":
-        return (
-            cls.query.filter(
-                (
-                    (cls.order_status == "waiting")
-                    | (cls.order_status == "rerouted")
-                    | (cls.order_status == "error")
-                    | (cls.order_status == "critical err")
+    @staticmethod
+    def backfill_legs() -> int:
+        # creates the legs of the signals registered before the signal_legs table
+
+        if SignalLegModel.query.first():
+            return 0
+
+        signals = SignalModel.__table__
+        legs = SignalLegModel.__table__
+        count = 0
+
+        for leg, order_id, symbol in (
+            (1, signals.c.order_id1, signals.c.ticker1),
+            (2, signals.c.order_id2, signals.c.ticker2),
+        ):
+            result = db.session.execute(
+                legs.insert().from_select(
+                    ["order_id", "symbol", "signal_rowid", "leg"],
+                    select(order_id, symbol, signals.c.rowid, literal(leg)).where(
+                        order_id.isnot(None)
+                    ),
                 )
             )
-            .order_by(cls.rowid.desc())
-            .first()
+            count += result.rowcount
+
+        db.session.commit()
+
+        return count
+
+    @classmethod
+    def check_latest(cls) -> "SignalModel":
+
+        # the most recent signal to warn about, the waiting ones from the order book
+        waiting = ORDER_BOOK.latest(("waiting", "rerouted"))
+        error = (
+            db.session.query(func.max(cls.rowid))
+            .filter(cls.order_status.in_(("error", "critical err")))
+            .scalar()
         )
+        rowid = max((key for key in (waiting, error) if key is not None), default=None)
+
+        return cls.find_by_rowid(rowid) if rowid is not None else None
 
     # to split stocks only
     # def splitticker_stocks(
@@ -944,3 +994,190 @@ class SignalModel(db.Model):
     #         self.status_msg = "problematic ticker!"
     #
     #     return success_flag
+
+
+# row tuples of the list resources, mapped to the json() dicts
+JSON_ROWS = JSONRows(SignalModel, JSON_FIELDS, {"timestamp": str})
+
+# active signals of the worker, synced with the change log
+ORDER_BOOK = OrderBook(SignalModel.__table__)
+
+
+# Order legs: kept in sync with the order ids & tickers of the signals
+
+
+LEG_FIELDS = ("order_id1", "order_id2", "ticker1", "ticker2")
+
+
+@event.listens_for(SignalModel, "after_insert")
+def _insert_legs(mapper, connection, target):
+
+    rows = SignalLegModel.rows(target)
+    if rows:
+        connection.execute(SignalLegModel.__table__.insert(), rows)
+
+
+@event.listens_for(SignalModel, "after_update")
+def _update_legs(mapper, connection, target):
+
+    attrs = inspect(target).attrs
+    if not any(attrs[field].history.has_changes() for field in LEG_FIELDS):
+        return
+
+    _delete_legs(mapper, connection, target)
+    _insert_legs(mapper, connection, target)
+
+
+@event.listens_for(SignalModel, "after_delete")
+def _delete_legs(mapper, connection, target):
+
+    table = SignalLegModel.__table__
+    connection.execute(table.delete().where(table.c.signal_rowid == target.rowid))
+
+
+def _replace_legs(connection, target, rowid):
+    # legs of the row updated with the values of target
+
+    table = SignalLegModel.__table__
+    connection.execute(table.delete().where(table.c.signal_rowid == rowid))
+
+    rows = SignalLegModel.rows(target, rowid)
+    if rows:
+        connection.execute(table.insert(), rows)
+
+
+@event.listens_for(SignalModel, "after_delete")
+def _delete_executions(mapper, connection, target):
+
+    table = ExecutionModel.__table__
+    connection.execute(table.delete().where(table.c.signal_rowid == target.rowid))
+
+
+@event.listens_for(SignalModel, "after_delete")
+def _delete_keys(mapper, connection, target):
+    # a replay of the webhook registers the signal again
+
+    table = SignalKeyModel.__table__
+    connection.execute(table.delete().where(table.c.signal_rowid == target.rowid))
+    RECENT_KEYS.discard(target.rowid)  # found in the table on a rollback
+
+
+# Slip rollups: the slip of a signal is moved between the daily rollups in the same flush
+
+
+def _rollup_values(target, previous=False) -> dict:
+    # values of the rollup fields, before the flush if previous
+
+    attrs = inspect(target).attrs
+    values = {}
+
+    for field in ROLLUP_FIELDS:
+        history = attrs[field].history
+        if previous and history.has_changes():
+            # None is not kept in the history
+            values[field] = history.deleted[0] if history.deleted else None
+        else:
+            values[field] = getattr(target, field)
+
+    return values
+
+
+def _load_previous(target, value, oldvalue, initiator):
+    pass
+
+
+for _field in ROLLUP_FIELDS:
+    # active history: the previous value is loaded before an expired field is set
+    event.listen(getattr(SignalModel, _field), "set", _load_previous, active_history=True)
+
+
+@event.listens_for(SignalModel, "after_insert")
+def _insert_rollup(mapper, connection, target):
+
+    if inspect(target).dict.get("slip") is not None:
+        SlipRollupModel.add(connection, _rollup_values(target))
+
+
+@event.listens_for(SignalModel, "after_update")
+def _update_rollup(mapper, connection, target):
+
+    attrs = inspect(target).attrs
+    if not any(attrs[field].history.has_changes() for field in ROLLUP_FIELDS):
+        return
+
+    SlipRollupModel.add(connection, _rollup_values(target, previous=True), -1)
+    SlipRollupModel.add(connection, _rollup_values(target))
+
+
+@event.listens_for(SignalModel, "after_delete")
+def _delete_rollup(mapper, connection, target):
+
+    SlipRollupModel.add(connection, _rollup_values(target, previous=True), -1)
+
+
+# Change log: inserted, updated (status changes apart) & deleted signals,
+# see services/models/changes.py
+
+
+@event.listens_for(SignalModel, "after_insert")
+def _log_insert(mapper, connection, target):
+
+    ChangeModel.record(
+        object_session(target), "signal", "insert", loaded_json(target, JSON_ROWS)
+    )
+
+
+@event.listens_for(SignalModel, "after_update")
+def _log_update(mapper, connection, target):
+
+    attrs = inspect(target).attrs
+    if attrs.order_status.history.has_changes():
+        change = "status"
+    elif any(attrs[field].history.has_changes() for field in JSON_FIELDS):
+        change = "update"
+    else:
+        return
+
+    ChangeModel.record(
+        object_session(target), "signal", change, loaded_json(target, JSON_ROWS)
+    )
+
+
+@event.listens_for(SignalModel, "after_delete")
+def _log_delete(mapper, connection, target):
+
+    ChangeModel.record(object_session(target), "signal", "delete", {"rowid": target.rowid})
+
+
+@event.listens_for(Session, "before_flush")
+def _load_logged_fields(session, flush_context, instances):
+    # the changes keep the whole json() of the signals: the columns not loaded
+    # (expired by a commit, sparse fieldsets) are read before the flush
+
+    for target in session.dirty:
+        if not isinstance(target, SignalModel):
+            continue
+
+        unloaded = inspect(target).unloaded.intersection(JSON_FIELDS)
+        if unloaded and session.is_modified(target, include_collections=False):
+            with session.no_autoflush:
+                session.refresh(target, attribute_names=list(unloaded))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _log_bulk_delete(orm_execute_state):
+    # rows deleted without the mapper events: the readers of the changes start over
+
+    mapper = orm_execute_state.bind_mapper
+    if orm_execute_state.is_delete and mapper and mapper.class_ is SignalModel:
+        ChangeModel.record(orm_execute_state.session, "signal", "reset", {})
+
+
+# Order book: loaded again when the tables are created (e.g. a new test database)
+
+
+@event.listens_for(SignalModel.__table__, "after_create")
+@event.listens_for(ChangeModel.__table__, "after_create")
+def _reset_order_book(target, connection, **kw):
+
+    ORDER_BOOK.reset()
@@ -0,0 +1,254 @@
+"""
+Daily slip rollups by ticker (pair or single) and order action
+
+The rows keep the count, sum and sum of squares of the slips of the signals
+of a day, changed in the flush that changes a signal (see the signal mapper
+events), so the slip statistics of a date range read one row per day and
+action instead of every signal.
+"""
+import math
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, Union  # for type hinting
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+from db import db
+
+RollupJSON = Dict[str, Union[str, float, int]]  # custom type hint
+
+# signal columns deciding the rollup row & value of a signal
+ROLLUP_FIELDS = ("slip", "timestamp", "ticker1", "ticker2", "ticker_type", "order_action")
+
+# dialects with INSERT ... ON CONFLICT DO UPDATE
+UPSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+class SlipRollupModel(db.Model):
+    __tablename__ = "slip_rollups"
+    __table_args__ = (
+        db.UniqueConstraint("ticker", "day", "order_action", name="uq_slip_rollups"),
+    )
+
+    rowid = db.Column(
+        db.Integer, primary_key=True, autoincrement=True
+    )  # using 'rowid' as the default key
+    ticker = db.Column(db.String, nullable=False)  # "ticker1-ticker2" or "ticker1"
+    day = db.Column(db.Date, nullable=False)
+    order_action = db.Column(db.String, nullable=False)
+    count = db.Column(db.Integer, default=0)
+    total = db.Column(db.Float, default=0)
+    squares = db.Column(db.Float, default=0)
+
+    def __init__(self, ticker: str, day: date, order_action: str):
+        self.ticker = ticker
+        self.day = day
+        self.order_action = order_action
+
+    def json(self) -> RollupJSON:
+        return {
+            "ticker": self.ticker,
+            "day": str(self.day),
+            "order_action": self.order_action,
+            "count": self.count,
+            "total": self.total,
+            "squares": self.squares,
+        }
+
+    @staticmethod
+    def key(values) -> tuple:
+        # (ticker, day, order_action) of the signal values, None if not rolled up
+
+        if values["slip"] is None or values["timestamp"] is None:
+            return None
+        if not values["ticker1"] or not values["order_action"]:
+            return None
+
+        if values["ticker_type"] == "single":
+            ticker = values["ticker1"]
+        elif values["ticker2"]:
+            ticker = values["ticker1"] + "-" + values["ticker2"]
+        else:
+            return None
+
+        day = values["timestamp"]
+        if isinstance(day, datetime):
+            day = day.date()
+
+        return ticker, day, values["order_action"]
+
+    @classmethod
+    def add(cls, connection, values, sign: int = 1) -> None:
+        # adds (sign=1) or removes (sign=-1) the slip of the signal values
+
+        key = cls.key(values)
+        if key is None:
+            return
+
+        slip = values["slip"]
+        row = {
+            "ticker": key[0],
+            "day": key[1],
+            "order_action": key[2],
+            "count": sign,
+            "total": sign * slip,
+            "squares": sign * slip * slip,
+        }
+
+        table = cls.__table__
+        upsert = UPSERTS.get(connection.dialect.name)
+
+        if upsert:
+            statement = upsert(table).values(row)
+            connection.execute(
+                statement.on_conflict_do_update(
+                    index_elements=["ticker", "day", "order_action"],
+                    set_={
+                        "count": table.c.count + statement.excluded.count,
+                        "total": table.c.total + statement.excluded.total,
+                        "squares": table.c.squares + statement.excluded.squares,
+                    },
+                )
+            )
+            return
+
+        result = connection.execute(
+            table.update()
+            .where(
+                (table.c.ticker == key[0])
+                & (table.c.day == key[1])
+                & (table.c.order_action == key[2])
+            )
+            .values(
+                count=table.c.count + row["count"],
+                total=table.c.total + row["total"],
+                squares=table.c.squares + row["squares"],
+            )
+        )
+        if not result.rowcount:
+            connection.execute(table.insert(), row)
+
+    @classmethod
+    def get_stats(cls, ticker_name, start_day: date, end_day: date, end_date=None) -> dict:
+        # count, avg & stddev of the slips of the days start_day <= day < end_day,
+        # and of the signals stamped at end_date (the signals scan includes the end)
+
+        rows = (
+            db.session.query(
+                cls.order_action,
+                db.func.sum(cls.count),
+                db.func.sum(cls.total),
+                db.func.sum(cls.squares),
+            )
+            .filter(
+                (cls.ticker == ticker_name) & (cls.day >= start_day) & (cls.day < end_day)
+            )
+            .group_by(cls.order_action)
+            .all()
+        )
+        if end_date is not None:
+            rows += cls._stamped_at(ticker_name, end_date)
+
+        sums = {"all": [0, 0, 0], "buy": [0, 0, 0], "sell": [0, 0, 0]}
+        for order_action, count, total, squares in rows:
+            for group in ("all", order_action):
+                if group in sums:
+                    sums[group] = [
+                        sums[group][0] + count,
+                        sums[group][1] + total,
+                        sums[group][2] + squares,
+                    ]
+
+        stats = {}
+        for group, (count, total, squares) in sums.items():
+            avg = total / count if count else None
+
+            # sample standard deviation, as in SignalModel.get_slip_stats
+            stddev = None
+            if count > 1:
+                stddev = math.sqrt(max((squares - count * avg * avg) / (count - 1), 0))
+
+            stats[group] = {"count": count, "avg": avg, "stddev": stddev}
+
+        return stats
+
+    @classmethod
+    def _stamped_at(cls, ticker_name, timestamp) -> list:
+        # (order_action, count, total, squares) of the slips of the signals stamped
+        # at timestamp, selected by the timestamp index only, the few rows of the
+        # other tickers are left out here
+
+        from services.models.signals import SignalModel
+
+        columns = [getattr(SignalModel, field) for field in ROLLUP_FIELDS]
+        query = db.session.query(*columns).filter(SignalModel.timestamp == timestamp)
+
+        rows = []
+        for row in query:
+            key = cls.key(dict(zip(ROLLUP_FIELDS, row)))
+            if key and key[0] == ticker_name:
+                rows.append((key[2], 1, row.slip, row.slip * row.slip))
+
+        return rows
+
+    @classmethod
+    def rebuild(cls) -> int:
+        # rebuilds the rollups from the signals table, returns the number of rows
+
+        from services.models.signals import SignalModel
+
+        sums = defaultdict(lambda: [0, 0, 0])
+        columns = [getattr(SignalModel, field) for field in ROLLUP_FIELDS]
+
+        query = db.session.query(*columns).filter(SignalModel.slip.isnot(None))
+        for row in query.yield_per(1000):
+            key = cls.key(dict(zip(ROLLUP_FIELDS, row)))
+            if key:
+                values = sums[key]
+                values[0] += 1
+                values[1] += row.slip
+                values[2] += row.slip * row.slip
+
+        db.session.query(cls).delete()
+        db.session.bulk_insert_mappings(
+            cls,
+            [
+                {
+                    "ticker": ticker,
+                    "day": day,
+                    "order_action": order_action,
+                    "count": count,
+                    "total": total,
+                    "squares": squares,
+                }
+                for (ticker, day, order_action), (count, total, squares) in sums.items()
+            ],
+        )
+        db.session.commit()
+
+        return len(sums)
+
+    @classmethod
+    def backfill(cls) -> int:
+        # builds the rollups of the signals registered before the slip_rollups table
+
+        if cls.query.first():
+            return 0
+
+        return cls.rebuild()
+
+
+def whole_days(start_date, end_date) -> tuple:
+    # (start_day, end_day) if the dates are midnights (or dates), None otherwise
+
+    days = []
+    for value in (start_date, end_date):
+        if isinstance(value, datetime):
+            if value.time() != datetime.min.time():
+                return None
+            value = value.date()
+        elif not isinstance(value, date):
+            return None
+        days.append(value)
+
+    return tuple(days)
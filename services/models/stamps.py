@@ -0,0 +1,44 @@
+"""Version stamps shared between worker processes"""
+import os
+import tempfile
+import threading
+import time
+
+from app import configs
+
+# stamps are small files, uwsgi workers on the same host see each other's bumps
+STAMP_DIR = configs.get("CACHE", "STAMP_DIR", fallback="") or tempfile.gettempdir()
+
+
+class VersionStamp:
+    """
+    A cross-worker version marker kept as a file.
+    bump() atomically replaces the file, read() is a single stat() call,
+    so checking for changes made by other workers does not touch the database.
+    """
+
+    def __init__(self, name: str, directory: str = None):
+        self.path = os.path.join(directory or STAMP_DIR, "pairs-api-" + name + ".stamp")
+
+    def read(self):
+
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+
+        # os.replace() gives the file a new inode, mtime alone may be too coarse
+        return stat.st_ino, stat.st_mtime_ns
+
+    def bump(self):
+
+        temp_path = "{}.{}.{}".format(self.path, os.getpid(), threading.get_ident())
+
+        try:
+            with open(temp_path, "w") as stamp_file:
+                stamp_file.write(str(time.time_ns()))
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print("Stamp error occurred - ", e)
+
+        return self.read()
@@ -0,0 +1,104 @@
+"""
+Change watermarks of the polled tables.
+Each table has a version stamp, bumped after a commit that inserted, changed
+or deleted its rows, so the caches of the worker (registry, sessions, order
+book) compare the stamps (a stat() each) instead of reading the tables.
+The tables served with ETags also get their version in the database bumped
+by the same commit (see services/models/table_versions.py).
+"""
+from itertools import chain
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from services.models.stamps import VersionStamp
+from services.models.table_versions import VERSIONED_TABLES, TableVersionModel
+
+# tables served with ETags, the change log & the sessions (cached lookups, see services/models/session.py)
+TABLE_STAMPS = {
+    name: VersionStamp("table-" + name)
+    for name in ("signals", "tickers", "pairs", "changes", "simplesession")
+}
+
+
+# functions called after the commits that changed a table, in the committing worker
+_LISTENERS = {name: [] for name in TABLE_STAMPS}
+
+
+def add_listener(name: str, listener) -> None:
+    _LISTENERS[name].append(listener)
+
+
+def mark_changed(session, name: str) -> None:
+    # tables written with the connection of the session, not seen by the flush
+
+    session.info.setdefault("changed_tables", set()).add(name)
+
+
+def read_stamps(tables) -> tuple:
+    # current stamps of the tables, None for the ones never changed
+
+    return tuple(TABLE_STAMPS[name].read() for name in tables)
+
+
+# Watermarks: collect the changed tables during the flush, bump them after the commit
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_table_changes(session, flush_context):
+
+    tables = session.info.setdefault("changed_tables", set())
+
+    for obj in chain(session.new, session.deleted):
+        tables.add(obj.__tablename__)
+
+    for obj in session.dirty:
+        if session.is_modified(obj, include_collections=False):
+            tables.add(obj.__tablename__)
+
+    tables.intersection_update(TABLE_STAMPS)
+    if not tables:
+        session.info.pop("changed_tables")
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_table_bulk_changes(orm_execute_state):
+
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+
+    mapper = orm_execute_state.bind_mapper
+    if mapper and mapper.local_table.name in TABLE_STAMPS:
+        tables = orm_execute_state.session.info.setdefault("changed_tables", set())
+        tables.add(mapper.local_table.name)
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_table_versions(session):
+
+    if session.in_nested_transaction():
+        return  # bumped once, by the commit of the root transaction
+
+    session.flush()  # collects the changes still pending
+    names = session.info.get("changed_tables", set()).intersection(VERSIONED_TABLES)
+    if names:
+        TableVersionModel.bump(session.connection(), names)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_table_stamps(session):
+
+    names = session.info.pop("changed_tables", ())
+    for name in names:
+        TABLE_STAMPS[name].bump()
+
+    # after all the stamps: a listener may read the ones of the other tables
+    for name in names:
+        for listener in _LISTENERS[name]:
+            listener()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_table_changes(session):
+
+    session.info.pop("changed_tables", None)
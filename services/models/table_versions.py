@@ -0,0 +1,74 @@
+"""
+Versions of the tables served with ETags, kept in the database
+
+The commit that changes one of VERSIONED_TABLES increments its row of
+table_versions in the same transaction (see table_stamps.py), so every
+worker and host reads the same version for the same data, whatever their
+local stamp files. The conditional GETs read them with one small query,
+before the rows of the resource are read or serialized.
+"""
+from typing import Dict, Union  # for type hinting
+
+from sqlalchemy import event
+from sqlalchemy.sql import func
+
+from db import db
+
+VersionJSON = Dict[str, Union[str, int]]  # custom type hint
+
+# tables served with ETags (see services/resources/conditional.py)
+VERSIONED_TABLES = ("signals", "tickers", "pairs")
+
+
+class TableVersionModel(db.Model):
+    __tablename__ = "table_versions"
+
+    rowid = db.Column(
+        db.Integer, primary_key=True, autoincrement=True
+    )  # using 'rowid' as the default key
+    name = db.Column(db.String, unique=True, nullable=False)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    # clock of the database: the same for all the hosts
+    modified = db.Column(
+        db.DateTime(timezone=False), server_default=func.current_timestamp()
+    )
+
+    def json(self) -> VersionJSON:
+        return {
+            "name": self.name,
+            "version": self.version,
+            "modified": str(self.modified),
+        }
+
+    @classmethod
+    def read(cls, tables) -> tuple:
+        # (version, modified) of the tables, None for the ones without a row
+
+        rows = dict(
+            (row.name, (row.version, row.modified))
+            for row in db.session.query(cls.name, cls.version, cls.modified).filter(
+                cls.name.in_(tables)
+            )
+        )
+        return tuple(rows.get(name) for name in tables)
+
+    @classmethod
+    def bump(cls, connection, tables) -> None:
+        # increments the versions of the tables, in the transaction of the connection
+
+        table = cls.__table__
+        for name in sorted(tables):  # rows locked in one order
+            result = connection.execute(
+                table.update()
+                .where(table.c.name == name)
+                .values(version=table.c.version + 1, modified=func.current_timestamp())
+            )
+            if not result.rowcount:
+                connection.execute(table.insert(), {"name": name, "version": 1})
+
+
+@event.listens_for(TableVersionModel.__table__, "after_create")
+def _insert_versions(target, connection, **kw):
+    # a row per table, so that the commits update it & never insert it at once
+
+    connection.execute(target.insert(), [{"name": name, "version": 0} for name in VERSIONED_TABLES])
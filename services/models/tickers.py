@@ -1,8 +1,20 @@
 from typing import Dict, List, Union  # for type hinting
 from db import db
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import load_only, object_session
+from services.models.updates import update_row
+from services.models.rows import JSONRows
+from services.models.changes import ChangeModel, loaded_json
 
 TickerJSON = Dict[str, Union[str, int, float]]  # custom type hint
 
+# columns written by update()
+UPDATE_FIELDS = ("sectype", "xch", "prixch", "currency", "order_type", "active")
+PNL_FIELDS = ("active_pos", "active_pnl", "active_cost")
+
+# keys of json(), the columns a sparse fieldset (?fields=) can select
+JSON_FIELDS = ("symbol",) + UPDATE_FIELDS + PNL_FIELDS
+
 
 class TickerModel(db.Model):
     __tablename__ = "tickers"
@@ -47,7 +59,11 @@ class TickerModel(db.Model):
         self.active_pnl = active_pnl
         self.active_cost = active_cost
 
-    def json(self) -> TickerJSON:
+    def json(self, fields=None) -> TickerJSON:
+        if fields is not None:
+            # sparse fieldset, the other columns may not be loaded
+            return {field: getattr(self, field) for field in fields}
+
         return {
             "symbol": self.symbol,
             "sectype": self.sectype,
@@ -62,9 +78,11 @@ class TickerModel(db.Model):
         }
 
     @classmethod
-    def find_by_symbol(cls, symbol: str) -> "TickerModel":
+    def find_by_symbol(cls, symbol: str, fields=None) -> "TickerModel":
+
+        query = cls.query if fields is None else cls.query.options(load_only(*fields))
 
-        return cls.query.filter_by(symbol=symbol).first()
+        return query.filter_by(symbol=symbol).first()
 
         # KEEPING THE SQL CODE THAT FUNCTIONS THE SAME FOR COMPARISON PURPOSES:
 
@@ -118,20 +136,11 @@ class TickerModel(db.Model):
 
     def update(self, update_pnl: bool) -> None:
 
-        item_to_update = self.query.filter_by(symbol=self.symbol).first()
-
-        item_to_update.sectype = self.sectype
-        item_to_update.xch = self.xch
-        item_to_update.prixch = self.prixch
-        item_to_update.currency = self.currency
-        item_to_update.order_type = self.order_type
-        item_to_update.active = self.active
-
-        if update_pnl:
-            item_to_update.active_pos = self.active_pos
-            item_to_update.active_pnl = self.active_pnl
-            item_to_update.active_cost = self.active_cost
+        columns = UPDATE_FIELDS + PNL_FIELDS if update_pnl else UPDATE_FIELDS
 
+        if update_row(self, "symbol", self.symbol, columns) and update_pnl:
+            # written without the mapper events
+            ChangeModel.record(db.session(), "ticker", "pnl", loaded_json(self, JSON_ROWS))
         db.session.commit()
 
         # KEEPING THE SQL CODE THAT FUNCTIONS THE SAME FOR COMPARISON PURPOSES:
@@ -156,13 +165,17 @@ class TickerModel(db.Model):
         #         connection.close()
 
     @classmethod
-    def get_rows(cls, number_of_items: str) -> List:
+    def get_rows(
+        cls, number_of_items: str, before: int = None, fields=None, rows: bool = False
+    ) -> List:
+        query = cls.query if before is None else cls.query.filter(cls.rowid < before)
+        query = JSON_ROWS.project(query, fields, rows)
 
         if number_of_items == "0":
             # return cls.query.order_by(desc("rowid")).all() # needs from sqlalchemy import desc
-            return cls.query.order_by(cls.rowid.desc())  # better, no need to import
+            return query.order_by(cls.rowid.desc())  # better, no need to import
         else:
-            return cls.query.order_by(cls.rowid.desc()).limit(number_of_items).all()
+            return query.order_by(cls.rowid.desc()).limit(number_of_items).all()
 
         # KEEPING THE SQL CODE THAT FUNCTIONS THE SAME FOR COMPARISON PURPOSES:
 
@@ -243,3 +256,20 @@ class TickerModel(db.Model):
             return cls.query.filter(cls.active == -1)
         else:
             return cls.query.filter(cls.active == -1).limit(number_of_items).all()
+
+
+# row tuples of the list resources, mapped to the json() dicts
+JSON_ROWS = JSONRows(TickerModel, JSON_FIELDS)
+
+
+# Change log: PNL updates, see services/models/changes.py
+
+
+@event.listens_for(TickerModel, "after_update")
+def _log_pnl(mapper, connection, target):
+
+    attrs = inspect(target).attrs
+    if any(attrs[field].history.has_changes() for field in PNL_FIELDS):
+        ChangeModel.record(
+            object_session(target), "ticker", "pnl", loaded_json(target, JSON_ROWS)
+        )
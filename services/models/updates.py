@@ -0,0 +1,44 @@
+"""
+Updates of a single row by key, shared by the models
+"""
+from sqlalchemy import inspect, update
+from sqlalchemy.orm.exc import NoResultFound
+
+from db import db
+
+
+def update_row(item, key: str, value, columns) -> bool:
+    """
+    Writes the columns of item to the row with key == value, the caller commits.
+    An item loaded from the same row is flushed, which updates the changed columns only.
+    Other items (e.g. built from the request arguments) are written with a single
+    UPDATE ... SET <columns> WHERE <key> = ? without selecting the row first.
+    Returns True for the latter, as bulk updates skip the mapper events.
+    """
+
+    state = inspect(item)
+
+    if state.persistent and getattr(item, key) == value:
+        db.session.flush()
+        return False
+
+    model = type(item)
+    statement = (
+        update(model)
+        .where(getattr(model, key) == value)
+        .values({column: getattr(item, column) for column in columns})
+        # loaded copies of the row are expired by the commit of the caller,
+        # evaluating them here would select the expired ones first
+        .execution_options(synchronize_session=False)
+    )
+
+    # the returned keys are the matched rows, rowcount is used without RETURNING
+    if db.engine.dialect.full_returning:
+        matched = len(db.session.execute(statement.returning(getattr(model, key))).all())
+    else:
+        matched = db.session.execute(statement).rowcount
+
+    if not matched:
+        raise NoResultFound("no row to update with {} {}".format(key, value))
+
+    return True
@@ -1,5 +1,6 @@
 from typing import Dict, List  # for type hinting
 from db import db
+from services.models.updates import update_row
 
 UserJSON = Dict[str, str]  # custom type hint
 
@@ -76,10 +77,7 @@ class UserModel(db.Model):
 
     def update(self) -> None:
 
-        item_to_update = self.query.filter_by(username=self.username).first()
-
-        item_to_update.password = self.password
-
+        update_row(self, "username", self.username, ("password",))
         db.session.commit()
 
         # # KEEPING THE SQL CODE THAT FUNCTIONS THE SAME FOR COMPARISON PURPOSES:
@@ -0,0 +1,254 @@
+"""
+Durable local queue of the accepted webhooks.
+Used by the asynchronous webhook mode: the request is answered as soon as
+the payload is on disk, a pool of worker threads inserts the signals later.
+"""
+import json
+import sqlite3
+import threading
+import time
+import uuid
+
+from app import configs
+
+QUEUE_PATH = configs.get("WEBHOOK", "QUEUE_PATH", fallback="webhook_queue.db")
+QUEUE_WORKERS = configs.getint("WEBHOOK", "QUEUE_WORKERS", fallback=2)
+# processed receipts are kept for the status endpoint
+QUEUE_RETENTION_HOURS = configs.getint("WEBHOOK", "QUEUE_RETENTION_HOURS", fallback=24)
+# items processing longer than this are assumed to belong to a stopped worker
+STALE_SECONDS = 300
+# message of the stale items that are not processed again
+STALE_ERR = "processing interrupted, not retried without an idempotency key."
+
+# seconds to wait for new items, a put() in the same process wakes the workers earlier
+POLL_INTERVAL = 0.5
+
+CREATE_SQL = """
+CREATE TABLE IF NOT EXISTS webhook_queue (
+    receipt TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    signal_rowid INTEGER,
+    code INTEGER,
+    message TEXT,
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+)
+"""
+INDEX_SQL = (
+    "CREATE INDEX IF NOT EXISTS webhook_queue_status "
+    "ON webhook_queue (status, created)"
+)
+
+
+class WebhookQueue:
+    """
+    Receipts go through 'queued' -> 'processing' -> 'done'.
+    The queue is a SQLite file in WAL mode, shared by the workers of the host.
+    claim() takes the oldest queued item inside an immediate transaction,
+    so one item is never processed twice.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._ready = threading.Event()  # set by put()
+
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(CREATE_SQL)
+        connection.execute(INDEX_SQL)
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections are not shared between threads
+
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+            self._local.connection = connection
+        return connection
+
+    def put(self, payload: dict) -> str:
+
+        receipt = uuid.uuid4().hex
+        now = time.time()
+
+        self._connection().execute(
+            "INSERT INTO webhook_queue (receipt, payload, status, created, updated) "
+            "VALUES (?, ?, 'queued', ?, ?)",
+            (receipt, json.dumps(payload), now, now),
+        )
+        self._ready.set()
+
+        return receipt
+
+    def claim(self):
+        # returns (receipt, payload) of the oldest queued item or None
+
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT receipt, payload FROM webhook_queue WHERE status = 'queued' "
+                "ORDER BY created LIMIT 1"
+            ).fetchone()
+            if row:
+                connection.execute(
+                    "UPDATE webhook_queue SET status = 'processing', updated = ? "
+                    "WHERE receipt = ?",
+                    (time.time(), row["receipt"]),
+                )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+        if row:
+            return row["receipt"], json.loads(row["payload"])
+        return None
+
+    def done(self, receipt: str, signal_rowid, code: int, message: str) -> None:
+
+        self._connection().execute(
+            "UPDATE webhook_queue SET status = 'done', signal_rowid = ?, code = ?, "
+            "message = ?, updated = ? WHERE receipt = ?",
+            (signal_rowid, code, message, time.time(), receipt),
+        )
+
+    def find(self, receipt: str):
+
+        row = (
+            self._connection()
+            .execute(
+                "SELECT receipt, status, signal_rowid, code, message "
+                "FROM webhook_queue WHERE receipt = ?",
+                (receipt,),
+            )
+            .fetchone()
+        )
+        return dict(row) if row else None
+
+    def requeue(self, retryable=None, seconds: int = STALE_SECONDS) -> int:
+        # items left in 'processing' by a stopped worker are processed again if
+        # retryable(payload), i.e. a second run cannot insert a duplicate,
+        # the others are failed, returns the number of the requeued items
+
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            rows = connection.execute(
+                "SELECT receipt, payload FROM webhook_queue "
+                "WHERE status = 'processing' AND updated < ?",
+                (time.time() - seconds,),
+            ).fetchall()
+
+            requeued = 0
+            for row in rows:
+                if retryable and retryable(json.loads(row["payload"])):
+                    connection.execute(
+                        "UPDATE webhook_queue SET status = 'queued', updated = ? "
+                        "WHERE receipt = ?",
+                        (time.time(), row["receipt"]),
+                    )
+                    requeued += 1
+                else:
+                    connection.execute(
+                        "UPDATE webhook_queue SET status = 'done', code = 500, "
+                        "message = ?, updated = ? WHERE receipt = ?",
+                        (STALE_ERR, time.time(), row["receipt"]),
+                    )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+        return requeued
+
+    def prune(self, hours: int = QUEUE_RETENTION_HOURS) -> int:
+
+        cursor = self._connection().execute(
+            "DELETE FROM webhook_queue WHERE status = 'done' AND updated < ?",
+            (time.time() - hours * 3600,),
+        )
+        return cursor.rowcount
+
+    def wait(self, timeout: float) -> None:
+
+        self._ready.wait(timeout)
+        self._ready.clear()
+
+    def rollback(self) -> None:
+        # ends a transaction left open by an error
+
+        connection = self._connection()
+        if connection.in_transaction:
+            connection.execute("ROLLBACK")
+
+
+class WebhookWorkers:
+    """
+    Pool of daemon threads draining the queue.
+    handler(payload) returns (signal_rowid, code, message) and is called
+    inside an application context. retryable(payload) tells the stale items
+    that can be processed again (see WebhookQueue.requeue).
+    """
+
+    def __init__(
+        self, queue: WebhookQueue, handler, workers: int = QUEUE_WORKERS, retryable=None
+    ):
+        self.queue = queue
+        self.handler = handler
+        self.workers = workers
+        self.retryable = retryable
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def start(self, app) -> None:
+
+        with self._lock:
+            if self._threads:
+                return  # already running
+
+            for number in range(self.workers):
+                thread = threading.Thread(
+                    target=self._run,
+                    args=(app,),
+                    name="webhook-worker-{}".format(number),
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def _run(self, app) -> None:
+
+        last_cleanup = 0
+
+        while True:
+            try:
+                item = self.queue.claim()
+
+                if item is None:
+                    if time.time() - last_cleanup > STALE_SECONDS:
+                        last_cleanup = time.time()
+                        self.queue.requeue(self.retryable)
+                        self.queue.prune()
+                    self.queue.wait(POLL_INTERVAL)
+                    continue
+
+                receipt, payload = item
+
+                with app.app_context():
+                    try:
+                        signal_rowid, code, message = self.handler(payload)
+                    except Exception as e:
+                        print("Error occurred - ", e)
+                        signal_rowid, code, message = None, 500, str(e)
+
+                self.queue.done(receipt, signal_rowid, code, message)
+
+            except Exception as e:
+                # e.g. a locked queue file, the worker goes on with the next item
+                print("Queue error occurred - ", e)
+                self.queue.rollback()
+                time.sleep(POLL_INTERVAL)
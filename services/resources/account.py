@@ -1,8 +1,12 @@
 from flask_restful import Resource, reqparse
-from services.models.account import AccountModel
+from services.models.account import AccountModel, JSON_ROWS
 from services.models.signals import SignalModel
 from flask_jwt_extended import get_jwt_identity, jwt_required, get_jwt
 from datetime import datetime
+from functools import partial
+from .pagination import page_args, paginate
+from .streaming import stream_json
+from .encoder import json_response
 from . import status_codes as status
 
 EMPTY_ERR = "'{}' cannot be empty!"
@@ -125,6 +129,7 @@ class PNLList(Resource):
     def get(number_of_items="0"):
 
         username = get_jwt_identity()
+        before, number_of_items = page_args(number_of_items)
 
         # limit the number of items to get if not logged-in
         notoken_limit = 5
@@ -137,7 +142,20 @@ class PNLList(Resource):
             else:
                 number_of_items = min(int(number_of_items), notoken_limit)
         try:
-            items = AccountModel.get_rows(str(number_of_items))
+            # full list: streamed while the rows are read
+            if number_of_items == "0":
+                return stream_json(
+                    "pnls",
+                    partial(AccountModel.get_rows, rows=True),
+                    before,
+                    to_json=JSON_ROWS.json,
+                    notoken_limit=notoken_limit,
+                    next_cursor=None,
+                )
+
+            items, next_cursor = paginate(
+                partial(AccountModel.get_rows, rows=True), number_of_items, before
+            )
 
         except Exception as e:
             print("Error occurred - ", e)
@@ -147,10 +165,13 @@ class PNLList(Resource):
             )  # Return Interval Server Error
 
         # return {'signals': list(map(lambda x: x.json(), items))}  # we can map the list of objects,
-        return {
-            "pnls": [item.json() for item in items],
-            "notoken_limit": notoken_limit,
-        }  # this is more readable
+        return json_response(
+            {
+                "pnls": [JSON_ROWS.json(item) for item in items],
+                "notoken_limit": notoken_limit,
+                "next_cursor": next_cursor,
+            }
+        )  # row tuples, no model instances
 
 
 class PNL(Resource):
@@ -0,0 +1,75 @@
+"""
+Conditional GETs of the polled resources: ETag / If-None-Match
+
+The ETag is derived from the versions of the tables read by the resource,
+kept in the database (see services/models/table_versions.py), the requested
+URL and the logged-in user, so an unchanged poll gets 304 Not Modified before
+the rows are read or serialized, from any worker or host. Last-Modified is
+sent as a hint, only the ETag is compared: the tables change more often than
+once a second.
+"""
+import functools
+import hashlib
+from datetime import timezone
+
+from flask import Response, request
+from flask_jwt_extended import get_jwt_identity
+from werkzeug.http import http_date, quote_etag
+
+from services.models.table_versions import TableVersionModel
+from . import status_codes as status
+
+
+def _identity():
+    # username if the resource checked the token, lists are shorter without one
+
+    try:
+        return get_jwt_identity()
+    except RuntimeError:
+        return None
+
+
+def conditional(*tables):
+    # decorator of the get methods, tables: the tables the response is read from
+
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+
+            # the modified time tells apart the versions of a recreated database
+            versions = TableVersionModel.read(tables)
+            key = repr((versions, request.full_path, _identity()))
+            etag = hashlib.sha1(key.encode()).hexdigest()
+
+            headers = {"ETag": quote_etag(etag, weak=True)}
+            modified = [version[1] for version in versions if version and version[1]]
+            if modified:
+                headers["Last-Modified"] = http_date(
+                    max(modified).replace(tzinfo=timezone.utc)
+                )
+
+            if request.if_none_match.contains_weak(etag):
+                return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+            return _with_headers(function(*args, **kwargs), headers)
+
+        return wrapper
+
+    return decorator
+
+
+def _with_headers(result, headers):
+    # adds the headers to the successful responses only
+
+    if isinstance(result, Response):
+        if result.status_code == status.HTTP_200_OK:
+            result.headers.extend(headers)
+        return result
+
+    if not isinstance(result, tuple):
+        return result, status.HTTP_200_OK, headers
+
+    if len(result) == 2 and result[1] == status.HTTP_200_OK:
+        return result[0], result[1], headers
+
+    return result
@@ -0,0 +1,37 @@
+"""
+JSON encoding of the list responses
+
+orjson encodes the lists several times faster than json.dumps, so it is
+used whenever it is installed. Its output is the same JSON, but compact, with
+unescaped non-ASCII characters & NaN as null (json.dumps writes NaN, which
+JSON.parse refuses). With ORJSON = False in config.ini, or without orjson,
+the body is the one of the flask_restful representation, byte for byte:
+json.dumps(data) + "\n".
+"""
+import json
+
+from flask import Response
+
+from app import configs
+
+# faster, not byte for byte compatible encoding of the lists, if installed
+ORJSON = configs.getboolean("STREAM", "ORJSON", fallback=True)
+
+try:
+    import orjson
+except ImportError:  # optional, json.dumps without it
+    orjson = None
+
+
+def dumps(data) -> str:
+
+    if ORJSON and orjson is not None:
+        return orjson.dumps(data).decode()
+
+    return json.dumps(data)
+
+
+def json_response(data, status_code: int = 200) -> Response:
+    # a flask_restful resource returns the response as it is
+
+    return Response(dumps(data) + "\n", status=status_code, mimetype="application/json")
@@ -0,0 +1,186 @@
+"""
+Server-Sent Events stream of the change log (see services/models/changes.py)
+
+One open stream replaces the polling of the signal, ticker & PNL lists:
+inserted, updated & deleted signals, ticker PNL updates & account PNL records
+are sent as they are committed, with the change sequence number as event id.
+A reconnecting client (EventSource) sends it back in 'Last-Event-ID' and
+gets the changes it missed first. The changes are committed in seq order
+(see lock_log), so no change is skipped going on from the last event id.
+Without a token, only the signal changes are sent, in smaller batches, and
+the streams are limited to [EVENTS] NOTOKEN_STREAMS of the MAX_STREAMS,
+leaving the other ones to the logged-in clients.
+"""
+import threading
+import time
+
+from flask import Response, request, stream_with_context
+from flask_restful import Resource
+from flask_jwt_extended import get_jwt_identity, jwt_required
+
+from app import configs
+from db import db
+from services.models.changes import ChangeModel, TOPICS
+from services.models.notifier import CHANGE_EVENTS, HELD_THREADS, MAX_STREAMS
+from . import status_codes as status
+
+GET_ERR = "an error occurred while getting the item(s)."
+TOPICS_ERR = "unknown topic(s): {}."
+ID_ERR = "event id should be an integer."
+BUSY_ERR = "too many event streams, retry later."
+TOKEN_ERR = "a token is required for the topic(s): {}."
+
+# seconds between the comments sent to keep an idle stream open
+HEARTBEAT = configs.getfloat("EVENTS", "HEARTBEAT", fallback=15)
+# seconds before a stream is ended, the client reconnects with the last event id
+STREAM_DURATION = configs.getfloat("EVENTS", "STREAM_DURATION", fallback=300)
+# changes read at once
+BATCH_SIZE = configs.getint("EVENTS", "BATCH_SIZE", fallback=100)
+# streams allowed at once without a token, at least one is left to the logged-in clients
+NOTOKEN_STREAMS = min(
+    configs.getint("EVENTS", "NOTOKEN_STREAMS", fallback=1), max(MAX_STREAMS - 1, 0)
+)
+# reconnection delay sent to the clients, in milliseconds
+RETRY_MS = 3000
+
+# topics sent without a token
+NOTOKEN_TOPICS = ("signal",)
+
+STREAMS = threading.BoundedSemaphore(MAX_STREAMS)
+NOTOKEN = threading.BoundedSemaphore(NOTOKEN_STREAMS)
+
+
+def acquire_stream(notoken: bool = False) -> bool:
+    # a stream holds a request thread for STREAM_DURATION, shared with the long polls
+
+    if notoken and not NOTOKEN.acquire(blocking=False):
+        return False
+
+    if STREAMS.acquire(blocking=False):
+        if HELD_THREADS.acquire():
+            return True
+        STREAMS.release()
+
+    if notoken:
+        NOTOKEN.release()
+    return False
+
+
+def release_stream(notoken: bool = False) -> None:
+
+    HELD_THREADS.release()
+    STREAMS.release()
+    if notoken:
+        NOTOKEN.release()
+
+
+def format_event(row) -> str:
+
+    return "id: {}\nevent: {}.{}\ndata: {}\n\n".format(
+        row.seq, row.topic, row.event, row.data
+    )
+
+
+class EventStream(Resource):
+    @staticmethod
+    @jwt_required(optional=True)
+    def get():
+
+        username = get_jwt_identity()
+        notoken = username is None
+
+        # ?topics=signal,ticker,pnl (all the allowed ones by default)
+        topics = request.args.get("topics")
+        if topics:
+            topics = tuple(topics.split(","))
+        else:
+            topics = NOTOKEN_TOPICS if notoken else TOPICS
+
+        unknown = [topic for topic in topics if topic not in TOPICS]
+        if unknown:
+            return (
+                {"message": {"topics": TOPICS_ERR.format(", ".join(unknown))}},
+                status.HTTP_400_BAD_REQUEST,
+            )  # return Bad Request
+
+        refused = [topic for topic in topics if topic not in NOTOKEN_TOPICS]
+        if notoken and refused:
+            return (
+                {"message": {"topics": TOKEN_ERR.format(", ".join(refused))}},
+                status.HTTP_401_UNAUTHORIZED,
+            )  # return Unauthorized
+
+        # limit the number of changes read at once if not logged-in
+        notoken_limit = 20
+        batch_size = min(BATCH_SIZE, notoken_limit) if notoken else BATCH_SIZE
+
+        # the header of a reconnecting EventSource, the argument for the first connection
+        last_id = request.headers.get("Last-Event-ID", request.args.get("last_event_id"))
+        try:
+            seq = int(last_id) if last_id else None
+        except ValueError:
+            return (
+                {"message": {"Last-Event-ID": ID_ERR}},
+                status.HTTP_400_BAD_REQUEST,
+            )  # return Bad Request
+
+        if not acquire_stream(notoken):
+            return (
+                {"message": BUSY_ERR},
+                status.HTTP_503_SERVICE_UNAVAILABLE,
+                {"Retry-After": str(RETRY_MS // 1000)},
+            )  # return Service Unavailable
+
+        try:
+            if seq is None:
+                seq = ChangeModel.last_seq()  # the changes after the connection only
+                db.session.close()
+
+        except Exception as e:
+            release_stream(notoken)
+            print("Error occurred - ", e)
+            return (
+                {"message": GET_ERR},
+                status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )  # Return Interval Server Error
+
+        def check():
+            rows = ChangeModel.get_after(seq, topics, batch_size)
+            db.session.close()  # no connection kept while waiting
+            return rows
+
+        def generate():
+            nonlocal seq
+
+            yield "retry: {}\n\n".format(RETRY_MS)
+
+            deadline = time.monotonic() + STREAM_DURATION
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+
+                try:
+                    rows = CHANGE_EVENTS.wait_for(check, min(remaining, HEARTBEAT))
+
+                except Exception as e:
+                    # the status is already sent, the client reconnects
+                    print("Error occurred - ", e)
+                    raise
+
+                if not rows:
+                    yield ": keep-alive\n\n"
+                    continue
+
+                yield "".join(format_event(row) for row in rows)
+                seq = rows[-1].seq
+
+        response = Response(
+            stream_with_context(generate()),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+        # also when the client leaves before the first event
+        response.call_on_close(lambda: release_stream(notoken))
+
+        return response
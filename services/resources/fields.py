@@ -0,0 +1,27 @@
+"""
+Sparse fieldsets of the signal, ticker & pair responses: ?fields=<key>,<key>
+
+The listed json keys are the only columns selected from the database
+(load_only, the primary key is always read) and the only keys of the items.
+Without ?fields= the items have all their keys.
+"""
+from flask import request
+
+
+def fields_arg(json_fields) -> tuple:
+    # json_fields: keys of the model json(), returns the fields (None for all)
+    # & the unknown ones
+
+    value = request.args.get("fields")
+    if not value:
+        return None, []
+
+    fields = []
+    for field in value.split(","):
+        field = field.strip()
+        if field and field not in fields:
+            fields.append(field)
+
+    unknown = [field for field in fields if field not in json_fields]
+
+    return fields or None, unknown
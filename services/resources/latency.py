@@ -0,0 +1,73 @@
+from functools import wraps
+from flask_restful import Resource
+from flask_jwt_extended import jwt_required, get_jwt
+from services.models.latency import LATENCY, StageTimer
+from app import configs
+from . import status_codes as status
+
+PRIV_ERR = "'{}' privilege required."
+RESET_OK = "latency statistics reset."
+
+# attach the stage durations to the responses of the timed endpoints
+SERVER_TIMING = configs.getboolean("STATS", "SERVER_TIMING", fallback=False)
+
+
+def timed(endpoint: str):
+    # records the stages of a resource method, see services.models.latency.stage
+
+    def decorator(method):
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+
+            with StageTimer(endpoint) as timer:
+                response = method(*args, **kwargs)
+
+            if not SERVER_TIMING:
+                return response
+
+            # flask_restful accepts data, (data, code) or (data, code, headers)
+            if not isinstance(response, tuple):
+                response = (response, 200)
+            if len(response) == 2:
+                response = response + ({},)
+
+            data, code, headers = response
+            # the total is added when the timer finishes
+            return data, code, dict(headers, **{"Server-Timing": timer.server_timing()})
+
+        return wrapper
+
+    return decorator
+
+
+class Latency(Resource):
+    @staticmethod
+    @jwt_required()
+    def get():
+
+        claims = get_jwt()
+
+        if not claims["is_admin"]:
+            return (
+                {"message": PRIV_ERR.format("admin")},
+                status.HTTP_401_UNAUTHORIZED,
+            )  # Return Unauthorized
+
+        # p50, p95, p99 and max in milliseconds
+        return {"stages": LATENCY.json()}
+
+    @staticmethod
+    @jwt_required(fresh=True)  # need fresh token
+    def delete():
+
+        claims = get_jwt()
+
+        if not claims["is_admin"]:
+            return (
+                {"message": PRIV_ERR.format("admin")},
+                status.HTTP_401_UNAUTHORIZED,
+            )  # Return Unauthorized
+
+        LATENCY.reset()
+
+        return {"message": RESET_OK}
@@ -0,0 +1,40 @@
+"""
+Keyset pagination of the list resources: ?before=<rowid>&limit=<n>
+
+Lists are ordered by rowid (newest first), the next page starts below the
+last rowid of the current one, so a deep page reads the same number of rows
+as the first page. "next_cursor" is the 'before' value of the next page,
+None on the last page.
+"""
+from flask import request
+
+
+def page_args(number_of_items) -> tuple:
+    # returns before & the number of items, ?limit= replaces the number of the path
+
+    before = request.args.get("before", type=int)
+    limit = request.args.get("limit", type=int)
+
+    if limit is not None and limit >= 0:
+        number_of_items = limit
+
+    return before, str(number_of_items)
+
+
+def paginate(get_items, number_of_items, before) -> tuple:
+    # get_items(number_of_items, before): a get_rows/get_list_* model helper,
+    # returns the items & next_cursor
+
+    if str(number_of_items) == "0":
+        return list(get_items("0", before)), None
+
+    limit = int(number_of_items)
+
+    # one more row tells if there is a next page
+    items = list(get_items(str(limit + 1), before))
+
+    if len(items) > limit:
+        items = items[:limit]
+        return items, items[-1].rowid if items else None
+
+    return items, None
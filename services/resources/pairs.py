@@ -1,7 +1,12 @@
 from flask_restful import Resource, reqparse
-from services.models.pairs import PairModel
+from functools import partial
+from services.models.pairs import PairModel, JSON_FIELDS, JSON_ROWS
 from flask_jwt_extended import jwt_required, get_jwt
 from services.models.tickers import TickerModel
+from .pagination import page_args, paginate
+from .fields import fields_arg
+from .encoder import json_response
+from .conditional import conditional
 from . import status_codes as status
 
 EMPTY_ERR = "'{}' cannot be empty!"
@@ -15,6 +20,7 @@ CREATE_OK = "'{}' created successfully."
 DELETE_OK = "'{}' deleted successfully."
 NOT_FOUND = "item not found."
 PRIV_ERR = "'{}' privilege required."
+FIELDS_ERR = "unknown field(s): {}."
 STK_ERR = " one of the tickers is already active!"
 
 
@@ -154,9 +160,22 @@ class PairRegister(Resource):
 
 class PairList(Resource):
     @staticmethod
+    @conditional("pairs")
     def get(number_of_items="0"):
+        before, number_of_items = page_args(number_of_items)
+        fields, unknown = fields_arg(JSON_FIELDS)
+        if unknown:
+            return (
+                {"message": {"fields": FIELDS_ERR.format(", ".join(unknown))}},
+                status.HTTP_400_BAD_REQUEST,
+            )  # Return Bad Request
+
         try:
-            items = PairModel.get_rows(number_of_items)
+            items, next_cursor = paginate(
+                partial(PairModel.get_rows, fields=fields, rows=True),
+                number_of_items,
+                before,
+            )
 
         except Exception as e:
             print("Error occurred - ", e)
@@ -166,17 +185,27 @@ class PairList(Resource):
             )  # Return Interval Server Error
 
         # return {'pairs': list(map(lambda x: x.json(), items))}  # we can map the list of objects,
-        return {
-            "pairs": [item.json() for item in items]
-        }  # but this one is slightly more readable
+        return json_response(
+            {
+                "pairs": [JSON_ROWS.json(item, fields) for item in items],
+                "next_cursor": next_cursor,
+            }
+        )  # row tuples, no model instances
 
 
 class Pair(Resource):
     @staticmethod
+    @conditional("pairs")
     def get(name):
+        fields, unknown = fields_arg(JSON_FIELDS)
+        if unknown:
+            return (
+                {"message": {"fields": FIELDS_ERR.format(", ".join(unknown))}},
+                status.HTTP_400_BAD_REQUEST,
+            )  # Return Bad Request
 
         try:
-            item = PairModel.find_by_name(name)
+            item = PairModel.find_by_name(name, fields)
 
         except Exception as e:
             print("Error occurred - ", e)
@@ -186,7 +215,7 @@ class Pair(Resource):
             )  # Return Interval Server Error
 
         if item:
-            return item.json()
+            return item.json(fields)
 
         return (
             {"message": "Item not found"},
@@ -0,0 +1,122 @@
+"""
+Compiled request schemas for the hot endpoints (webhooks & order fills)
+
+A Schema is built once from a flask_restful RequestParser, so the arguments
+are still declared with reqparse. Parsing reads the JSON body once and calls
+a converter per argument, chosen when the schema is compiled, instead of the
+per-request argument lookups and type call fallbacks of reqparse.
+Errors keep the reqparse format: 400 {"message": {"<argument>": "<error>"}}
+"""
+import inspect
+
+import flask_restful
+from flask import request
+
+MISSING_ERR = "Missing required parameter in the JSON body or the post body or the query string"
+
+# types called with the value only
+SIMPLE_TYPES = (str, int, float, bool)
+
+
+def _converter(arg_type, name):
+    # returns a function(value) calling the argument type the way reqparse does
+
+    if arg_type in SIMPLE_TYPES:
+        return arg_type
+
+    try:
+        parameters = len(inspect.signature(arg_type).parameters)
+    except (TypeError, ValueError):
+        parameters = 1
+
+    # reqparse tries type(value, name, op), then type(value, name), then type(value)
+    if parameters >= 3:
+        return lambda value: arg_type(value, name, "=")
+    if parameters == 2:
+        return lambda value: arg_type(value, name)
+    return arg_type
+
+
+class Field:
+    """A compiled reqparse argument"""
+
+    __slots__ = ("name", "convert", "required", "default", "help", "nullable")
+
+    def __init__(self, arg):
+        self.name = arg.name
+        self.convert = _converter(arg.type, arg.name)
+        self.required = arg.required
+        self.default = arg.default
+        self.help = arg.help
+        self.nullable = arg.nullable
+
+    def error(self, error) -> dict:
+
+        error_str = str(error)
+        return {self.name: self.help.format(error_msg=error_str) if self.help else error_str}
+
+
+class Schema:
+    """
+    Validator compiled from a RequestParser.
+    Only the options used by the resources are supported: type, required,
+    default, help and nullable.
+    """
+
+    def __init__(self, fields):
+        self.fields = tuple(fields)
+
+    @classmethod
+    def from_parser(cls, parser) -> "Schema":
+
+        for arg in parser.args:
+            if arg.choices or arg.action != "store" or arg.trim or not arg.case_sensitive:
+                raise ValueError("unsupported argument option: " + arg.name)
+
+        return cls(Field(arg) for arg in parser.args)
+
+    def convert(self, values: dict):
+        # returns the arguments and None, or None and the error message
+
+        data = {}
+
+        for field in self.fields:
+            try:
+                value = values[field.name]
+            except KeyError:
+                if field.required:
+                    return None, field.error(MISSING_ERR)
+                default = field.default
+                data[field.name] = default() if callable(default) else default
+                continue
+
+            if value is None:
+                if not field.nullable:
+                    return None, field.error("Must not be null!")
+                data[field.name] = None
+                continue
+
+            try:
+                data[field.name] = field.convert(value)
+            except Exception as e:
+                return None, field.error(e)
+
+        return data, None
+
+    def parse(self) -> dict:
+        # parses the current request, aborts with 400 like reqparse
+
+        values = request.get_json(silent=True)
+        if not isinstance(values, dict):
+            values = {}
+
+        # form & query string arguments, the JSON body has the precedence
+        if request.values:
+            values = dict(request.values.items(), **values)
+
+        data, errors = self.convert(values)
+
+        if errors:
+            flask_restful.abort(400, message=errors)
+
+        return data
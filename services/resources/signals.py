@@ -1,8 +1,30 @@
 from flask_restful import Resource, reqparse
-from services.models.signals import SignalModel
+from services.models.signals import SignalModel, JSON_FIELDS, JSON_ROWS
+from services.models.registry import REGISTRY
+from services.models.signal_keys import SignalKeyModel
+from services.models.executions import ExecutionModel
+from services.models.notifier import SIGNAL_CHANGES
+from services.models.changes import ChangeModel
+from services.models.webhook_queue import WebhookQueue, WebhookWorkers, QUEUE_PATH
 from flask_jwt_extended import get_jwt_identity, jwt_required, get_jwt
+from flask import current_app, request
+from sqlalchemy.exc import IntegrityError
+from db import db
 from datetime import datetime
+import hashlib
+import json
+from functools import partial
 import math
+import threading
+from app import configs
+from services.models.latency import stage
+from .schema import Schema
+from .latency import timed
+from .pagination import page_args, paginate
+from .fields import fields_arg
+from .conditional import conditional
+from .streaming import stream_json
+from .encoder import json_response
 from . import status_codes as status
 
 EMPTY_ERR = "'{}' cannot be empty!"
@@ -19,6 +41,287 @@ DELETE_OK = "'{}' deleted successfully."
 NOT_FOUND = "item not found."
 PRIV_ERR = "'{}' privilege required."
 PART_ERR = "missing contract amount to update partial fill"
+QUEUE_ERR = "an error occurred queuing the item."
+ACCEPT_OK = "'{}' accepted for processing."
+BATCH_ERR = "a list of signals is required."
+ORDERS_ERR = "a list of orders is required."
+SINCE_ERR = "changes after {} are not kept, get the signals again."
+LIMIT_ERR = "at most {} signals are accepted at once."
+FIELDS_ERR = "unknown field(s): {}."
+REPLAY_OK = "'{}' already registered."
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# queue all webhooks instead of inserting them during the request
+WEBHOOK_ASYNC = configs.getboolean("WEBHOOK", "ASYNC_MODE", fallback=False)
+# maximum number of signals sent to the batch webhook
+BATCH_LIMIT = configs.getint("WEBHOOK", "BATCH_LIMIT", fallback=500)
+# longest wait of the waiting signals long poll, in seconds
+POLL_TIMEOUT = configs.getfloat("LONGPOLL", "TIMEOUT", fallback=25)
+
+
+def signal_from_args(data) -> SignalModel:
+
+    return SignalModel(
+        data["timestamp"],
+        data["ticker"],
+        data["order_action"],
+        data["order_contracts"],
+        data["order_price"],
+        data["mar_pos"],
+        data["mar_pos_size"],
+        data["pre_mar_pos"],
+        data["pre_mar_pos_size"],
+        data["order_comment"],
+        data["order_status"],
+        data["ticker_type"],
+        data["ticker1"],
+        data["ticker2"],
+        data["hedge_param"],
+        data["order_id1"],
+        data["order_id2"],
+        data["price1"],
+        data["price2"],
+        data["fill_price"],
+        data["slip"],
+        data["error_msg"],
+        data["status_msg"],
+    )
+
+
+def check_signal(item, data):
+    # checks the ticker of a new signal, returns the response message and status code
+
+    with stage("splitticker"):
+        ticker_ok = item.splitticker()  # check webhook ticker validity
+
+    # if you need to bypass active ticker status check
+    if data["bypass_ticker_status"]:
+        active_ok = True
+    else:
+        with stage("check_ticker_status"):
+            active_ok = item.check_ticker_status()
+
+    if not ticker_ok:
+        # keep the ticker record in the database, but change the message
+        # do not return bad request
+        return {"message": TICKER_ERR}, status.HTTP_201_CREATED  # Created but need attention
+
+    if not active_ok:
+        # keep the ticker record in the database, but change the message
+        # do not return bad request
+        return {"message": ACTIVE_ERR}, status.HTTP_201_CREATED  # Created but need attention
+
+    return {"message": CREATE_OK.format("signal")}, 200  # Successful Creation of Resource
+
+
+def signal_key(data) -> str:
+    # idempotency key of a webhook signal:
+    # explicit, or derived when the bar time is known, None otherwise
+
+    if data["idempotency_key"]:
+        return data["idempotency_key"]
+
+    # signals without a bar time cannot be told apart from a new signal
+    if not data["timestamp"]:
+        return None
+
+    fields = (
+        data["ticker"],
+        data["order_action"],
+        data["order_contracts"],
+        data["order_price"],
+        data["timestamp"].strftime(DATE_FORMAT),
+    )
+    return "bar:" + hashlib.sha1("|".join(map(str, fields)).encode()).hexdigest()
+
+
+def replay(rowid):
+    # response to a signal that is already registered
+
+    return {"message": REPLAY_OK.format("signal"), "rowid": rowid}, 200, rowid
+
+
+def register_signal(data):
+    # checks and inserts a webhook signal,
+    # returns the response message, status code and the rowid of the new signal
+
+    key = signal_key(data)
+
+    if key:
+        rowid = SignalKeyModel.find_rowid(key)
+        if rowid is not None:
+            return replay(rowid)
+
+    item = signal_from_args(data)
+
+    try:
+        return_msg, return_code = check_signal(item, data)
+        with stage("insert"):
+            item.insert(key)
+
+    except IntegrityError as e:
+        # the same key is registered concurrently
+        db.session.rollback()
+        rowid = SignalKeyModel.find_rowid(key) if key else None
+        if rowid is not None:
+            return replay(rowid)
+
+        print("Error occurred - ", e)
+        return (
+            {"message": INSERT_ERR},
+            status.HTTP_500_INTERNAL_SERVER_ERROR,
+            None,
+        )  # Return Interval Server Error
+
+    except Exception as e:
+        print("Error occurred - ", e)  # better log the errors
+        return (
+            {"message": INSERT_ERR},
+            status.HTTP_500_INTERNAL_SERVER_ERROR,
+            None,
+        )  # Return Interval Server Error
+
+    return return_msg, return_code, item.rowid
+
+
+def process_queued_signal(payload):
+    # called by the webhook workers
+
+    if payload["timestamp"]:
+        payload["timestamp"] = datetime.strptime(payload["timestamp"], DATE_FORMAT)
+
+    return_msg, return_code, rowid = register_signal(payload)
+
+    return rowid, return_code, return_msg["message"]
+
+
+def queued_signal_retryable(payload) -> bool:
+    # a queued signal is processed again only if it has a key (see signal_key),
+    # a second run then returns the signal inserted by the first one
+
+    return bool(payload.get("idempotency_key") or payload.get("timestamp"))
+
+
+_workers = None
+_workers_lock = threading.Lock()
+
+
+def webhook_workers() -> WebhookWorkers:
+    # the queue file is created on first use
+
+    global _workers
+
+    with _workers_lock:
+        if _workers is None:
+            _workers = WebhookWorkers(
+                WebhookQueue(QUEUE_PATH),
+                process_queued_signal,
+                retryable=queued_signal_retryable,
+            )
+
+    return _workers
+
+
+def queue_signal(data) -> str:
+    # queue the parsed arguments, the passphrase is already checked
+
+    payload = dict(data)
+    payload.pop("passphrase")
+    if payload["timestamp"]:
+        payload["timestamp"] = payload["timestamp"].strftime(DATE_FORMAT)
+
+    workers = webhook_workers()
+    receipt = workers.queue.put(payload)
+    workers.start(current_app._get_current_object())
+
+    return receipt
+
+
+def set_slip(item) -> None:
+
+    # calculate slip if order price is defined,
+    # use 'is not None' to avoid "0" order price problem
+    if item.order_price is not None:
+        if item.order_action == "buy":
+            item.slip = round(item.order_price - item.fill_price, 4)
+        else:
+            item.slip = -round(item.order_price - item.fill_price, 4)
+
+
+def apply_fill(item, data) -> bool:
+    # applies an order fill, partial fill or cancel to the signal,
+    # returns False if the partial fill has no contract amount
+
+    # cancel the order
+    if data["cancel"]:
+        item.order_status = "canceled"
+        item.status_msg = "multiple active orders"
+
+    # TODO: may not be necessary, check and delete if so
+    # if updating orders contracts (used for canceled but partially filled orders)
+    # assumes that the partially filled order keeps the hedge ratio
+    elif data["partial"]:
+        if data["order_contracts"]:
+            order_contracts_old = item.order_contracts
+            item.order_contracts = data["order_contracts"]
+            item.order_status = "part.filled"
+            item.status_msg = "canceled amount: " + str(
+                order_contracts_old - item.order_contracts
+            )
+        else:
+            return False
+
+    else:
+        if item.order_status != "filled":
+            for leg, order_id, symbol in (
+                (1, item.order_id1, item.ticker1),
+                (2, item.order_id2, item.ticker2),
+            ):
+                # double check ticker symbol
+                if order_id == data["order_id"] and symbol == data["symbol"]:
+                    # append to the executions ledger, the price is the average fill price
+                    if item.add_execution(leg, data["filled_qty"], data["price"]) is None:
+                        return True  # repeated or late order status, the row is unchanged
+                    item.order_status = "filled(...)"
+                    item.status_msg = (
+                        "remained(" + str(symbol) + str("): ") + str(item.remaining(leg))
+                    )
+
+            if item.ticker_type == "pair":
+
+                # if both orders are filled for pairs
+                if item.price1 and item.price2:
+                    item.fill_price = round(
+                        item.price1 - item.hedge_param * item.price2, 4
+                    )
+
+                    # the pair status follows the hedge leg
+                    if item.remaining(2) > 0:
+                        item.order_status = "part.filled"
+                        item.status_msg = (
+                            "remained(" + str(item.ticker2) + str("): ") + str(item.remaining(2))
+                        )
+                    else:
+                        item.order_status = "filled"
+                        item.status_msg = ""
+
+                    set_slip(item)
+
+            else:
+                if item.price1:
+                    item.fill_price = item.price1
+
+                    if item.remaining(1) > 0:
+                        item.order_status = "part.filled"
+                        item.status_msg = "remained: " + str(item.remaining(1))
+                    else:
+                        item.order_status = "filled"
+                        item.status_msg = ""
+
+                    set_slip(item)
+
+    return True
 
 
 class SignalUpdateOrder(Resource):
@@ -39,9 +342,13 @@ class SignalUpdateOrder(Resource):
     parser.add_argument("partial", type=bool, default=False)
     parser.add_argument("order_contracts", type=int)
 
+    schema = Schema.from_parser(parser)
+
     @staticmethod
+    @timed("SignalUpdateOrder.put")
     def put():
-        data = SignalUpdateOrder.parser.parse_args()
+        with stage("parse"):
+            data = SignalUpdateOrder.schema.parse()
 
         # format return message inline with flask_restful parser errors
         if SignalModel.passphrase_wrong(data["passphrase"]):
@@ -49,119 +356,19 @@ class SignalUpdateOrder(Resource):
             return return_msg, status.HTTP_401_UNAUTHORIZED  # Unauthorized
 
         # get signal with rowid
-        item = SignalModel.find_by_orderid_ticker(data["order_id"], data["symbol"])
+        with stage("lookup"):
+            item = SignalModel.find_by_orderid_ticker(data["order_id"], data["symbol"])
 
         if item:
-            # cancel the order
-            if data["cancel"]:
-                item.order_status = "canceled"
-                item.status_msg = "multiple active orders"
-
-            # TODO: may not be necessary, check and delete if so
-            # if updating orders contracts (used for canceled but partially filled orders)
-            # assumes that the partially filled order keeps the hedge ratio
-            elif data["partial"]:
-                if data["order_contracts"]:
-                    order_contracts_old = item.order_contracts
-                    item.order_contracts = data["order_contracts"]
-                    item.order_status = "part.filled"
-                    item.status_msg = "canceled amount: " + str(
-                        order_contracts_old - item.order_contracts
-                    )
-                else:
-                    return (
-                        {"message": PART_ERR},
-                        status.HTTP_400_BAD_REQUEST,
-                    )  # return Bad Request
-
-            else:
-                if item.order_status != "filled":
-                    if (
-                        item.order_id1 == data["order_id"]
-                        and item.ticker1 == data["symbol"]
-                    ):  # double check ticker symbol
-                        item.price1 = data["price"]
-                        item.order_status = "filled(...)"
-                        item.status_msg = (
-                            "remained("
-                            + str(item.ticker1)
-                            + str("): ")
-                            + str(math.floor(item.order_contracts) - data["filled_qty"])
-                        )
-
-                    if (
-                        item.order_id2 == data["order_id"]
-                        and item.ticker2 == data["symbol"]
-                    ):
-                        item.price2 = data["price"]
-                        item.order_status = "filled(...)"
-
-                    if item.ticker_type == "pair":
-
-                        # if both orders are filled for pairs
-                        if item.price1 and item.price2:
-                            item.fill_price = round(
-                                item.price1 - item.hedge_param * item.price2, 4
-                            )
-
-                            if (
-                                math.floor(item.order_contracts * item.hedge_param)
-                                > data["filled_qty"]
-                            ):
-                                item.order_status = "part.filled"
-                                item.status_msg = (
-                                    "remained("
-                                    + str(item.ticker2)
-                                    + str("): ")
-                                    + str(
-                                        math.floor(
-                                            item.order_contracts * item.hedge_param
-                                        )
-                                        - data["filled_qty"]
-                                    )
-                                )
-                            else:
-                                item.order_status = "filled"
-                                item.status_msg = ""
-
-                            # calculate slip if order price is defined,
-                            # use 'is not None' to avoid "0" order price problem
-                            if item.order_price is not None:
-                                if item.order_action == "buy":
-                                    item.slip = round(
-                                        item.order_price - item.fill_price, 4
-                                    )
-                                else:
-                                    item.slip = -round(
-                                        item.order_price - item.fill_price, 4
-                                    )
-
-                    else:
-                        if item.price1:
-                            item.fill_price = item.price1
-
-                            if item.order_contracts > data["filled_qty"]:
-                                item.order_status = "part.filled"
-                                item.status_msg = "remained: " + str(
-                                    item.order_contracts - data["filled_qty"]
-                                )
-                            else:
-                                item.order_status = "filled"
-                                item.status_msg = ""
-
-                            # calculate slip if order price is defined
-                            if item.order_price is not None:
-                                if item.order_action == "buy":
-                                    item.slip = round(
-                                        item.order_price - item.fill_price, 4
-                                    )
-                                else:
-                                    item.slip = -round(
-                                        item.order_price - item.fill_price, 4
-                                    )
+            if not apply_fill(item, data):
+                return (
+                    {"message": PART_ERR},
+                    status.HTTP_400_BAD_REQUEST,
+                )  # return Bad Request
 
             try:
-                item.update(item.rowid)
+                with stage("update"):
+                    item.update(item.rowid)
 
             except Exception as e:
                 print("Error occurred - ", e)
@@ -179,6 +386,79 @@ class SignalUpdateOrder(Resource):
         return {"message": NOT_FOUND}, status.HTTP_404_NOT_FOUND  # Return Not Found
 
 
+class SignalUpdateOrderBatch(Resource):
+    @staticmethod
+    @timed("SignalUpdateOrderBatch.put")
+    def put():
+        body = request.get_json(silent=True) or {}
+        orders = body.get("orders")
+
+        if not isinstance(orders, list):
+            return {"message": {"orders": ORDERS_ERR}}, status.HTTP_400_BAD_REQUEST
+
+        if SignalModel.passphrase_wrong(body.get("passphrase")):
+            return_msg = {"message": {"passphrase": PASS_ERR}}
+            return return_msg, status.HTTP_401_UNAUTHORIZED  # Unauthorized
+
+        if len(orders) > BATCH_LIMIT:
+            return (
+                {"message": {"orders": LIMIT_ERR.format(BATCH_LIMIT)}},
+                status.HTTP_400_BAD_REQUEST,
+            )  # Return Bad Request
+
+        results = []
+        fills = []  # (result, signal, data) in the order of the records
+        items = {}  # rowid -> signal, each signal is loaded & written once
+
+        # look up all signals before changing any of them
+        with stage("lookup"):
+            for values in orders:
+                if not isinstance(values, dict):
+                    results.append({"message": ORDERS_ERR, "status": status.HTTP_400_BAD_REQUEST})
+                    continue
+
+                # the batch is authenticated with a single passphrase
+                data, errors = SignalUpdateOrder.schema.convert(
+                    dict(values, passphrase=body["passphrase"])
+                )
+                if errors:
+                    results.append({"message": errors, "status": status.HTTP_400_BAD_REQUEST})
+                    continue
+
+                item = SignalModel.find_by_orderid_ticker(data["order_id"], data["symbol"])
+                if not item:
+                    results.append({"message": NOT_FOUND, "status": status.HTTP_404_NOT_FOUND})
+                    continue
+
+                result = {"rowid": item.rowid, "status": 200}
+                results.append(result)
+                fills.append((result, items.setdefault(item.rowid, item), data))
+
+        # both legs of a pair are applied to the same signal
+        for result, item, data in fills:
+            if not apply_fill(item, data):
+                result.update(message=PART_ERR, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            with stage("update"):
+                SignalModel.update_all(list(items.values()))
+
+        except Exception as e:
+            print("Error occurred - ", e)
+            return (
+                {"message": UPDATE_ERR},
+                status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )  # Return Interval Server Error
+
+        signals = []
+        for item in items.values():
+            return_json = item.json()
+            return_json.pop("timestamp")
+            signals.append(return_json)
+
+        return {"orders": results, "signals": signals}
+
+
 class SignalWebhook(Resource):
     parser = reqparse.RequestParser()
     parser.add_argument(
@@ -236,90 +516,64 @@ class SignalWebhook(Resource):
     # if you need to bypass active ticker status check
     parser.add_argument("bypass_ticker_status", type=bool, default=False)
 
+    # queue the signal and return a receipt (see SignalReceipt)
+    parser.add_argument("async", type=bool, default=False)
+
+    # retries with the same key return the first signal (see signal_key)
+    parser.add_argument("idempotency_key", type=str)
+
+    schema = Schema.from_parser(parser)
+
     @staticmethod
+    @timed("SignalWebhook.post")
     def post():
-        data = SignalWebhook.parser.parse_args()
+        with stage("parse"):
+            data = SignalWebhook.schema.parse()
 
         # format return message inline with flask_restful parser errors
         if SignalModel.passphrase_wrong(data["passphrase"]):
             return_msg = {"message": PASS_ERR}
             return return_msg, status.HTTP_401_UNAUTHORIZED  # Return Unauthorized
 
-        item = SignalModel(
-            data["timestamp"],
-            data["ticker"],
-            data["order_action"],
-            data["order_contracts"],
-            data["order_price"],
-            data["mar_pos"],
-            data["mar_pos_size"],
-            data["pre_mar_pos"],
-            data["pre_mar_pos_size"],
-            data["order_comment"],
-            data["order_status"],
-            data["ticker_type"],
-            data["ticker1"],
-            data["ticker2"],
-            data["hedge_param"],
-            data["order_id1"],
-            data["order_id2"],
-            data["price1"],
-            data["price2"],
-            data["fill_price"],
-            data["slip"],
-            data["error_msg"],
-            data["status_msg"],
-        )
-
-        try:
-            ticker_ok = item.splitticker()  # check webhook ticker validity
-
-            # if you need to bypass active ticker status check
-            if data["bypass_ticker_status"]:
-                active_ok = True
-            else:
-                active_ok = item.check_ticker_status()
-
-            item.insert()
-
-            if not ticker_ok:
-                # keep the ticker record in the database, but change the message
-                # do not return bad request
-                return (
-                    {"message": TICKER_ERR},
-                    status.HTTP_201_CREATED,
-                )  # Created but need attention
+        if not data["idempotency_key"]:
+            data["idempotency_key"] = request.headers.get("Idempotency-Key")
 
-            if not active_ok:
-                # keep the ticker record in the database, but change the message
-                # do not return bad request
+        if data["async"] or WEBHOOK_ASYNC:
+            # answer once the payload is queued, workers insert the signal
+            try:
+                with stage("queue"):
+                    receipt = queue_signal(data)
+            except Exception as e:
+                print("Error occurred - ", e)
                 return (
-                    {"message": ACTIVE_ERR},
-                    status.HTTP_201_CREATED,
-                )  # Created but need attention
+                    {"message": QUEUE_ERR},
+                    status.HTTP_500_INTERNAL_SERVER_ERROR,
+                )  # Return Interval Server Error
 
-        except Exception as e:
-            print("Error occurred - ", e)  # better log the errors
             return (
-                {"message": INSERT_ERR},
-                status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )  # Return Interval Server Error
+                {"message": ACCEPT_OK.format("signal"), "receipt": receipt},
+                status.HTTP_202_ACCEPTED,
+            )  # Accepted for processing
 
-        return (
-            {"message": CREATE_OK.format("signal")},
-            200,
-        )  # Return Successful Creation of Resource
+        return_msg, return_code, _ = register_signal(data)
+
+        return return_msg, return_code
 
     @staticmethod
+    @timed("SignalWebhook.put")
     def put():
-        data = SignalWebhook.parser.parse_args()
+        with stage("parse"):
+            data = SignalWebhook.schema.parse()
 
         # format return message inline with flask_restful parser errors
         if SignalModel.passphrase_wrong(data["passphrase"]):
             return_msg = {"message": {"passphrase": PASS_ERR}}
             return return_msg, status.HTTP_401_UNAUTHORIZED  # Return Unauthorized
 
-        if SignalModel.find_by_rowid(data["rowid"]):
+        with stage("lookup"):
+            found = SignalModel.find_by_rowid(data["rowid"])
+
+        if found:
 
             item = SignalModel(
                 data["timestamp"],
@@ -348,13 +602,16 @@ class SignalWebhook(Resource):
             )
 
             try:
-                item.splitticker()  # check webhook ticker validity
+                with stage("splitticker"):
+                    item.splitticker()  # check webhook ticker validity
 
                 # if you need to bypass active ticker status check
                 if not data["bypass_ticker_status"]:
-                    item.check_ticker_status()
+                    with stage("check_ticker_status"):
+                        item.check_ticker_status()
 
-                item.update(data["rowid"])
+                with stage("update"):
+                    item.update(data["rowid"])
 
             except Exception as e:
                 print("Error occurred - ", e)
@@ -373,12 +630,130 @@ class SignalWebhook(Resource):
         return {"message": NOT_FOUND}, status.HTTP_404_NOT_FOUND  # Return Not Found
 
 
+class SignalWebhookBatch(Resource):
+    @staticmethod
+    def post():
+        body = request.get_json(silent=True) or {}
+        signals = body.get("signals")
+
+        if not isinstance(signals, list):
+            return {"message": {"signals": BATCH_ERR}}, status.HTTP_400_BAD_REQUEST
+
+        if SignalModel.passphrase_wrong(body.get("passphrase")):
+            return_msg = {"message": PASS_ERR}
+            return return_msg, status.HTTP_401_UNAUTHORIZED  # Return Unauthorized
+
+        if len(signals) > BATCH_LIMIT:
+            return (
+                {"message": {"signals": LIMIT_ERR.format(BATCH_LIMIT)}},
+                status.HTTP_400_BAD_REQUEST,
+            )  # Return Bad Request
+
+        results = []  # (return_msg, return_code, inserted item, rowid)
+        items = []
+        keys = []
+        batch_keys = {}  # key -> item, for the duplicates in the batch
+
+        # the same tickers & pairs for the whole batch
+        with REGISTRY.snapshot():
+            for values in signals:
+                if not isinstance(values, dict):
+                    results.append(({"message": BATCH_ERR}, status.HTTP_400_BAD_REQUEST, None, None))
+                    continue
+
+                # the batch is authenticated with a single passphrase
+                data, errors = SignalWebhook.schema.convert(
+                    dict(values, passphrase=body["passphrase"])
+                )
+                if errors:
+                    results.append(({"message": errors}, status.HTTP_400_BAD_REQUEST, None, None))
+                    continue
+
+                key = signal_key(data)
+                if key:
+                    if key in batch_keys:
+                        results.append(({"message": REPLAY_OK.format("signal")}, 200, batch_keys[key], None))
+                        continue
+                    rowid = SignalKeyModel.find_rowid(key)
+                    if rowid is not None:
+                        results.append(({"message": REPLAY_OK.format("signal")}, 200, None, rowid))
+                        continue
+
+                item = signal_from_args(data)
+                try:
+                    return_msg, return_code = check_signal(item, data)
+                except Exception as e:
+                    print("Error occurred - ", e)
+                    return_msg = {"message": INSERT_ERR}
+                    return_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+                    item = None
+
+                results.append((return_msg, return_code, item, None))
+                if item:
+                    items.append(item)
+                    keys.append(key)
+                    if key:
+                        batch_keys[key] = item
+
+        try:
+            SignalModel.insert_all(items, keys)
+
+        except Exception as e:
+            # also when a key is registered concurrently, a retry returns the replays
+            print("Error occurred - ", e)
+            return (
+                {"message": INSERT_ERR},
+                status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )  # Return Interval Server Error
+
+        return {
+            "signals": [
+                dict(return_msg, status=return_code, rowid=item.rowid if item else rowid)
+                for return_msg, return_code, item, rowid in results
+            ]
+        }
+
+
+class SignalReceipt(Resource):
+    @staticmethod
+    def get(receipt):
+
+        try:
+            item = webhook_workers().queue.find(receipt)
+
+        except Exception as e:
+            print("Error occurred - ", e)
+            return (
+                {"message": GET_ERR},
+                status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )  # Return Interval Server Error
+
+        if item:
+            return {
+                "receipt": item["receipt"],
+                "status": item["status"],  # queued, processing or done
+                "rowid": item["signal_rowid"],
+                "code": item["code"],
+                "message": item["message"],
+            }
+
+        return {"message": NOT_FOUND}, status.HTTP_404_NOT_FOUND  # Return Not Found
+
+
 class SignalList(Resource):
     @staticmethod
     @jwt_required(optional=True)
+    @conditional("signals")
     def get(number_of_items="0"):
 
         username = get_jwt_identity()
+        before, number_of_items = page_args(number_of_items)
+        fields, unknown = fields_arg(JSON_FIELDS)
+        if unknown:
+            return (
+                {"message": {"fields": FIELDS_ERR.format(", ".join(unknown))}},
+                status.HTTP_400_BAD_REQUEST,
+            )  # Return Bad Request
 
         # limit the number of items to get if not logged-in
         notoken_limit = 5
@@ -391,7 +766,22 @@ class SignalList(Resource):
             else:
                 number_of_items = min(int(number_of_items), notoken_limit)
         try:
-            items = SignalModel.get_rows(str(number_of_items))
+            # full list: streamed while the rows are read
+            if number_of_items == "0":
+                return stream_json(
+                    "signals",
+                    partial(SignalModel.get_rows, fields=fields, rows=True),
+                    before,
+                    to_json=partial(JSON_ROWS.json, fields=fields),
+                    notoken_limit=notoken_limit,
+                    next_cursor=None,
+                )
+
+            items, next_cursor = paginate(
+                partial(SignalModel.get_rows, fields=fields, rows=True),
+                number_of_items,
+                before,
+            )
 
         except Exception as e:
             print("Error occurred - ", e)
@@ -401,18 +791,29 @@ class SignalList(Resource):
             )  # Return Interval Server Error
 
         # return {'signals': list(map(lambda x: x.json(), items))}  # we can map the list of objects,
-        return {
-            "signals": [item.json() for item in items],
-            "notoken_limit": notoken_limit,
-        }  # this is more readable
+        return json_response(
+            {
+                "signals": [JSON_ROWS.json(item, fields) for item in items],
+                "notoken_limit": notoken_limit,
+                "next_cursor": next_cursor,
+            }
+        )  # row tuples, no model instances
 
 
 class SignalListTicker(Resource):
     @staticmethod
     @jwt_required(optional=True)
+    @conditional("signals")
     def get(ticker_name, number_of_items="0"):
 
         username = get_jwt_identity()
+        before, number_of_items = page_args(number_of_items)
+        fields, unknown = fields_arg(JSON_FIELDS)
+        if unknown:
+            return (
+                {"message": {"fields": FIELDS_ERR.format(", ".join(unknown))}},
+                status.HTTP_400_BAD_REQUEST,
+            )  # Return Bad Request
 
         # limit the number of items to get if not logged-in
         notoken_limit = 5
@@ -425,7 +826,11 @@ class SignalListTicker(Resource):
             else:
                 number_of_items = min(int(number_of_items), notoken_limit)
         try:
-            items = SignalModel.get_list_ticker(ticker_name, str(number_of_items))
+            items, next_cursor = paginate(
+                partial(SignalModel.get_list_ticker, ticker_name, fields=fields, rows=True),
+                number_of_items,
+                before,
+            )
 
         except Exception as e:
             print("Error occurred - ", e)
@@ -435,17 +840,28 @@ class SignalListTicker(Resource):
             )  # Return Interval Server Error
 
         # return {'signals': list(map(lambda x: x.json(), items))}  # we can map the list of objects,
-        return {
-            "signals": [item.json() for item in items],
-        }  # this is more readable
+        return json_response(
+            {
+                "signals": [JSON_ROWS.json(item, fields) for item in items],
+                "next_cursor": next_cursor,
+            }
+        )  # row tuples, no model instances
 
 
 class SignalListStatus(Resource):
     @staticmethod
     @jwt_required(optional=True)
+    @conditional("signals")
     def get(order_status, number_of_items="0"):
 
         username = get_jwt_identity()
+        before, number_of_items = page_args(number_of_items)
+        fields, unknown = fields_arg(JSON_FIELDS)
+        if unknown:
+            return (
+                {"message": {"fields": FIELDS_ERR.format(", ".join(unknown))}},
+                status.HTTP_400_BAD_REQUEST,
+            )  # Return Bad Request
 
         # limit the number of items to get if not logged-in
         if order_status == "waiting":
@@ -461,7 +877,11 @@ class SignalListStatus(Resource):
             else:
                 number_of_items = min(int(number_of_items), notoken_limit)
         try:
-            items = SignalModel.get_list_status(order_status, str(number_of_items))
+            items, next_cursor = paginate(
+                partial(SignalModel.get_list_status, order_status, fields=fields, rows=True),
+                number_of_items,
+                before,
+            )
 
         except Exception as e:
             print("Error occurred - ", e)
@@ -471,18 +891,202 @@ class SignalListStatus(Resource):
             )  # Return Interval Server Error
 
         # return {'signals': list(map(lambda x: x.json(), items))}  # we can map the list of objects,
-        return {
-            "signals": [item.json() for item in items],
-        }  # this is more readable
+        return json_response(
+            {
+                "signals": [JSON_ROWS.json(item, fields) for item in items],
+                "next_cursor": next_cursor,
+            }
+        )  # row tuples, no model instances
 
 
-class Signal(Resource):
+class SignalWaitingPoll(Resource):
     @staticmethod
+    @jwt_required(optional=True)
+    def get():
+
+        username = get_jwt_identity()
+
+        # ?after=<rowid>: last signal seen by the client, ?timeout=<seconds>
+        after = request.args.get("after", 0, type=int)
+        timeout = request.args.get("timeout", POLL_TIMEOUT, type=float)
+        timeout = min(max(timeout, 0), POLL_TIMEOUT)
+        number_of_items = request.args.get("limit", 20, type=int)
+
+        # limit the number of items to get if not logged-in
+        notoken_limit = 20
+
+        if username is None or number_of_items <= 0:
+            number_of_items = min(max(number_of_items, 1), notoken_limit)
+
+        def check():
+            items = SignalModel.get_waiting_after(after, number_of_items, rows=True)
+            db.session.close()  # no connection kept while waiting
+            return items
+
+        try:
+            # blocks until a signal is waiting after the given one, or the timeout
+            items = SIGNAL_CHANGES.wait_for(check, timeout)
+
+        except Exception as e:
+            print("Error occurred - ", e)
+            return (
+                {"message": GET_ERR},
+                status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )  # Return Interval Server Error
+
+        return json_response(
+            {
+                "signals": [JSON_ROWS.json(item) for item in items],
+                "last_rowid": items[-1].rowid if items else after,
+            }
+        )
+
+
+class SignalChanges(Resource):
+    @staticmethod
+    @jwt_required(optional=True)
+    def get():
+
+        username = get_jwt_identity()
+
+        # ?since=<seq>: last_seq of the previous response, 0 for all the kept changes,
+        # the changes are committed in seq order (see lock_log), none is skipped after it
+        since = request.args.get("since", type=int)
+        if since is None or since < 0:
+            return (
+                {"message": {"since": EMPTY_ERR.format("since")}},
+                status.HTTP_400_BAD_REQUEST,
+            )  # return Bad Request
+
+        number_of_items = request.args.get("limit", 500, type=int)
+
+        # limit the number of changes to get if not logged-in
+        notoken_limit = 20
+
+        if username is None or number_of_items <= 0:
+            number_of_items = min(max(number_of_items, 1), notoken_limit)
+
+        try:
+            rows = ChangeModel.get_after(since, ("signal",), number_of_items)
+            # read after the rows: a prune in between gives a 410, not missing changes
+            first, last = ChangeModel.seq_range()
+
+        except Exception as e:
+            print("Error occurred - ", e)
+            return (
+                {"message": GET_ERR},
+                status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )  # Return Interval Server Error
+
+        reset = any(row.event == "reset" for row in rows)  # bulk delete
+        if since > last or since < first - 1 or reset:
+            # pruned, or from another database: the client gets the signals again,
+            # then the changes after last_seq (read before the signals)
+            return (
+                {"message": {"since": SINCE_ERR.format(since)}, "last_seq": last},
+                status.HTTP_410_GONE,
+            )  # return Gone
+
+        # the last state of each changed signal, in the order of the changes
+        signals = {}
+        deleted = {}
+        for row in rows:
+            item = json.loads(row.data)
+            rowid = item["rowid"]
+            signals.pop(rowid, None)
+            deleted.pop(rowid, None)
+            if row.event == "delete":
+                deleted[rowid] = True
+            else:
+                signals[rowid] = item
+
+        return json_response(
+            {
+                "signals": list(signals.values()),
+                "deleted": list(deleted),
+                "last_seq": rows[-1].seq if rows else since,
+                "more": len(rows) == number_of_items,
+                "notoken_limit": notoken_limit,
+            }
+        )
+
+
+class SignalSlip(Resource):
+    @staticmethod
+    @conditional("signals")
+    def get(ticker_name):
+
+        dates = {"start": None, "end": None}
+
+        # optional ?start=&end=, "%Y-%m-%d %H:%M:%S" or "%Y-%m-%d"
+        for arg in dates:
+            value = request.args.get(arg)
+            for date_format in (DATE_FORMAT, "%Y-%m-%d"):
+                if not value or dates[arg]:
+                    break
+                try:
+                    dates[arg] = datetime.strptime(value, date_format)
+                except ValueError:
+                    pass
+
+            if value and not dates[arg]:
+                return {"message": {arg: DATE_ERR}}, status.HTTP_400_BAD_REQUEST
+
+        try:
+            stats = SignalModel.get_slip_stats(ticker_name, dates["start"], dates["end"])
+
+        except Exception as e:
+            print("Error occurred - ", e)
+            return (
+                {"message": GET_ERR},
+                status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )  # Return Interval Server Error
+
+        return dict(stats, ticker=ticker_name)
+
+
+class SignalExecutions(Resource):
+    @staticmethod
+    @conditional("signals")
     def get(rowid):
 
         try:
             item = SignalModel.find_by_rowid(rowid)
 
+            if item:
+                executions = ExecutionModel.find_by_signal(item.rowid)
+
+        except Exception as e:
+            print("Error occurred - ", e)
+            return (
+                {"message": GET_ERR},
+                status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )  # Return Interval Server Error
+
+        if item:
+            return dict(
+                item.fills(),
+                rowid=item.rowid,
+                executions=[execution.json() for execution in executions],
+            )
+
+        return {"message": NOT_FOUND}, status.HTTP_404_NOT_FOUND  # Return Not Found
+
+
+class Signal(Resource):
+    @staticmethod
+    @conditional("signals")
+    def get(rowid):
+        fields, unknown = fields_arg(JSON_FIELDS)
+        if unknown:
+            return (
+                {"message": {"fields": FIELDS_ERR.format(", ".join(unknown))}},
+                status.HTTP_400_BAD_REQUEST,
+            )  # Return Bad Request
+
+        try:
+            item = SignalModel.find_by_rowid(rowid, fields)
+
         except Exception as e:
             print("Error occurred - ", e)
             return (
@@ -491,7 +1095,7 @@ class Signal(Resource):
             )  # Return Interval Server Error
 
         if item:
-            return item.json()
+            return item.json(fields)
 
         return {"message": NOT_FOUND}, status.HTTP_404_NOT_FOUND  # Return Not Found
 
@@ -0,0 +1,58 @@
+"""
+Streaming JSON responses of the full lists (number of items "0")
+
+The rows are read in keyset pages of CHUNK_SIZE (see pagination.py), each
+one a short query whose session is closed before the page is written to
+the response. So the memory used does not grow with the size of the table,
+and no transaction or read lock is kept while a slow client reads: on
+SQLite it would make the concurrent commits fail with "database is locked".
+The body is the same as the one of the list resource.
+"""
+import json
+
+from flask import Response, stream_with_context
+
+from app import configs
+from db import db
+from .encoder import dumps
+
+# rows read from the database at once
+CHUNK_SIZE = configs.getint("STREAM", "CHUNK_SIZE", fallback=500)
+
+
+def stream_json(key: str, get_items, before: int = None, to_json=None, **fields) -> Response:
+    # {"<key>": [to_json(item), ...], **fields} of the items of a get_rows model helper,
+    # get_items(number_of_items, before): newest first, as in paginate()
+    # to_json: item.json() of the model instances by default
+
+    def generate():
+        nonlocal before
+
+        yield '{"' + key + '": ['
+
+        separator = ""
+        try:
+            while True:
+                items = list(get_items(str(CHUNK_SIZE), before))
+                chunk = ", ".join(
+                    dumps(to_json(item) if to_json else item.json()) for item in items
+                )
+                db.session.close()  # ends the transaction before the client reads
+
+                if chunk:
+                    yield separator + chunk
+                    separator = ", "
+
+                if len(items) < CHUNK_SIZE:
+                    break
+                before = items[-1].rowid
+
+        except Exception as e:
+            # the status is already sent, the client gets a truncated body
+            print("Error occurred - ", e)
+            raise
+
+        fields_json = json.dumps(fields)[1:-1]
+        yield "]" + (", " + fields_json if fields_json else "") + "}\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/json")
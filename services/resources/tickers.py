@@ -1,8 +1,13 @@
 from flask_restful import Resource, reqparse
-from services.models.tickers import TickerModel
+from functools import partial
+from services.models.tickers import TickerModel, JSON_FIELDS, JSON_ROWS
 from flask_jwt_extended import jwt_required, get_jwt
 from services.models.pairs import PairModel
 from services.models.signals import SignalModel
+from .pagination import page_args, paginate
+from .fields import fields_arg
+from .encoder import json_response
+from .conditional import conditional
 from . import status_codes as status
 
 EMPTY_ERR = "'{}' cannot be empty!"
@@ -15,6 +20,7 @@ CREATE_OK = "'{}' created successfully."
 DELETE_OK = "'{}' deleted successfully."
 NOT_FOUND = "item not found."
 PRIV_ERR = "'{}' privilege required."
+FIELDS_ERR = "unknown field(s): {}."
 TICKR_ERR = " ticker is already active in a pair!"
 PASS_ERR = "incorrect passphrase."
 
@@ -188,9 +194,22 @@ class TickerRegister(Resource):
 
 class TickerList(Resource):
     @staticmethod
+    @conditional("tickers")
     def get(number_of_items="0"):
+        before, number_of_items = page_args(number_of_items)
+        fields, unknown = fields_arg(JSON_FIELDS)
+        if unknown:
+            return (
+                {"message": {"fields": FIELDS_ERR.format(", ".join(unknown))}},
+                status.HTTP_400_BAD_REQUEST,
+            )  # Return Bad Request
+
         try:
-            items = TickerModel.get_rows(number_of_items)
+            items, next_cursor = paginate(
+                partial(TickerModel.get_rows, fields=fields, rows=True),
+                number_of_items,
+                before,
+            )
 
         except Exception as e:
             print("Error occurred - ", e)
@@ -200,17 +219,27 @@ class TickerList(Resource):
             )  # Return Interval Server Error
 
         # return {'tickers': list(map(lambda x: x.json(), items))}  # we can map the list of objects,
-        return {
-            "tickers": [item.json() for item in items]
-        }  # but this one is slightly more readable
+        return json_response(
+            {
+                "tickers": [JSON_ROWS.json(item, fields) for item in items],
+                "next_cursor": next_cursor,
+            }
+        )  # row tuples, no model instances
 
 
 class Ticker(Resource):
     @staticmethod
+    @conditional("tickers")
     def get(symbol):
+        fields, unknown = fields_arg(JSON_FIELDS)
+        if unknown:
+            return (
+                {"message": {"fields": FIELDS_ERR.format(", ".join(unknown))}},
+                status.HTTP_400_BAD_REQUEST,
+            )  # Return Bad Request
 
         try:
-            item = TickerModel.find_by_symbol(symbol)
+            item = TickerModel.find_by_symbol(symbol, fields)
 
         except Exception as e:
             print("Error occurred - ", e)
@@ -220,7 +249,7 @@ class Ticker(Resource):
             )  # Return Interval Server Error
 
         if item:
-            return item.json()
+            return item.json(fields)
 
         return {"message": NOT_FOUND}, status.HTTP_404_NOT_FOUND  # Return Not Found
 
@@ -290,8 +290,8 @@ class UserLogout(Resource):
         access_token = request.cookies.get("access_token")
 
         if access_token:
-            simplesession = SessionModel.find_by_value(access_token[-10:])
-            simplesession.delete()
+            # clears the cached lookups of the session in the workers
+            SessionModel.delete_by_value(access_token[-10:])
 
         # (flask-session-change) enable if using flask sessions to end session:
         # session["token"] = None
@@ -0,0 +1,45 @@
+"""
+Statements executed by the models, for the tests of the queries
+"""
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from db import db
+
+
+class Statements(list):
+    """Executed SQL statements, with their parameters"""
+
+    def __init__(self):
+        super().__init__()
+        self.parameters = []
+
+    def clear(self) -> None:
+        super().clear()
+        self.parameters.clear()
+
+    def values(self, index: int) -> list:
+        # parameter values of a statement, whatever the paramstyle of the driver
+
+        parameters = self.parameters[index]
+        if isinstance(parameters, dict):
+            return list(parameters.values())
+        return list(parameters)
+
+
+@contextmanager
+def count_statements():
+    """Keep the statements executed by the engine in the block"""
+
+    statements = Statements()
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+        statements.parameters.append(parameters)
+
+    event.listen(db.engine, "before_cursor_execute", count)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count)
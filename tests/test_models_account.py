@@ -6,6 +6,7 @@ import os
 from app import app
 from db import db
 from services.models.account import AccountModel
+from tests.statements import count_statements
 from tests.factories import AccountFactory
 
 # rather than referring to an app directly, use a proxy,
@@ -216,3 +217,25 @@ class TestAccount(unittest.TestCase):
         account = AccountModel.get_rows("0")
         # assert that there are no records
         self.assertEqual(account.count(), 0)
+
+    def test_update_statements(self):
+        """It should update a PNL record with a single UPDATE of the changed columns"""
+
+        test_account = AccountFactory()
+        test_account.insert()
+        rowid = AccountModel.get_rows("0").first().rowid
+
+        with count_statements() as statements:
+            # built from the arguments: no SELECT before the UPDATE
+            AccountFactory().update(rowid)
+            self.assertEqual(len(statements), 1)
+            self.assertTrue(statements[0].startswith("UPDATE account SET"))
+
+            # loaded from the database: only the changed column is written
+            item = AccountModel.find_by_rowid(rowid)
+            statements.clear()
+            item.DailyPnL = 123
+            item.update(rowid)
+            self.assertEqual(len(statements), 1)
+            self.assertRegex(statements[0], r"^UPDATE account SET \"DailyPnL\"=\S+ WHERE")
+            self.assertEqual(statements.values(0)[0], 123)
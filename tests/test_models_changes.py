@@ -0,0 +1,189 @@
+"""
+Test cases for the change log
+"""
+import unittest
+import os
+import json
+import threading
+from sqlalchemy.orm import Session
+from app import app
+from db import db
+from services.models.changes import ChangeModel
+from services.models.signals import SignalModel
+from services.models.tickers import TickerModel
+from services.models.account import AccountModel
+from services.models.table_stamps import TABLE_STAMPS
+from tests.factories import SignalFactory, TickerFactory, AccountFactory
+
+# rather than referring to an app directly, use a proxy,
+# which points to the application handling the current activity
+app.app_context().push()
+
+DATABASE_URI = os.environ.get("DATABASE_URI", "sqlite:///test.db")
+
+######################################################################
+#  CHANGE LOG TEST CASES
+######################################################################
+
+
+class TestChanges(unittest.TestCase):
+    """Test Cases for the Change Log"""
+
+    @classmethod
+    def setUpClass(cls):
+        """This runs once before the entire test suite"""
+        app.config["TESTING"] = True
+        app.config["DEBUG"] = False
+        app.config["SQLALCHEMY_DATABASE_URI"] = DATABASE_URI
+        db.init_app(app)
+        db.create_all()
+
+    @classmethod
+    def tearDownClass(cls):
+        """This runs once after the entire test suite"""
+        db.drop_all()
+
+    def setUp(self):
+        """This runs before each test"""
+        for model in (SignalModel, TickerModel, AccountModel, ChangeModel):
+            db.session.query(model).delete()  # clean up the last tests
+        db.session.commit()
+
+    def tearDown(self):
+        """This runs after each test"""
+        db.session.remove()
+
+    def _changes(self, seq=0):
+        return [
+            (row.topic, row.event, json.loads(row.data))
+            for row in ChangeModel.get_after(seq)
+        ]
+
+    ######################################################################
+    #  TEST CASES
+    ######################################################################
+
+    def test_signal_changes(self):
+        """It should log the inserted, updated & deleted signals"""
+
+        stamp = TABLE_STAMPS["changes"].read()
+
+        test_signal = SignalFactory()
+        test_signal.order_status = "waiting"
+        test_signal.insert()
+        self.assertNotEqual(TABLE_STAMPS["changes"].read(), stamp)
+
+        test_signal.update(test_signal.rowid)  # nothing changed
+
+        test_signal.order_comment = "no status change"
+        test_signal.update(test_signal.rowid)
+        test_signal.order_status = "filled"
+        test_signal.update(test_signal.rowid)
+
+        changes = self._changes()
+        self.assertEqual(
+            [change[:2] for change in changes],
+            [("signal", "insert"), ("signal", "update"), ("signal", "status")],
+        )
+        self.assertEqual(changes[0][2]["rowid"], test_signal.rowid)
+        self.assertEqual(changes[0][2]["order_status"], "waiting")
+        self.assertEqual(changes[1][2]["order_comment"], "no status change")
+        self.assertEqual(changes[2][2]["order_status"], "filled")
+
+        # written over with the bulk update
+        seq = ChangeModel.last_seq()
+        new_signal = SignalFactory()
+        new_signal.order_status = "error"
+        new_signal.update(test_signal.rowid)
+        [(topic, event, item)] = self._changes(seq)
+        self.assertEqual((topic, event), ("signal", "status"))
+        self.assertEqual(item["rowid"], test_signal.rowid)
+        self.assertEqual(item["order_status"], "error")
+
+        # written over without a status change
+        seq = ChangeModel.last_seq()
+        new_signal.order_comment = "same status"
+        new_signal.update(test_signal.rowid)
+        self.assertEqual([change[:2] for change in self._changes(seq)], [("signal", "update")])
+
+        seq = ChangeModel.last_seq()
+        rowid = test_signal.rowid
+        SignalModel.find_by_rowid(rowid).delete()
+        self.assertEqual(self._changes(seq), [("signal", "delete", {"rowid": rowid})])
+
+    def test_pnl_changes(self):
+        """It should log the ticker PNL updates & the account PNL records"""
+
+        test_ticker = TickerFactory()
+        test_ticker.insert()
+        self.assertEqual(self._changes(), [])
+
+        test_ticker.active_pnl = 12.5
+        test_ticker.update(True)
+        test_pnl = AccountFactory()
+        test_pnl.insert()
+
+        changes = self._changes()
+        self.assertEqual(
+            [change[:2] for change in changes], [("ticker", "pnl"), ("pnl", "insert")]
+        )
+        self.assertEqual(changes[0][2]["symbol"], test_ticker.symbol)
+        self.assertEqual(changes[0][2]["active_pnl"], 12.5)
+        self.assertEqual(changes[1][2]["rowid"], test_pnl.rowid)
+
+        # nothing logged on rollback
+        seq = ChangeModel.last_seq()
+        db.session.add(SignalFactory())
+        db.session.flush()
+        db.session.rollback()
+        self.assertEqual(ChangeModel.last_seq(), seq)
+
+    def test_prune(self):
+        """It should prune the old changes but the last one"""
+
+        self.assertEqual(ChangeModel.seq_range(), (0, 0))
+
+        for signal in SignalFactory.create_batch(3):
+            signal.insert()
+        first, last = ChangeModel.seq_range()
+        self.assertEqual(last - first, 2)
+
+        self.assertEqual(ChangeModel.prune(hours=1), 0)
+        self.assertEqual(ChangeModel.prune(hours=-1), 2)
+        self.assertEqual(ChangeModel.seq_range(), (last, last))
+
+        # the sequence goes on
+        SignalFactory().insert()
+        self.assertEqual(ChangeModel.last_seq(), last + 1)
+
+    def test_commit_order(self):
+        """It should not give a lower seq to a change committed after a higher one"""
+
+        first = Session(bind=db.engine)
+        second = Session(bind=db.engine)
+        first.add(SignalFactory())
+        first.flush()  # logged, not committed
+
+        def insert_second():
+            second.add(SignalFactory())
+            second.commit()
+
+        thread = threading.Thread(target=insert_second)
+        thread.start()
+        thread.join(0.5)  # waits for the first transaction
+
+        seen = ChangeModel.get_after(0)
+        seq = seen[-1].seq if seen else 0
+        db.session.close()
+
+        first.commit()
+        thread.join()
+        rest = ChangeModel.get_after(seq)
+
+        # nothing skipped by a reader going on from the last seq it got
+        self.assertEqual(len(seen) + len(rest), 2)
+        self.assertEqual(
+            [row.seq for row in seen + rest], sorted(row.seq for row in seen + rest)
+        )
+        first.close()
+        second.close()
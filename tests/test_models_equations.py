@@ -0,0 +1,129 @@
+"""
+Test cases for the equation parser
+"""
+import unittest
+import os
+from app import app
+from db import db
+from services.models.tickers import TickerModel
+from services.models.equations import EQUATIONS, EquationCache
+from tests.factories import TickerFactory
+
+# rather than referring to an app directly, use a proxy,
+# which points to the application handling the current activity
+app.app_context().push()
+
+DATABASE_URI = os.environ.get("DATABASE_URI", "sqlite:///test.db")
+
+######################################################################
+#  EQUATION TEST CASES
+######################################################################
+
+
+class TestEquation(unittest.TestCase):
+    """Test Cases for Equation Parser"""
+
+    @classmethod
+    def setUpClass(cls):
+        """This runs once before the entire test suite"""
+        app.config["TESTING"] = True
+        app.config["DEBUG"] = False
+        app.config["SQLALCHEMY_DATABASE_URI"] = DATABASE_URI
+        db.init_app(app)
+        db.create_all()
+
+    @classmethod
+    def tearDownClass(cls):
+        """This runs once after the entire test suite"""
+        db.drop_all()
+
+    def setUp(self):
+        """This runs before each test"""
+        db.session.query(TickerModel).delete()  # clean up the last tests
+        db.session.commit()
+
+        for symbol, sectype, currency in (
+            ("LNT", "STK", "USD"),
+            ("FTS", "STK", "USD"),
+            ("BF.B", "STK", "USD"),
+            ("USD.CAD", "CASH", "CAD"),
+        ):
+            test_ticker = TickerFactory()
+            test_ticker.symbol = symbol
+            test_ticker.sectype = sectype
+            test_ticker.currency = currency
+            test_ticker.insert()
+
+    def tearDown(self):
+        """This runs after each test"""
+        db.session.remove()
+
+    ######################################################################
+    #  TEST CASES
+    ######################################################################
+
+    def test_parse_pair(self):
+        """It should split a pair equation into legs"""
+
+        equation = EQUATIONS.parse("NYSE:LNT-1.25*NYSE:BF.B")
+
+        self.assertTrue(equation.success)
+        self.assertEqual(equation.ticker_type, "pair")
+        self.assertEqual(equation.hedge_param, "1.25")
+        self.assertEqual(equation.legs[0].exchange, "NYSE")
+        self.assertEqual(equation.legs[0].ib_symbol, "LNT")
+        self.assertEqual(equation.legs[1].hedges, ("1.25",))
+        self.assertEqual(equation.legs[1].symbol, "BF.B")
+        self.assertEqual(equation.legs[1].ib_symbol, "BF B")
+
+    def test_parse_single(self):
+        """It should parse a single ticker equation"""
+
+        equation = EQUATIONS.parse("USD.CAD")
+
+        self.assertTrue(equation.success)
+        self.assertEqual(equation.ticker_type, "single")
+        self.assertIsNone(equation.hedge_param)
+        self.assertEqual(equation.legs[0].exchange, "")
+        self.assertEqual(equation.legs[0].ib_symbol, "USD.CAD")
+
+    def test_parse_problematic(self):
+        """It should flag unknown tickers and malformed equations"""
+
+        self.assertFalse(EQUATIONS.parse("LNT-UNKNOWN").success)
+        self.assertFalse(EQUATIONS.parse("2*LNT-FTS").success)
+        self.assertFalse(EQUATIONS.parse("LNT-FTS-LNT").success)
+
+    def test_cache_hits(self):
+        """It should count hits and misses"""
+
+        cache = EquationCache(maxsize=2)
+
+        cache.parse("LNT-FTS")
+        cache.parse("LNT-FTS")
+        cache.parse("LNT")
+        cache.parse("FTS")  # drops the least recently used
+
+        self.assertEqual(cache.info()["hits"], 1)
+        self.assertEqual(cache.info()["misses"], 3)
+        self.assertEqual(cache.info()["size"], 2)
+
+        cache.parse("LNT-FTS")
+        self.assertEqual(cache.info()["misses"], 4)
+
+    def test_invalidate_on_sectype_change(self):
+        """It should parse again after the security type of a ticker changes"""
+
+        self.assertTrue(EQUATIONS.parse("LNT-FTS").success)
+        self.assertTrue(EQUATIONS.parse("USD.CAD").success)
+        misses = EQUATIONS.info()["misses"]
+
+        test_ticker = TickerModel.find_by_symbol("FTS")
+        test_ticker.sectype = "CASH"
+        test_ticker.update(False)
+
+        # assert only the equation using the ticker is parsed again
+        self.assertFalse(EQUATIONS.parse("LNT-FTS").success)
+        self.assertEqual(EQUATIONS.info()["misses"], misses + 1)
+        self.assertTrue(EQUATIONS.parse("USD.CAD").success)
+        self.assertEqual(EQUATIONS.info()["misses"], misses + 1)
@@ -0,0 +1,128 @@
+"""
+Test cases for the executions ledger
+"""
+import unittest
+import os
+from app import app
+from db import db
+from services.models.signals import SignalModel
+from services.models.executions import ExecutionModel
+from tests.factories import SignalFactory
+
+# rather than referring to an app directly, use a proxy,
+# which points to the application handling the current activity
+app.app_context().push()
+
+DATABASE_URI = os.environ.get("DATABASE_URI", "sqlite:///test.db")
+
+######################################################################
+#  EXECUTION MODEL TEST CASES
+######################################################################
+
+
+class TestExecution(unittest.TestCase):
+    """Test Cases for Execution Model"""
+
+    @classmethod
+    def setUpClass(cls):
+        """This runs once before the entire test suite"""
+        app.config["TESTING"] = True
+        app.config["DEBUG"] = False
+        app.config["SQLALCHEMY_DATABASE_URI"] = DATABASE_URI
+        db.init_app(app)
+        db.create_all()
+
+    @classmethod
+    def tearDownClass(cls):
+        """This runs once after the entire test suite"""
+        db.drop_all()
+
+    def setUp(self):
+        """This runs before each test"""
+        db.session.query(SignalModel).delete()  # clean up the last tests
+        db.session.query(ExecutionModel).delete()  # clean up the last tests
+        db.session.commit()
+
+    def tearDown(self):
+        """This runs after each test"""
+        db.session.remove()
+
+    ######################################################################
+    #  H E L P E R   M E T H O D S
+    ######################################################################
+
+    def _create_signal(self):
+        """Pair signal of 100 contracts with a hedge ratio of 2, nothing filled"""
+
+        signal = SignalFactory(
+            ticker_type="pair",
+            order_contracts=100,
+            hedge_param=2,
+            price1=None,
+            price2=None,
+        )
+        signal.insert()
+        return signal
+
+    ######################################################################
+    #  TEST CASES
+    ######################################################################
+
+    def test_add_execution(self):
+        """It should append the executions and keep the running totals"""
+
+        signal = self._create_signal()
+
+        signal.add_execution(1, 40, 10)
+        signal.add_execution(1, 100, 11)
+        signal.add_execution(2, 200, 5)
+        db.session.commit()
+
+        executions = ExecutionModel.find_by_signal(signal.rowid)
+        self.assertEqual([item.qty for item in executions], [40, 60, 200])
+        self.assertEqual([item.price for item in executions], [10, 11.666667, 5])
+        self.assertEqual(executions[0].symbol, signal.ticker1)
+        self.assertEqual(executions[2].order_id, signal.order_id2)
+
+        signal = SignalModel.find_by_rowid(signal.rowid)
+        self.assertEqual(signal.filled_qty1, 100)
+        self.assertEqual(signal.notional1, 1100)
+        self.assertEqual(signal.price1, 11)
+        self.assertEqual(signal.remaining(1), 0)
+        self.assertEqual(signal.remaining(2), 0)
+
+    def test_repeated_status(self):
+        """It should ignore the order status updates without new quantity"""
+
+        signal = self._create_signal()
+
+        self.assertIsNotNone(signal.add_execution(1, 40, 10))
+        self.assertIsNone(signal.add_execution(1, 40, 10))
+        self.assertIsNone(signal.add_execution(1, 30, 10))
+        db.session.commit()
+
+        self.assertEqual(len(ExecutionModel.find_by_signal(signal.rowid)), 1)
+        self.assertEqual(signal.remaining(1), 60)
+
+    def test_fills(self):
+        """It should serialize the running totals of the legs"""
+
+        signal = self._create_signal()
+        signal.add_execution(2, 50, 5)
+
+        fills = signal.fills()
+        self.assertEqual(len(fills["legs"]), 2)
+        self.assertEqual(fills["legs"][0]["filled_qty"], 0)
+        self.assertEqual(fills["legs"][1]["vwap"], 5)
+        self.assertEqual(fills["legs"][1]["remaining"], 150)
+
+    def test_delete_signal(self):
+        """It should delete the executions of a deleted signal"""
+
+        signal = self._create_signal()
+        signal.add_execution(1, 40, 10)
+        db.session.commit()
+
+        signal.delete()
+
+        self.assertEqual(ExecutionModel.query.count(), 0)
@@ -0,0 +1,160 @@
+"""
+Test cases for the group commit writer
+"""
+import unittest
+import os
+import threading
+from unittest import mock
+from sqlalchemy.exc import IntegrityError
+from app import app
+from db import db
+from services.models.signals import SignalModel
+from services.models.signal_keys import SignalKeyModel, RECENT_KEYS
+from services.models.group_commit import GroupCommitWriter
+from tests.factories import SignalFactory
+
+# rather than referring to an app directly, use a proxy,
+# which points to the application handling the current activity
+app.app_context().push()
+
+DATABASE_URI = os.environ.get("DATABASE_URI", "sqlite:///test.db")
+
+######################################################################
+#  GROUP COMMIT TEST CASES
+######################################################################
+
+
+class TestGroupCommit(unittest.TestCase):
+    """Test Cases for Group Commit Writer"""
+
+    @classmethod
+    def setUpClass(cls):
+        """This runs once before the entire test suite"""
+        app.config["TESTING"] = True
+        app.config["DEBUG"] = False
+        app.config["SQLALCHEMY_DATABASE_URI"] = DATABASE_URI
+        db.init_app(app)
+        db.create_all()
+
+    @classmethod
+    def tearDownClass(cls):
+        """This runs once after the entire test suite"""
+        db.drop_all()
+
+    def setUp(self):
+        """This runs before each test"""
+        db.session.query(SignalModel).delete()  # clean up the last tests
+        db.session.query(SignalKeyModel).delete()  # clean up the last tests
+        db.session.commit()
+        RECENT_KEYS.clear()
+        self.writer = GroupCommitWriter(window_ms=200, max_size=10)
+        self.writer._start()
+
+    def tearDown(self):
+        """This runs after each test"""
+        db.session.remove()
+
+    ######################################################################
+    #  H E L P E R   M E T H O D S
+    ######################################################################
+
+    def _insert_concurrently(self, keys):
+        """Insert a signal for each key from a separate thread"""
+
+        items = [SignalFactory() for _ in keys]
+        errors = [None] * len(keys)
+
+        def insert(index):
+            try:
+                self.writer.insert(items[index], keys[index])
+            except Exception as e:
+                errors[index] = e
+
+        threads = [threading.Thread(target=insert, args=(i,)) for i in range(len(keys))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return items, errors
+
+    ######################################################################
+    #  TEST CASES
+    ######################################################################
+
+    def test_group_commit(self):
+        """It should insert concurrent signals with a single commit"""
+
+        items, errors = self._insert_concurrently(["a", "b", None, None, "c"])
+
+        self.assertEqual(errors, [None] * 5)
+        self.assertEqual(self.writer.commits, 1)
+
+        # assert each caller got its own rowid
+        rowids = [item.rowid for item in items]
+        self.assertEqual(len(set(rowids)), 5)
+        self.assertEqual(SignalModel.query.count(), 5)
+        self.assertEqual(SignalKeyModel.find_rowid("c"), items[4].rowid)
+
+    def test_group_commit_error(self):
+        """It should return the error only to the failing caller"""
+
+        SignalFactory().insert("a")
+
+        items, errors = self._insert_concurrently(["b", "a", "c"])
+
+        self.assertIsNone(errors[0])
+        self.assertIsInstance(errors[1], IntegrityError)
+        self.assertIsNone(errors[2])
+        self.assertEqual(SignalModel.query.count(), 3)
+        self.assertEqual(SignalKeyModel.find_rowid("c"), items[2].rowid)
+
+    def test_writer_timeout(self):
+        """It should give the signal back to the caller if the writer does not take it"""
+
+        writer = GroupCommitWriter(window_ms=10, max_size=10, timeout=0.5)
+        release = threading.Event()
+        writer._thread = threading.Thread(target=release.wait, daemon=True)  # a stuck writer
+        writer._thread.start()
+
+        item = SignalFactory()
+        self.assertFalse(writer.insert(item))
+        release.set()
+
+        # inserted by the caller, skipped by the writer
+        item.insert()
+        writer._thread.join()
+        self.assertTrue(writer.insert(SignalFactory()))
+        self.assertEqual(SignalModel.query.count(), 2)
+        self.assertEqual(writer.commits, 1)
+
+    def test_writer_error(self):
+        """It should return a writer error to the callers and keep writing"""
+
+        write_group = self.writer._write_group
+        calls = []
+
+        def write_group_failing_once(session, group):
+            calls.append(group)
+            if len(calls) == 1:
+                raise RuntimeError("session error")
+            write_group(session, group)
+
+        with mock.patch.object(self.writer, "_write_group", side_effect=write_group_failing_once):
+            with self.assertRaises(RuntimeError):
+                self.writer.insert(SignalFactory())
+
+            self.assertTrue(self.writer.insert(SignalFactory()))
+
+        self.assertEqual(SignalModel.query.count(), 1)
+
+    def test_writer_restart(self):
+        """It should start the writer again after it stopped"""
+
+        writer = GroupCommitWriter(window_ms=200, max_size=10)
+        writer._thread = threading.Thread(target=lambda: None)  # a stopped writer
+        writer._thread.start()
+        writer._thread.join()
+
+        self.assertTrue(writer.insert(SignalFactory()))
+        self.assertTrue(writer._thread.is_alive())
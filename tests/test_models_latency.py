@@ -0,0 +1,70 @@
+"""
+Test cases for the latency histograms
+"""
+import unittest
+from services.models.latency import Histogram, LatencyStats, StageTimer, stage, LATENCY
+
+######################################################################
+#  LATENCY TEST CASES
+######################################################################
+
+
+class TestLatency(unittest.TestCase):
+    """Test Cases for Latency Histograms"""
+
+    def setUp(self):
+        """This runs before each test"""
+        LATENCY.reset()
+
+    ######################################################################
+    #  TEST CASES
+    ######################################################################
+
+    def test_percentiles(self):
+        """It should return the percentiles within 1%"""
+
+        histogram = Histogram()
+        for value in range(1, 10001):  # 1 to 10000 us
+            histogram.record(value / 1e6)
+
+        self.assertEqual(histogram.total, 10000)
+        self.assertAlmostEqual(histogram.percentile(50), 5000, delta=50)
+        self.assertAlmostEqual(histogram.percentile(95), 9500, delta=95)
+        self.assertAlmostEqual(histogram.percentile(99), 9900, delta=99)
+        self.assertEqual(histogram.percentile(100), 10000)
+        self.assertEqual(histogram.json()["max"], 10)
+
+    def test_small_values(self):
+        """It should keep the small values exact"""
+
+        histogram = Histogram()
+        for value in (0, 1, 2, 3):
+            histogram.record(value / 1e6)
+
+        self.assertEqual(histogram.percentile(50), 1)
+        self.assertEqual(Histogram().percentile(50), 0)
+
+    def test_stage_timer(self):
+        """It should record the stages of the current timer only"""
+
+        with stage("outside"):
+            pass
+
+        with StageTimer("endpoint") as timer:
+            with stage("parse"):
+                pass
+
+        self.assertEqual([name for name, _ in timer.stages], ["parse", "total"])
+        self.assertIn("parse;dur=", timer.server_timing())
+        self.assertEqual(
+            sorted(LATENCY.json()), ["endpoint.parse", "endpoint.total"]
+        )
+
+    def test_reset(self):
+        """It should forget the histograms"""
+
+        stats = LatencyStats()
+        stats.histogram("a").record(0.1)
+        stats.reset()
+
+        self.assertEqual(stats.json(), {})
@@ -0,0 +1,216 @@
+"""
+Test cases for the schema migrations
+"""
+import unittest
+import os
+from datetime import date, datetime
+from sqlalchemy import inspect
+from sqlalchemy.dialects import sqlite
+from app import app
+from db import db
+from services.models.signals import SignalModel
+from services.models.slip_rollups import SlipRollupModel
+from services.models.migrations import (
+    MigrationModel,
+    Migration,
+    add_columns,
+    run_migrations,
+    MIGRATIONS,
+)
+
+from tests.statements import count_statements
+
+# rather than referring to an app directly, use a proxy,
+# which points to the application handling the current activity
+app.app_context().push()
+
+DATABASE_URI = os.environ.get("DATABASE_URI", "sqlite:///test.db")
+
+# signals table before the migrations
+LEGACY_SIGNALS = (
+    "CREATE TABLE signals (rowid INTEGER PRIMARY KEY, timestamp DATETIME, ticker VARCHAR, "
+    "ticker_type VARCHAR, ticker1 VARCHAR, ticker2 VARCHAR, order_status VARCHAR)"
+)
+
+######################################################################
+#  MIGRATIONS TEST CASES
+######################################################################
+
+
+class TestMigrations(unittest.TestCase):
+    """Test Cases for the Migration Runner"""
+
+    @classmethod
+    def setUpClass(cls):
+        """This runs once before the entire test suite"""
+        app.config["TESTING"] = True
+        app.config["DEBUG"] = False
+        app.config["SQLALCHEMY_DATABASE_URI"] = DATABASE_URI
+        db.init_app(app)
+
+    @classmethod
+    def tearDownClass(cls):
+        """This runs once after the entire test suite"""
+        db.drop_all()
+
+    def setUp(self):
+        """This runs before each test"""
+        db.drop_all()  # clean up the last tests
+        db.create_all()
+
+    def tearDown(self):
+        """This runs after each test"""
+        db.session.remove()
+
+    ######################################################################
+    #  H E L P E R   M E T H O D S
+    ######################################################################
+
+    def _plan(self, query) -> str:
+        """Query plan of an ORM query"""
+
+        statement = query.statement.compile(
+            dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}
+        )
+        rows = db.session.execute("EXPLAIN QUERY PLAN " + str(statement))
+        return " | ".join(row[-1] for row in rows)
+
+    ######################################################################
+    #  TEST CASES
+    ######################################################################
+
+    def test_migrate_legacy_database(self):
+        """It should add the indexes & columns to an existing signals table"""
+
+        SignalModel.__table__.drop(bind=db.engine)
+        MigrationModel.__table__.drop(bind=db.engine)
+        with db.engine.begin() as connection:
+            connection.exec_driver_sql(LEGACY_SIGNALS)
+            connection.exec_driver_sql("DROP INDEX ix_simplesession_expiry")
+
+        self.assertEqual(run_migrations(), [1, 2, 3, 4, 5])
+
+        inspector = inspect(db.engine)
+        indexes = {index["name"] for index in inspector.get_indexes("signals")}
+        self.assertLessEqual(
+            {"ix_signals_pair", "ix_signals_single", "ix_signals_status"}, indexes
+        )
+        self.assertIn("ix_signals_timestamp", indexes)
+        columns = {column["name"] for column in inspector.get_columns("signals")}
+        self.assertIn("filled_qty1", columns)
+        self.assertIn("notional2", columns)
+        indexes = {index["name"] for index in inspector.get_indexes("simplesession")}
+        self.assertIn("ix_simplesession_expiry", indexes)
+
+        # recorded once
+        self.assertEqual(run_migrations(), [])
+        self.assertEqual(MigrationModel.query.count(), len(MIGRATIONS))
+
+    def test_migrate_new_database(self):
+        """It should record the migrations of a database created from the models"""
+
+        self.assertEqual(run_migrations(), [1, 2, 3, 4, 5])
+        self.assertEqual(
+            [item.json()["name"] for item in MigrationModel.query.order_by(MigrationModel.version)],
+            [
+                "signal_indexes",
+                "signal_fill_totals",
+                "session_indexes",
+                "signal_key_orphans",
+                "signal_timestamp_index",
+            ],
+        )
+
+    def test_applied_by_another_worker(self):
+        """It should skip a migration recorded while it was applied"""
+
+        def upgrade(connection):
+            # the other worker records the version first
+            with db.engine.begin() as other:
+                other.execute(MigrationModel.__table__.insert(), {"version": 6, "name": "other"})
+
+        run_migrations()
+        self.assertEqual(run_migrations(MIGRATIONS + (Migration(6, "test", upgrade),)), [])
+        self.assertEqual(MigrationModel.query.filter_by(version=6).first().name, "other")
+
+    def test_schema_changed_by_another_worker(self):
+        """It should skip a migration whose schema change fails after another worker made it"""
+
+        def other_worker(connection):
+            # the other worker adds the column & records the version first
+            with db.engine.begin() as other:
+                add_columns(other, SignalModel.__table__, ("filled_qty1",))
+                other.execute(MigrationModel.__table__.insert(), {"version": 2, "name": "other"})
+
+        def upgrade(connection):
+            # checked the schema before the other worker
+            connection.exec_driver_sql(
+                "ALTER TABLE signals ADD COLUMN filled_qty1 FLOAT"
+            )
+
+        SignalModel.__table__.drop(bind=db.engine)
+        MigrationModel.__table__.drop(bind=db.engine)
+        with db.engine.begin() as connection:
+            connection.exec_driver_sql(LEGACY_SIGNALS)
+
+        migrations = (
+            Migration(1, "signal_indexes", other_worker),
+            Migration(2, "signal_fill_totals", upgrade),
+        )
+        self.assertEqual(run_migrations(migrations), [1])
+        self.assertEqual(MigrationModel.query.filter_by(version=2).first().name, "other")
+
+    def test_migration_retried(self):
+        """It should run a failed migration once more, then raise the error"""
+
+        calls = []
+
+        def upgrade(connection):
+            calls.append(connection)
+            if len(calls) == 1:
+                # the schema change of another worker not recorded yet
+                connection.exec_driver_sql("SELECT * FROM missing_table")
+
+        run_migrations()
+        self.assertEqual(run_migrations(MIGRATIONS + (Migration(6, "test", upgrade),)), [6])
+        self.assertEqual(len(calls), 2)
+
+        def failing(connection):
+            connection.exec_driver_sql("SELECT * FROM missing_table")
+
+        with self.assertRaises(Exception):
+            run_migrations(MIGRATIONS + (Migration(7, "failing", failing),))
+        self.assertIsNone(MigrationModel.query.filter_by(version=7).first())
+
+    @unittest.skipUnless(DATABASE_URI.startswith("sqlite"), "sqlite query plans")
+    def test_explain_signal_lists(self):
+        """It should read the signal lists with the indexes, without sorting"""
+
+        plan = self._plan(SignalModel.get_list_ticker("A-B", "5"))
+        self.assertIn("USING INDEX ix_signals_pair", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+        plan = self._plan(SignalModel.get_list_ticker("A", "5"))
+        self.assertIn("USING INDEX ix_signals_single", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+        plan = self._plan(
+            SignalModel.get_list_ticker_dates("A-B", "5", "2022-01-01", "2022-02-01")
+        )
+        self.assertIn("USING INDEX ix_signals_pair", plan)
+
+        plan = self._plan(SignalModel.get_list_status("filled", "5"))
+        self.assertIn("USING INDEX ix_signals_status", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+        # waiting or rerouted: the matching rows are sorted, no table scan
+        plan = self._plan(SignalModel.get_list_status("waiting", "5"))
+        self.assertIn("USING INDEX ix_signals_status", plan)
+
+        # signals stamped at the end of the slip averages
+        with count_statements() as statements:
+            SlipRollupModel.get_stats("A-B", date(2022, 3, 1), date(2022, 3, 2), datetime(2022, 3, 2))
+        rows = db.session.connection().exec_driver_sql(
+            "EXPLAIN QUERY PLAN " + statements[-1], statements.parameters[-1]
+        )
+        self.assertIn("USING INDEX ix_signals_timestamp", " | ".join(row[-1] for row in rows))
@@ -0,0 +1,121 @@
+"""
+Test cases for the long poll change notifications
+"""
+import unittest
+from unittest import mock
+import sys
+import tempfile
+import types
+import threading
+import time
+from app import app
+from services.models import notifier
+from services.models.stamps import VersionStamp
+
+######################################################################
+#  CHANGE NOTIFIER TEST CASES
+######################################################################
+
+
+class TestChangeNotifier(unittest.TestCase):
+    """Test Cases for the Change Notifier"""
+
+    def setUp(self):
+        """This runs before each test"""
+        self.stamp = VersionStamp("test_notifier", tempfile.mkdtemp())
+        self.changes = notifier.ChangeNotifier(self.stamp, max_waiters=1)
+        self.result = []
+
+    def _check(self):
+        return list(self.result)
+
+    ######################################################################
+    #  TEST CASES
+    ######################################################################
+
+    def test_immediate(self):
+        """It should return at once when the check has a result"""
+
+        self.result.append(1)
+        start = time.monotonic()
+        self.assertEqual(self.changes.wait_for(self._check, 5), [1])
+        self.assertLess(time.monotonic() - start, 0.1)
+
+    def test_timeout(self):
+        """It should return the empty result after the timeout"""
+
+        start = time.monotonic()
+        self.assertEqual(self.changes.wait_for(self._check, 0.3), [])
+        self.assertGreaterEqual(time.monotonic() - start, 0.3)
+        self.assertEqual(self.changes.waiters, 0)
+
+    def test_notify(self):
+        """It should check again after a local notification"""
+
+        def change():
+            time.sleep(0.1)
+            self.result.append(1)
+            self.changes.notify()
+
+        threading.Thread(target=change).start()
+        start = time.monotonic()
+        self.assertEqual(self.changes.wait_for(self._check, 5), [1])
+        self.assertLess(time.monotonic() - start, 1)
+
+    def test_stamp(self):
+        """It should check again after a commit of another worker bumps the stamp"""
+
+        def change():
+            time.sleep(0.1)
+            self.result.append(1)
+            self.stamp.bump()  # no local notification
+
+        threading.Thread(target=change).start()
+        start = time.monotonic()
+        self.assertEqual(self.changes.wait_for(self._check, 5), [1])
+        self.assertLess(time.monotonic() - start, 1 + notifier.CHECK_INTERVAL)
+
+    def test_max_waiters(self):
+        """It should not hold more than max_waiters requests"""
+
+        thread = threading.Thread(target=self.changes.wait_for, args=(self._check, 0.5))
+        thread.start()
+        time.sleep(0.1)
+
+        start = time.monotonic()
+        self.assertEqual(self.changes.wait_for(self._check, 5), [])
+        self.assertLess(time.monotonic() - start, 0.1)
+        thread.join()
+
+    def test_thread_budget(self):
+        """It should not hold more request threads than the budget"""
+
+        budget = notifier.ThreadBudget(1)
+        changes = notifier.ChangeNotifier(self.stamp, max_waiters=5, budget=budget)
+
+        thread = threading.Thread(target=changes.wait_for, args=(self._check, 0.5))
+        thread.start()
+        time.sleep(0.1)
+        self.assertEqual(budget.held, 1)
+
+        start = time.monotonic()
+        self.assertEqual(changes.wait_for(self._check, 5), [])
+        self.assertLess(time.monotonic() - start, 0.1)
+        thread.join()
+        self.assertEqual(budget.held, 0)
+
+    def test_request_threads(self):
+        """It should leave the spare threads of the uwsgi worker to the other requests"""
+
+        self.assertIsNone(notifier.request_threads())  # not run by uwsgi
+        self.assertIsNone(notifier.held_threads(None))
+
+        uwsgi = types.SimpleNamespace(opt={"threads": b"8"})
+        with mock.patch.dict(sys.modules, {"uwsgi": uwsgi}):
+            self.assertEqual(notifier.request_threads(), 8)
+            self.assertEqual(notifier.held_threads(8), 8 - notifier.SPARE_THREADS)
+
+            uwsgi.opt = {}  # a single request thread
+            self.assertEqual(notifier.request_threads(), 1)
+            self.assertEqual(notifier.held_threads(1), 0)
+            self.assertFalse(notifier.ThreadBudget(0).acquire())
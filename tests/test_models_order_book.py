@@ -0,0 +1,199 @@
+"""
+Test cases for the in-memory order book
+"""
+import unittest
+import os
+import json
+from unittest import mock
+from app import app
+from db import db
+from services.models.signals import SignalModel, ORDER_BOOK, JSON_FIELDS
+from services.models.changes import ChangeModel
+from services.models.order_book import OrderBook, BookEntry
+from services.models.table_stamps import TABLE_STAMPS
+from tests.statements import count_statements
+from tests.factories import SignalFactory
+
+# rather than referring to an app directly, use a proxy,
+# which points to the application handling the current activity
+app.app_context().push()
+
+DATABASE_URI = os.environ.get("DATABASE_URI", "sqlite:///test.db")
+
+######################################################################
+#  ORDER BOOK TEST CASES
+######################################################################
+
+
+class TestOrderBook(unittest.TestCase):
+    """Test Cases for the Order Book"""
+
+    @classmethod
+    def setUpClass(cls):
+        """This runs once before the entire test suite"""
+        app.config["TESTING"] = True
+        app.config["DEBUG"] = False
+        app.config["SQLALCHEMY_DATABASE_URI"] = DATABASE_URI
+        db.init_app(app)
+        db.create_all()
+
+    @classmethod
+    def tearDownClass(cls):
+        """This runs once after the entire test suite"""
+        db.drop_all()
+
+    def setUp(self):
+        """This runs before each test"""
+        db.session.query(SignalModel).delete()  # clean up the last tests
+        db.session.commit()
+
+    def tearDown(self):
+        """This runs after each test"""
+        db.session.remove()
+
+    def _create_signals(self, *statuses):
+        """Insert a signal for each status, returns the rowids"""
+
+        rowids = []
+        for order_status in statuses:
+            signal = SignalFactory(order_status=order_status)
+            signal.insert()
+            rowids.append(signal.rowid)
+
+        return rowids
+
+    ######################################################################
+    #  TEST CASES
+    ######################################################################
+
+    def test_active_signals(self):
+        """It should keep the active signals by rowid, order id & ticker"""
+
+        waiting, filled, rerouted, error = self._create_signals(
+            "waiting", "filled", "rerouted", "error"
+        )
+
+        self.assertEqual(ORDER_BOOK.rowids(("waiting", "rerouted")), [rerouted, waiting])
+        self.assertEqual(ORDER_BOOK.latest(("waiting", "rerouted")), rerouted)
+        self.assertNotIn(error, ORDER_BOOK.signals)  # terminal, selected by status
+
+        signal = SignalModel.find_by_rowid(waiting)
+        entry = ORDER_BOOK.signals[waiting]
+        self.assertEqual(
+            entry,
+            BookEntry("waiting", signal.order_id1, signal.order_id2, signal.ticker1, signal.ticker2),
+        )
+        self.assertIn(waiting, ORDER_BOOK.find(signal.order_id1, signal.ticker1))
+        self.assertIn(waiting, ORDER_BOOK.find(signal.order_id2))
+        self.assertNotIn(filled, ORDER_BOOK.signals)
+
+        # filled & failed signals are removed
+        signal.order_status = "filled"
+        signal.update(waiting)
+        failed = SignalModel.find_by_rowid(rerouted)
+        failed.order_status = "critical err"
+        failed.update(rerouted)
+        ORDER_BOOK.sync()
+        self.assertEqual(ORDER_BOOK.signals, {})
+        self.assertNotIn(waiting, ORDER_BOOK.find(signal.order_id1))
+
+        self.assertEqual(ORDER_BOOK.check(), [])
+
+    def test_other_worker(self):
+        """It should apply the changes committed by the other workers"""
+
+        self._create_signals("waiting")
+        book = OrderBook(SignalModel.__table__)
+        book.sync()
+
+        with mock.patch.object(book, "_load", wraps=book._load) as load:
+            rowids = self._create_signals("waiting", "part.filled")
+            self.assertEqual(book.rowids(("part.filled",)), rowids[1:])
+            load.assert_not_called()
+
+            # no change after the last one applied: only the last seq read
+            seq = book.seq
+            with count_statements() as statements:
+                book.sync()
+            self.assertEqual(book.seq, seq)
+            self.assertEqual(len(statements), 1)
+
+            # committed on another host: the stamp files of this one are unchanged
+            with mock.patch.object(TABLE_STAMPS["changes"], "bump"):
+                rowids = self._create_signals("rerouted")
+            self.assertEqual(book.rowids(("rerouted",)), rowids)
+            load.assert_not_called()
+
+            # the changes it needs are pruned
+            for signal in SignalFactory.create_batch(2):
+                signal.insert()
+            ChangeModel.prune(hours=-1)
+            book.sync()
+            load.assert_called_once()
+
+        ORDER_BOOK.sync()
+        self.assertEqual(book.signals, ORDER_BOOK.signals)
+        self.assertEqual(book.check(), [])
+
+    def test_partial_update(self):
+        """It should log the whole signal when a column of a sparse one is set"""
+
+        [rowid] = self._create_signals("waiting")
+        signal = SignalModel.find_by_rowid(rowid, fields=["error_msg"])
+
+        signal.error_msg = "(warned)"
+        SignalModel.update_all([signal])
+
+        [change] = ChangeModel.get_after(ChangeModel.last_seq() - 1)
+        self.assertEqual(list(json.loads(change.data)), list(JSON_FIELDS))
+        self.assertEqual(ORDER_BOOK.check(), [])
+
+    def test_bulk_delete(self):
+        """It should load the book again after a bulk delete"""
+
+        self._create_signals("waiting", "part.filled")
+        ORDER_BOOK.sync()
+        self.assertEqual(len(ORDER_BOOK.signals), 2)
+
+        db.session.query(SignalModel).delete()
+        db.session.commit()
+
+        self.assertEqual(ORDER_BOOK.rowids(("waiting",)), [])
+        self.assertEqual(ORDER_BOOK.check(), [])
+
+    def test_queries(self):
+        """It should select the waiting signals by the rowids of the book"""
+
+        waiting, _, rerouted = self._create_signals("waiting", "filled", "rerouted")
+        self.assertEqual(SignalModel.check_latest().rowid, rerouted)
+
+        ORDER_BOOK.sync()
+        with count_statements() as statements:
+            items = SignalModel.get_list_status("waiting", "0")
+            self.assertEqual([item.rowid for item in items], [rerouted, waiting])
+            self.assertIn("signals.rowid IN (", statements[-1])
+            self.assertTrue({waiting, rerouted} <= set(statements.values(-1)))
+
+            items = SignalModel.get_list_status("waiting", "1", before=rerouted, rows=True)
+            self.assertEqual([item.rowid for item in items], [waiting])
+
+            # the last seq of the book is read, no signal without waiting ones after rerouted
+            statements.clear()
+            self.assertEqual(SignalModel.get_waiting_after(rerouted, 10), [])
+            self.assertEqual(len(statements), 1)
+            self.assertNotIn("FROM signals", statements[0])
+
+            # more rowids than bind parameters allowed: by status
+            with mock.patch("services.models.signals.MAX_ROWIDS", 1):
+                items = SignalModel.get_list_status("waiting", "0")
+                self.assertEqual([item.rowid for item in items], [rerouted, waiting])
+                self.assertNotIn("signals.rowid IN", statements[-1])
+
+                items = SignalModel.get_waiting_after(0, 10)
+                self.assertEqual([item.rowid for item in items], [waiting, rerouted])
+
+        # the error signals by status, not kept in the book
+        [error] = self._create_signals("error")
+        self.assertEqual(SignalModel.check_latest().rowid, error)
+        self.assertEqual([item.rowid for item in SignalModel.get_list_status("error", "0")], [error])
+        self.assertEqual(ORDER_BOOK.check(), [])
@@ -6,6 +6,7 @@ import os
 from app import app
 from db import db
 from services.models.pairs import PairModel
+from tests.statements import count_statements
 from tests.factories import PairFactory
 
 # rather than referring to an app directly, use a proxy,
@@ -317,3 +318,27 @@ class TestPair(unittest.TestCase):
         self.assertEqual(pair_found.ticker1, ticker1_names[1])
         pair_found = PairModel.find_active_ticker(ticker1_names[2])
         self.assertIsNone(pair_found)
+
+    def test_update_statements(self):
+        """It should update a Pair with a single UPDATE of the changed columns"""
+
+        test_pair = PairFactory()
+        test_pair.insert()
+        name = test_pair.name
+
+        with count_statements() as statements:
+            # built from the arguments: no SELECT before the UPDATE
+            PairFactory(name=name, status=1).update()
+            self.assertEqual(len(statements), 2)
+            self.assertTrue(statements[0].startswith("UPDATE pairs SET"))
+            # the version of the table, bumped by the commit
+            self.assertTrue(statements[1].startswith("UPDATE table_versions SET"))
+
+            # loaded from the database: only the changed column is written
+            item = PairModel.find_by_name(name)
+            statements.clear()
+            item.status = 0
+            item.update()
+            self.assertEqual(len(statements), 2)
+            self.assertRegex(statements[0], r"^UPDATE pairs SET status=\S+ WHERE")
+            self.assertEqual(statements.values(0)[0], 0)
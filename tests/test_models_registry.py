@@ -0,0 +1,175 @@
+"""
+Test cases for the ticker & pair registry
+"""
+import unittest
+import os
+from app import app
+from db import db
+from services.models.tickers import TickerModel
+from services.models.pairs import PairModel
+from services.models.registry import REGISTRY
+from services.models.stamps import VersionStamp
+from tests.statements import count_statements
+from tests.factories import TickerFactory
+from tests.factories import PairFactory
+
+# rather than referring to an app directly, use a proxy,
+# which points to the application handling the current activity
+app.app_context().push()
+
+DATABASE_URI = os.environ.get("DATABASE_URI", "sqlite:///test.db")
+
+######################################################################
+#  REGISTRY TEST CASES
+######################################################################
+
+
+class TestRegistry(unittest.TestCase):
+    """Test Cases for Registry"""
+
+    @classmethod
+    def setUpClass(cls):
+        """This runs once before the entire test suite"""
+        app.config["TESTING"] = True
+        app.config["DEBUG"] = False
+        app.config["SQLALCHEMY_DATABASE_URI"] = DATABASE_URI
+        db.init_app(app)
+        db.create_all()
+
+    @classmethod
+    def tearDownClass(cls):
+        """This runs once after the entire test suite"""
+        db.drop_all()
+
+    def setUp(self):
+        """This runs before each test"""
+        db.session.query(TickerModel).delete()  # clean up the last tests
+        db.session.query(PairModel).delete()  # clean up the last tests
+        db.session.commit()
+        self.counting = count_statements()
+        self.statements = self.counting.__enter__()
+
+    def tearDown(self):
+        """This runs after each test"""
+        self.counting.__exit__(None, None, None)
+        db.session.remove()
+
+    ######################################################################
+    #  H E L P E R   M E T H O D S
+    ######################################################################
+
+    def _create_ticker(self, symbol="TEST", active=1):
+        """Adds 1 ticker to the database"""
+        test_ticker = TickerFactory()
+        test_ticker.symbol = symbol
+        test_ticker.sectype = "STK"
+        test_ticker.currency = "USD"
+        test_ticker.active = active
+        test_ticker.insert()
+        return test_ticker
+
+    ######################################################################
+    #  TEST CASES
+    ######################################################################
+
+    def test_ticker_read_through(self):
+        """It should read a ticker once and then answer from memory"""
+
+        self._create_ticker()
+        self.statements.clear()
+
+        entry = REGISTRY.ticker("TEST")
+        self.assertEqual(entry.symbol, "TEST")
+        self.assertEqual(entry.active, 1)
+        self.assertEqual(len(self.statements), 1)
+
+        # assert no more queries
+        for _ in range(3):
+            self.assertEqual(REGISTRY.ticker("TEST"), entry)
+        self.assertEqual(len(self.statements), 1)
+
+    def test_unknown_ticker_cached(self):
+        """It should remember unknown tickers until something changes"""
+
+        self.assertIsNone(REGISTRY.ticker("UNKNOWN"))
+        self.assertIsNone(REGISTRY.ticker("UNKNOWN"))
+        self.assertEqual(len(self.statements), 1)
+
+        # assert a new ticker is seen
+        self._create_ticker("UNKNOWN")
+        self.assertIsNotNone(REGISTRY.ticker("UNKNOWN"))
+
+    def test_invalidate_on_update(self):
+        """It should forget a ticker whose status is updated"""
+
+        test_ticker = self._create_ticker(active=0)
+        self.assertEqual(REGISTRY.ticker("TEST").active, 0)
+
+        test_ticker.active = 1
+        test_ticker.update(False)
+        self.assertEqual(REGISTRY.ticker("TEST").active, 1)
+
+        # written with the request arguments, without loading the row
+        new_ticker = TickerFactory(symbol="TEST", sectype="STK", currency="USD", active=0)
+        new_ticker.update(False)
+        self.assertEqual(REGISTRY.ticker("TEST").active, 0)
+
+    def test_keep_on_pnl_update(self):
+        """It should not be invalidated by the PNL updates"""
+
+        test_ticker = self._create_ticker()
+        REGISTRY.ticker("TEST")
+        self.statements.clear()
+
+        test_ticker.active_pnl = 12.5
+        test_ticker.update(True)
+        self.statements.clear()
+
+        REGISTRY.ticker("TEST")
+        self.assertEqual(len(self.statements), 0)
+
+    def test_invalidate_on_delete(self):
+        """It should forget deleted tickers and pairs"""
+
+        test_ticker = self._create_ticker()
+        test_pair = PairFactory()
+        test_pair.name = "TEST-OTHER"
+        test_pair.ticker1 = "TEST"
+        test_pair.ticker2 = "OTHER"
+        test_pair.insert()
+
+        self.assertIsNotNone(REGISTRY.ticker("TEST"))
+        self.assertIsNotNone(REGISTRY.pair("TEST-OTHER"))
+
+        test_ticker.delete()
+        test_pair.delete()
+
+        self.assertIsNone(REGISTRY.ticker("TEST"))
+        self.assertIsNone(REGISTRY.pair("TEST-OTHER"))
+
+    def test_invalidate_by_other_worker(self):
+        """It should be cleared when another worker bumps the version stamp"""
+
+        self._create_ticker()
+        REGISTRY.ticker("TEST")
+        self.statements.clear()
+
+        VersionStamp("registry").bump()
+
+        REGISTRY.ticker("TEST")
+        self.assertEqual(len(self.statements), 1)
+
+    def test_snapshot(self):
+        """It should check the version stamp once for a batch of lookups"""
+
+        self._create_ticker()
+        REGISTRY.ticker("TEST")
+        self.statements.clear()
+
+        with REGISTRY.snapshot():
+            VersionStamp("registry").bump()  # ignored until the end of the batch
+            REGISTRY.ticker("TEST")
+            self.assertEqual(len(self.statements), 0)
+
+        REGISTRY.ticker("TEST")
+        self.assertEqual(len(self.statements), 1)
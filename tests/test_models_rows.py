@@ -0,0 +1,97 @@
+"""
+Test cases for the row tuple read path
+"""
+import unittest
+import os
+from app import app
+from db import db
+from services.models import signals, tickers, pairs, account
+from tests.factories import SignalFactory, TickerFactory, PairFactory, AccountFactory
+
+# rather than referring to an app directly, use a proxy,
+# which points to the application handling the current activity
+app.app_context().push()
+
+DATABASE_URI = os.environ.get("DATABASE_URI", "sqlite:///test.db")
+
+MODELS = (
+    (signals.SignalModel, signals.JSON_ROWS, SignalFactory),
+    (tickers.TickerModel, tickers.JSON_ROWS, TickerFactory),
+    (pairs.PairModel, pairs.JSON_ROWS, PairFactory),
+    (account.AccountModel, account.JSON_ROWS, AccountFactory),
+)
+
+######################################################################
+#  JSON ROWS TEST CASES
+######################################################################
+
+
+class TestJSONRows(unittest.TestCase):
+    """Test Cases for the Row Tuple Read Path"""
+
+    @classmethod
+    def setUpClass(cls):
+        """This runs once before the entire test suite"""
+        app.config["TESTING"] = True
+        app.config["DEBUG"] = False
+        app.config["SQLALCHEMY_DATABASE_URI"] = DATABASE_URI
+        db.init_app(app)
+        db.create_all()
+
+    @classmethod
+    def tearDownClass(cls):
+        """This runs once after the entire test suite"""
+        db.drop_all()
+
+    def setUp(self):
+        """This runs before each test"""
+        for model, _, _ in MODELS:
+            db.session.query(model).delete()  # clean up the last tests
+        db.session.commit()
+
+    def tearDown(self):
+        """This runs after each test"""
+        db.session.remove()
+
+    ######################################################################
+    #  TEST CASES
+    ######################################################################
+
+    def test_same_as_json(self):
+        """It should map the rows to the json() of the model instances"""
+
+        for model, json_rows, factory in MODELS:
+            for item in factory.create_batch(3):
+                item.insert()
+            db.session.remove()
+
+            expected = [item.json() for item in model.get_rows("0")]
+            db.session.remove()
+
+            rows = model.get_rows("0", rows=True).all()
+            self.assertEqual([json_rows.json(row) for row in rows], expected)
+
+            # no model instances
+            self.assertEqual(len(db.session.identity_map), 0)
+
+    def test_sparse_fieldset(self):
+        """It should map the rows of a sparse fieldset"""
+
+        test_signal = SignalFactory()
+        test_signal.insert()
+
+        fields = ["order_status", "timestamp", "rowid"]
+        rows = signals.SignalModel.get_rows("0", fields=fields, rows=True).all()
+        self.assertEqual(
+            signals.JSON_ROWS.json(rows[0], fields),
+            {
+                "order_status": test_signal.order_status,
+                "timestamp": str(test_signal.timestamp),
+                "rowid": test_signal.rowid,
+            },
+        )
+
+        rows = signals.SignalModel.get_list_status(
+            test_signal.order_status, "1", fields=["ticker"], rows=True
+        ).all()
+        self.assertEqual(signals.JSON_ROWS.json(rows[0], ["ticker"]), {"ticker": test_signal.ticker})
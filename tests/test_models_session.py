@@ -7,7 +7,8 @@ import pytz
 import os
 from app import app
 from db import db
-from services.models.session import SessionModel
+from services.models.session import SessionModel, SessionCache, SESSION_CACHE
+from services.models.stamps import VersionStamp
 from tests.factories import SessionFactory
 
 # rather than referring to an app directly, use a proxy,
@@ -166,3 +167,94 @@ class TestSession(unittest.TestCase):
         # delete expired sessions & assert
         SessionModel.delete_expired()
         self.assertEqual(SessionModel.get_all().count(), 1)
+
+    def test_find_active(self):
+        """It should not find the expired Sessions not swept yet"""
+
+        expired_session = SessionFactory()
+        expired_session.expiry = datetime.datetime.now(tz=pytz.utc) - datetime.timedelta(
+            minutes=1
+        )
+        expired_session.insert()
+
+        active_session = SessionFactory()
+        active_session.expiry = datetime.datetime.now(tz=pytz.utc) + datetime.timedelta(
+            days=1
+        )
+        active_session.insert()
+
+        self.assertIsNotNone(SessionModel.find_by_value(expired_session.value))
+        self.assertIsNone(SessionModel.find_active(expired_session.value))
+        self.assertEqual(
+            SessionModel.find_active(active_session.value).value, active_session.value
+        )
+        self.assertIsNone(SessionModel.find_active("fake"))
+
+    def test_find_cached(self):
+        """It should serve the Session lookups from the cache"""
+
+        test_session = SessionFactory()
+        test_session.insert()
+
+        SessionModel.find_by_value(test_session.value)
+        SessionModel.find_by_value("fake")
+
+        hits = SESSION_CACHE.hits
+        with self.assertRaises(AssertionError):
+            # no query
+            with self.assertLogs("sqlalchemy.engine", "INFO"):
+                found = SessionModel.find_by_value(test_session.value)
+                missing = SessionModel.find_by_value("fake")
+
+        self.assertEqual(SESSION_CACHE.hits, hits + 2)
+        self.assertEqual(found.value, test_session.value)
+        self.assertIsNone(missing)
+
+    def test_delete_clears_cache(self):
+        """It should not find a deleted Session in the cache"""
+
+        test_session = SessionFactory()
+        test_session.insert()
+        self.assertIsNotNone(SessionModel.find_by_value(test_session.value))
+
+        # a logout
+        self.assertEqual(SessionModel.delete_by_value(test_session.value), 1)
+        self.assertIsNone(SessionModel.find_by_value(test_session.value))
+
+        # a login after a miss
+        new_session = SessionFactory()
+        self.assertIsNone(SessionModel.find_by_value(new_session.value))
+        new_session.insert()
+        self.assertIsNotNone(SessionModel.find_by_value(new_session.value))
+
+    def test_cache_stamp(self):
+        """It should clear the cached lookups on a commit of another worker"""
+
+        stamp = VersionStamp("test-sessions")
+        cache = SessionCache(stamp, ttl=60, maxsize=2)
+        reads = []
+
+        def read(value):
+            reads.append(value)
+            return None
+
+        cache.get("a", read)
+        cache.get("a", read)
+        self.assertEqual(reads, ["a"])
+
+        stamp.bump()
+        cache.get("a", read)
+        self.assertEqual(reads, ["a", "a"])
+
+        # bounded, the oldest lookup is dropped
+        cache.get("b", read)
+        cache.get("c", read)
+        cache.get("a", read)
+        self.assertEqual(reads, ["a", "a", "b", "c", "a"])
+        self.assertEqual(cache.info()["size"], 2)
+
+        # not kept with no ttl
+        cache = SessionCache(stamp, ttl=0, maxsize=2)
+        cache.get("a", read)
+        cache.get("a", read)
+        self.assertEqual(cache.info()["size"], 0)
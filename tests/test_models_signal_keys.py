@@ -0,0 +1,152 @@
+"""
+Test cases for signal idempotency keys
+"""
+import unittest
+import os
+from sqlalchemy.exc import IntegrityError
+from app import app
+from db import db
+from services.models.signals import SignalModel
+from services.models.signal_keys import SignalKeyModel, RECENT_KEYS, RecentKeys
+from services.models.migrations import MIGRATIONS
+from tests.statements import count_statements
+from tests.factories import SignalFactory
+
+# rather than referring to an app directly, use a proxy,
+# which points to the application handling the current activity
+app.app_context().push()
+
+DATABASE_URI = os.environ.get("DATABASE_URI", "sqlite:///test.db")
+
+######################################################################
+#  SIGNAL KEY MODEL TEST CASES
+######################################################################
+
+
+class TestSignalKey(unittest.TestCase):
+    """Test Cases for Signal Key Model"""
+
+    @classmethod
+    def setUpClass(cls):
+        """This runs once before the entire test suite"""
+        app.config["TESTING"] = True
+        app.config["DEBUG"] = False
+        app.config["SQLALCHEMY_DATABASE_URI"] = DATABASE_URI
+        db.init_app(app)
+        db.create_all()
+
+    @classmethod
+    def tearDownClass(cls):
+        """This runs once after the entire test suite"""
+        db.drop_all()
+
+    def setUp(self):
+        """This runs before each test"""
+        db.session.query(SignalModel).delete()  # clean up the last tests
+        db.session.query(SignalKeyModel).delete()  # clean up the last tests
+        db.session.commit()
+        RECENT_KEYS.clear()
+        self.counting = count_statements()
+        self.statements = self.counting.__enter__()
+
+    def tearDown(self):
+        """This runs after each test"""
+        self.counting.__exit__(None, None, None)
+        db.session.remove()
+
+    ######################################################################
+    #  TEST CASES
+    ######################################################################
+
+    def test_insert_with_key(self):
+        """It should register the key together with the signal"""
+
+        signal = SignalFactory()
+        signal.insert("retry-1")
+
+        self.assertEqual(SignalKeyModel.find_by_key("retry-1").signal_rowid, signal.rowid)
+        self.assertEqual(RECENT_KEYS.get("retry-1"), signal.rowid)
+
+        # assert the window answers with a primary key lookup
+        self.statements.clear()
+        self.assertEqual(SignalKeyModel.find_rowid("retry-1"), signal.rowid)
+        self.assertEqual(len(self.statements), 1)
+        self.assertNotIn("signal_keys", self.statements[0])
+
+    def test_find_rowid_from_database(self):
+        """It should find the keys dropped from the window with the unique index"""
+
+        signal = SignalFactory()
+        signal.insert("retry-1")
+        RECENT_KEYS.clear()
+
+        self.assertEqual(SignalKeyModel.find_rowid("retry-1"), signal.rowid)
+        self.assertIsNone(SignalKeyModel.find_rowid("retry-2"))
+
+    def test_duplicate_key(self):
+        """It should not insert a second signal with the same key"""
+
+        SignalFactory().insert("retry-1")
+
+        with self.assertRaises(IntegrityError):
+            SignalFactory().insert("retry-1")
+        db.session.rollback()
+
+        self.assertEqual(SignalModel.query.count(), 1)
+
+    def test_replay_after_delete(self):
+        """It should register a replayed signal again after its deletion"""
+
+        signal = SignalFactory()
+        signal.insert("retry-1")
+        signal.delete()
+
+        self.assertIsNone(SignalKeyModel.find_by_key("retry-1"))
+        self.assertIsNone(RECENT_KEYS.get("retry-1"))
+        self.assertIsNone(SignalKeyModel.find_rowid("retry-1"))
+
+        replayed = SignalFactory()
+        replayed.insert("retry-1")
+        self.assertEqual(SignalKeyModel.find_rowid("retry-1"), replayed.rowid)
+
+    def test_deleted_by_another_worker(self):
+        """It should not replay a key of the window whose signal was deleted elsewhere"""
+
+        signal = SignalFactory()
+        signal.insert("retry-1")
+        with db.engine.begin() as other:
+            other.execute(SignalModel.__table__.delete())
+            other.execute(SignalKeyModel.__table__.delete())
+
+        self.assertIsNone(SignalKeyModel.find_rowid("retry-1"))
+        self.assertIsNone(RECENT_KEYS.get("retry-1"))
+
+    def test_orphan_keys(self):
+        """It should ignore & clean up the keys of signals deleted before the fix"""
+
+        signal = SignalFactory()
+        signal.insert("retry-1")
+        SignalFactory().insert("retry-2")
+        with db.engine.begin() as connection:
+            connection.execute(
+                SignalModel.__table__.delete().where(SignalModel.__table__.c.rowid == signal.rowid)
+            )
+        RECENT_KEYS.clear()
+
+        self.assertIsNone(SignalKeyModel.find_rowid("retry-1"))
+
+        [orphans] = [migration for migration in MIGRATIONS if migration.name == "signal_key_orphans"]
+        with db.engine.begin() as connection:
+            orphans.upgrade(connection)
+        self.assertEqual([item.key for item in SignalKeyModel.query.all()], ["retry-2"])
+
+    def test_window_size(self):
+        """It should keep only the most recent keys"""
+
+        window = RecentKeys(maxsize=2)
+        window.put("a", 1)
+        window.put("b", 2)
+        window.put("c", 3)
+
+        self.assertIsNone(window.get("a"))
+        self.assertEqual(window.get("c"), 3)
@@ -5,9 +5,11 @@ import unittest
 import os
 from app import app
 from db import db
-from services.models.signals import SignalModel
+from services.models.signals import SignalModel, JSON_FIELDS
 from services.models.pairs import PairModel
 from services.models.tickers import TickerModel
+from services.models.signal_legs import SignalLegModel
+from tests.statements import count_statements
 from tests.factories import SignalFactory
 from tests.factories import PairFactory
 from tests.factories import TickerFactory
@@ -45,6 +47,7 @@ class TestSignal(unittest.TestCase):
     def setUp(self):
         """This runs before each test"""
         db.session.query(SignalModel).delete()  # clean up the last tests
+        db.session.query(SignalLegModel).delete()  # clean up the last tests
         db.session.query(PairModel).delete()  # clean up the last tests
         db.session.query(TickerModel).delete()  # clean up the last tests
         db.session.commit()
@@ -230,6 +233,67 @@ class TestSignal(unittest.TestCase):
         self.assertEqual(updated_signal.order_price, order_price)
         self.assertEqual(updated_signal.order_comment, order_comment)
 
+    def test_update_statements(self):
+        """It should update a Signal with a single UPDATE of the changed columns"""
+
+        test_signal = SignalFactory()
+        test_signal.insert()
+        rowid = test_signal.rowid
+
+        with count_statements() as statements:
+            # built from the arguments: the slip of the row is read for its rollup,
+            # the row is not loaded, the legs are replaced
+            new_signal = SignalFactory(order_id1=11, order_id2=12)
+            new_signal.update(rowid)
+            selects = [item for item in statements if item.startswith("SELECT")]
+            self.assertEqual(len(selects), 1)
+            self.assertRegex(selects[0], r"^SELECT signals.slip AS signals_slip, signals.timestamp .*\sFROM signals")
+            self.assertTrue(statements[1].startswith("UPDATE signals SET"))
+
+            # loaded from the database: only the changed columns are written
+            item = SignalModel.find_by_rowid(rowid)
+            statements.clear()
+            item.price1 = 10
+            item.order_status = "filled"
+            item.update(rowid)
+            self.assertEqual(len(statements), 3)
+            self.assertRegex(
+                statements[0], r"^UPDATE signals SET order_status=\S+, price1=\S+ WHERE"
+            )
+            self.assertEqual(statements.values(0)[:2], ["filled", 10])
+            # the status change is logged in the same flush
+            self.assertTrue(statements[1].startswith("INSERT INTO changes"))
+            # the version of the table, bumped by the commit
+            self.assertTrue(statements[2].startswith("UPDATE table_versions SET"))
+
+        self.assertEqual(SignalModel.find_by_orderid_ticker(12, new_signal.ticker2).rowid, rowid)
+
+    def test_sparse_fieldset(self):
+        """It should select & serialize only the columns of the fields"""
+
+        test_signal = SignalFactory()
+        test_signal.insert()
+        self.assertEqual(tuple(test_signal.json()), JSON_FIELDS)
+        db.session.remove()
+
+        fields = ["order_status", "ticker", "timestamp"]
+        with count_statements() as statements:
+            items = SignalModel.get_rows("5", fields=fields).all()
+            item_json = items[0].json(fields)
+            found = SignalModel.find_by_rowid(test_signal.rowid, fields)
+
+        # no lazy loads of the other columns
+        self.assertEqual(len(statements), 2)
+        self.assertRegex(
+            statements[0],
+            r"^SELECT signals.rowid AS signals_rowid, signals.timestamp AS signals_timestamp, "
+            r"signals.ticker AS signals_ticker, signals.order_status AS signals_order_status \s*FROM",
+        )
+        self.assertEqual(list(item_json), fields)
+        self.assertEqual(item_json["ticker"], test_signal.ticker)
+        self.assertEqual(item_json["timestamp"], str(test_signal.timestamp))
+        self.assertEqual(found.json(["rowid"]), {"rowid": test_signal.rowid})
+
     def test_get_signals(self):
         """It should get number of defined Signal items from the database"""
 
@@ -714,6 +778,24 @@ class TestSignal(unittest.TestCase):
             SignalModel.get_avg_slip("ticker1", date1, date2), expected_dic
         )
 
+    def test_get_slip_stats(self):
+        """It should get the slip statistics with a single query"""
+
+        for order_action, slip in (("buy", 1), ("sell", 2), ("sell", 4)):
+            SignalFactory(
+                ticker1="A", ticker_type="single", order_action=order_action, slip=slip
+            ).insert()
+
+        with count_statements() as statements:
+            stats = SignalModel.get_slip_stats("A")
+
+        self.assertEqual(len(statements), 1)
+        self.assertEqual(stats["all"]["count"], 3)
+        self.assertEqual(stats["all"]["max"], 4)
+        self.assertEqual(stats["buy"]["min"], 1)
+        self.assertEqual(stats["sell"]["avg"], 3)
+        self.assertAlmostEqual(stats["sell"]["stddev"], 1.414214, places=5)
+
     def test_find_by_orderid(self):
         """It should get the most recent signal by order id"""
 
@@ -768,6 +850,71 @@ class TestSignal(unittest.TestCase):
         signal = SignalModel.find_by_orderid_ticker(301, "ticker2")
         self.assertIsNone(signal)
 
+    def test_order_legs_sync(self):
+        """It should keep the order legs in sync with the signal"""
+
+        test_signal = SignalFactory()
+        test_signal.ticker1 = "ticker1"
+        test_signal.ticker2 = "ticker2"
+        test_signal.insert()
+        self.assertIsNone(SignalModel.find_by_orderid_ticker(101, "ticker1"))
+
+        # assert the order ids given later
+        test_signal.order_id1 = 101
+        test_signal.order_id2 = 201
+        test_signal.update(test_signal.rowid)
+        self.assertEqual(SignalModel.find_by_orderid_ticker(101, "ticker1"), test_signal)
+        self.assertEqual(SignalModel.find_by_orderid(201), test_signal)
+
+        # assert the changed order id
+        test_signal.order_id2 = 202
+        test_signal.update(test_signal.rowid)
+        self.assertIsNone(SignalModel.find_by_orderid(201))
+        self.assertEqual(SignalModel.find_by_orderid_ticker(202, "ticker2"), test_signal)
+
+        test_signal.delete()
+        self.assertEqual(SignalLegModel.query.count(), 0)
+
+    def test_order_legs_stale(self):
+        """It should not return a signal through the legs of a deleted signal"""
+
+        test_signal = SignalFactory()
+        test_signal.ticker1 = "ticker1"
+        test_signal.order_id1 = 101
+        test_signal.insert()
+
+        # the bulk delete does not remove the legs, the rowid may be used again
+        db.session.query(SignalModel).delete()
+        db.session.commit()
+
+        test_signal = SignalFactory()
+        test_signal.ticker1 = "ticker1"
+        test_signal.order_id1 = 102
+        test_signal.insert()
+
+        self.assertIsNone(SignalModel.find_by_orderid_ticker(101, "ticker1"))
+        self.assertIsNone(SignalModel.find_by_orderid(101))
+
+    def test_backfill_legs(self):
+        """It should create the legs of the existing signals"""
+
+        test_signal = SignalFactory()
+        test_signal.ticker1 = "ticker1"
+        test_signal.ticker2 = "ticker2"
+        test_signal.order_id1 = 101
+        test_signal.order_id2 = 201
+        test_signal.insert()
+
+        db.session.query(SignalLegModel).delete()
+        db.session.commit()
+        self.assertIsNone(SignalModel.find_by_orderid(101))
+
+        self.assertEqual(SignalModel.backfill_legs(), 2)
+        self.assertEqual(SignalModel.find_by_orderid_ticker(201, "ticker2"), test_signal)
+
+        # assert no backfill if there are legs
+        self.assertEqual(SignalModel.backfill_legs(), 0)
+
     def test_check_latest(self):
         """used to get the latest signal with predefined statuses"""
 
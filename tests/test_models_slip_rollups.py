@@ -0,0 +1,204 @@
+"""
+Test cases for the daily slip rollups
+"""
+import unittest
+import os
+from datetime import date, datetime, timedelta
+from app import app
+from db import db
+from services.models.signals import SignalModel
+from services.models.slip_rollups import SlipRollupModel, whole_days
+from tests.factories import SignalFactory
+
+# rather than referring to an app directly, use a proxy,
+# which points to the application handling the current activity
+app.app_context().push()
+
+DATABASE_URI = os.environ.get("DATABASE_URI", "sqlite:///test.db")
+
+DAY = datetime(2022, 3, 1, 15, 30)
+
+######################################################################
+#  SLIP ROLLUP MODEL TEST CASES
+######################################################################
+
+
+class TestSlipRollup(unittest.TestCase):
+    """Test Cases for Slip Rollup Model"""
+
+    @classmethod
+    def setUpClass(cls):
+        """This runs once before the entire test suite"""
+        app.config["TESTING"] = True
+        app.config["DEBUG"] = False
+        app.config["SQLALCHEMY_DATABASE_URI"] = DATABASE_URI
+        db.init_app(app)
+        db.create_all()
+
+    @classmethod
+    def tearDownClass(cls):
+        """This runs once after the entire test suite"""
+        db.drop_all()
+
+    def setUp(self):
+        """This runs before each test"""
+        db.session.query(SignalModel).delete()  # clean up the last tests
+        db.session.query(SlipRollupModel).delete()  # clean up the last tests
+        db.session.commit()
+
+    def tearDown(self):
+        """This runs after each test"""
+        db.session.remove()
+
+    ######################################################################
+    #  H E L P E R   M E T H O D S
+    ######################################################################
+
+    def _create_signal(self, slip, order_action="buy", timestamp=DAY, **kwargs):
+        """Pair signal A-B with a slip"""
+
+        fields = dict(ticker_type="pair", ticker1="A", ticker2="B")
+        fields.update(kwargs)
+        signal = SignalFactory(
+            timestamp=timestamp, order_action=order_action, slip=slip, **fields
+        )
+        signal.insert()
+        return signal
+
+    def _rollups(self) -> dict:
+        """Rollup rows by key, empty ones left out"""
+
+        return {
+            (item.ticker, item.day, item.order_action): (item.count, item.total, item.squares)
+            for item in SlipRollupModel.query.all()
+            if item.count
+        }
+
+    ######################################################################
+    #  TEST CASES
+    ######################################################################
+
+    def test_insert_signals(self):
+        """It should add the slips of the new signals to their day"""
+
+        self._create_signal(1)
+        self._create_signal(3)
+        self._create_signal(2, order_action="sell")
+        self._create_signal(5, timestamp=DAY + timedelta(days=1))
+        self._create_signal(4, ticker_type="single", ticker2=None)
+        self._create_signal(None)  # not filled yet
+
+        self.assertEqual(
+            self._rollups(),
+            {
+                ("A-B", DAY.date(), "buy"): (2, 4, 10),
+                ("A-B", DAY.date(), "sell"): (1, 2, 4),
+                ("A-B", DAY.date() + timedelta(days=1), "buy"): (1, 5, 25),
+                ("A", DAY.date(), "buy"): (1, 4, 16),
+            },
+        )
+
+    def test_update_signals(self):
+        """It should move the slip of an updated or deleted signal"""
+
+        signal = self._create_signal(None)
+        rowid = signal.rowid
+
+        # filled
+        item = SignalModel.find_by_rowid(rowid)
+        item.slip = 2
+        item.update(rowid)
+        self.assertEqual(self._rollups(), {("A-B", DAY.date(), "buy"): (1, 2, 4)})
+
+        # changed after the commit, the previous slip is loaded
+        item.slip = 3
+        item.order_action = "sell"
+        item.update(rowid)
+        self.assertEqual(self._rollups(), {("A-B", DAY.date(), "sell"): (1, 3, 9)})
+
+        # written over with the request arguments
+        new_signal = SignalFactory(
+            timestamp=DAY, ticker_type="pair", ticker1="A", ticker2="C", order_action="buy", slip=1
+        )
+        new_signal.update(rowid)
+        self.assertEqual(self._rollups(), {("A-C", DAY.date(), "buy"): (1, 1, 1)})
+
+        SignalModel.find_by_rowid(rowid).delete()
+        self.assertEqual(self._rollups(), {})
+
+    def test_get_stats(self):
+        """It should get the slip statistics of the days from the rollups"""
+
+        for slip in (1, 3):
+            self._create_signal(slip)
+        self._create_signal(2, order_action="sell")
+        self._create_signal(7, timestamp=DAY + timedelta(days=1))
+
+        stats = SlipRollupModel.get_stats("A-B", DAY.date(), DAY.date() + timedelta(days=1))
+        self.assertEqual(stats["all"]["count"], 3)
+        self.assertEqual(stats["all"]["avg"], 2)
+        self.assertAlmostEqual(stats["all"]["stddev"], 1)
+        self.assertEqual(stats["buy"], {"count": 2, "avg": 2, "stddev": stats["buy"]["stddev"]})
+        self.assertAlmostEqual(stats["buy"]["stddev"], 2 ** 0.5)
+        self.assertEqual(stats["sell"], {"count": 1, "avg": 2, "stddev": None})
+
+        # same as the signals scan
+        scan = SignalModel.get_slip_stats("A-B", DAY.date(), DAY.date() + timedelta(days=1))
+        self.assertEqual(stats["all"]["avg"], scan["all"]["avg"])
+
+        stats = SlipRollupModel.get_stats("A-B", date(2022, 1, 1), date(2022, 2, 1))
+        self.assertEqual(stats["all"], {"count": 0, "avg": None, "stddev": None})
+
+    def test_end_of_range(self):
+        """It should count the signals stamped at the end of the days as the signals scan"""
+
+        start = datetime(2022, 3, 1)
+        end = datetime(2022, 3, 2)
+        self._create_signal(1, timestamp=start)
+        self._create_signal(2, timestamp=start + timedelta(hours=12))
+        self._create_signal(6, timestamp=end)
+        self._create_signal(9, order_action="sell", timestamp=end)
+        self._create_signal(20, timestamp=end + timedelta(seconds=1))
+
+        scan = SignalModel.get_slip_stats("A-B", start, end)
+        self.assertEqual(scan["all"]["count"], 4)
+        self.assertEqual(
+            SignalModel.get_avg_slip("A-B", start, end),
+            {"buy": scan["buy"]["avg"], "sell": scan["sell"]["avg"], "avg": scan["all"]["avg"]},
+        )
+
+        # a single day
+        scan = SignalModel.get_slip_stats("A-B", end, end)
+        self.assertEqual(SignalModel.get_avg_slip("A-B", end, end)["avg"], scan["all"]["avg"])
+
+    def test_rebuild(self):
+        """It should rebuild the rollups of the signals table"""
+
+        self._create_signal(1)
+        self._create_signal(2, order_action="sell")
+        self._create_signal(4, ticker_type="single", ticker2=None)
+        expected = self._rollups()
+
+        # written without the mapper events
+        db.session.query(SlipRollupModel).delete()
+        db.session.commit()
+        self.assertEqual(SlipRollupModel.backfill(), 3)
+        self.assertEqual(self._rollups(), expected)
+
+        # already built
+        self.assertEqual(SlipRollupModel.backfill(), 0)
+        self.assertEqual(SlipRollupModel.rebuild(), 3)
+        self.assertEqual(self._rollups(), expected)
+
+    def test_whole_days(self):
+        """It should use the rollups for the ranges of whole days only"""
+
+        self.assertEqual(
+            whole_days(datetime(2022, 3, 1), datetime(2022, 3, 2)),
+            (date(2022, 3, 1), date(2022, 3, 2)),
+        )
+        self.assertEqual(
+            whole_days(date(2022, 3, 1), date(2022, 3, 2)), (date(2022, 3, 1), date(2022, 3, 2))
+        )
+        self.assertIsNone(whole_days(DAY, datetime(2022, 3, 2)))
+        self.assertIsNone(whole_days("2022-03-01", "2022-03-02"))
@@ -0,0 +1,115 @@
+"""
+Test cases for the table change watermarks
+"""
+import unittest
+import os
+from app import app
+from db import db
+from services.models.tickers import TickerModel
+from services.models.table_stamps import TABLE_STAMPS, read_stamps
+from services.models.table_versions import TableVersionModel
+from tests.factories import TickerFactory
+
+# rather than referring to an app directly, use a proxy,
+# which points to the application handling the current activity
+app.app_context().push()
+
+DATABASE_URI = os.environ.get("DATABASE_URI", "sqlite:///test.db")
+
+######################################################################
+#  TABLE STAMPS TEST CASES
+######################################################################
+
+
+class TestTableStamps(unittest.TestCase):
+    """Test Cases for the Table Stamps"""
+
+    @classmethod
+    def setUpClass(cls):
+        """This runs once before the entire test suite"""
+        app.config["TESTING"] = True
+        app.config["DEBUG"] = False
+        app.config["SQLALCHEMY_DATABASE_URI"] = DATABASE_URI
+        db.init_app(app)
+        db.create_all()
+
+    @classmethod
+    def tearDownClass(cls):
+        """This runs once after the entire test suite"""
+        db.drop_all()
+
+    def setUp(self):
+        """This runs before each test"""
+        db.session.query(TickerModel).delete()  # clean up the last tests
+        db.session.commit()
+
+    def tearDown(self):
+        """This runs after each test"""
+        db.session.remove()
+
+    ######################################################################
+    #  TEST CASES
+    ######################################################################
+
+    def test_bump_on_commit(self):
+        """It should bump the stamp of a table changed by a commit"""
+
+        stamps = read_stamps(("tickers", "pairs"))
+
+        test_ticker = TickerFactory()
+        test_ticker.insert()
+        inserted = read_stamps(("tickers", "pairs"))
+        self.assertNotEqual(inserted[0], stamps[0])
+        self.assertEqual(inserted[1], stamps[1])  # pairs not changed
+
+        # read only
+        TickerModel.find_by_symbol(test_ticker.symbol)
+        db.session.commit()
+        self.assertEqual(read_stamps(("tickers",)), inserted[:1])
+
+        # written with a bulk update
+        TickerFactory(symbol=test_ticker.symbol).update(False)
+        self.assertNotEqual(read_stamps(("tickers",)), inserted[:1])
+
+    def test_no_bump_on_rollback(self):
+        """It should keep the stamp of a rolled back change"""
+
+        stamp = TABLE_STAMPS["tickers"].read()
+
+        db.session.add(TickerFactory())
+        db.session.flush()
+        db.session.rollback()
+        db.session.commit()
+
+        self.assertEqual(TABLE_STAMPS["tickers"].read(), stamp)
+
+    def test_version_in_commit(self):
+        """It should bump the version of a table in the database, with the commit"""
+
+        versions = TableVersionModel.read(("tickers", "pairs"))
+        db.session.commit()
+
+        test_ticker = TickerFactory()
+        test_ticker.insert()
+        inserted = TableVersionModel.read(("tickers", "pairs"))
+        db.session.commit()
+        self.assertEqual(inserted[0][0], versions[0][0] + 1)
+        self.assertEqual(inserted[1], versions[1])  # pairs not changed
+
+        # read only
+        TickerModel.find_by_symbol(test_ticker.symbol)
+        db.session.commit()
+        self.assertEqual(TableVersionModel.read(("tickers",)), inserted[:1])
+        db.session.commit()
+
+        # rolled back
+        db.session.add(TickerFactory())
+        db.session.flush()
+        db.session.rollback()
+        self.assertEqual(TableVersionModel.read(("tickers",)), inserted[:1])
+        db.session.commit()
+
+        # written with a bulk update
+        TickerFactory(symbol=test_ticker.symbol).update(False)
+        self.assertEqual(TableVersionModel.read(("tickers",))[0][0], inserted[0][0] + 1)
+        db.session.commit()
@@ -6,6 +6,7 @@ import os
 from app import app
 from db import db
 from services.models.tickers import TickerModel
+from tests.statements import count_statements
 from tests.factories import TickerFactory
 
 # rather than referring to an app directly, use a proxy,
@@ -321,3 +322,27 @@ class TestTicker(unittest.TestCase):
         self.assertEqual(len(watchlist_tickers), 1)
         watchlist_tickers = TickerModel.get_watchlist_tickers("3")
         self.assertEqual(len(watchlist_tickers), 2)
+
+    def test_update_statements(self):
+        """It should update a Ticker with a single UPDATE of the changed columns"""
+
+        test_ticker = TickerFactory()
+        test_ticker.insert()
+        symbol = test_ticker.symbol
+
+        with count_statements() as statements:
+            # built from the arguments: no SELECT before the UPDATE
+            TickerFactory(symbol=symbol, active=1).update(False)
+            self.assertEqual(len(statements), 2)
+            self.assertTrue(statements[0].startswith("UPDATE tickers SET"))
+            # the version of the table, bumped by the commit
+            self.assertTrue(statements[1].startswith("UPDATE table_versions SET"))
+
+            # loaded from the database: only the changed column is written
+            item = TickerModel.find_by_symbol(symbol)
+            statements.clear()
+            item.active = 0
+            item.update(False)
+            self.assertEqual(len(statements), 2)
+            self.assertRegex(statements[0], r"^UPDATE tickers SET active=\S+ WHERE")
+            self.assertEqual(statements.values(0)[0], 0)
@@ -6,6 +6,7 @@ import os
 from app import app
 from db import db
 from services.models.users import UserModel
+from tests.statements import count_statements
 from tests.factories import UserFactory
 
 # rather than referring to an app directly, use a proxy,
@@ -172,3 +173,25 @@ class TestUser(unittest.TestCase):
         users = UserModel.get_rows("0")
         # assert that there are no records
         self.assertEqual(users.count(), 0)
+
+    def test_update_statements(self):
+        """It should update a User with a single UPDATE of the changed columns"""
+
+        test_user = UserFactory()
+        test_user.insert()
+        username = test_user.username
+
+        with count_statements() as statements:
+            # built from the arguments: no SELECT before the UPDATE
+            UserFactory(username=username).update()
+            self.assertEqual(len(statements), 1)
+            self.assertTrue(statements[0].startswith("UPDATE users SET"))
+
+            # loaded from the database: only the changed column is written
+            item = UserModel.find_by_username(username)
+            statements.clear()
+            item.password = "changed"
+            item.update()
+            self.assertEqual(len(statements), 1)
+            self.assertRegex(statements[0], r"^UPDATE users SET password=\S+ WHERE")
+            self.assertEqual(statements.values(0)[0], "changed")
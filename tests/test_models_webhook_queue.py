@@ -0,0 +1,92 @@
+"""
+Test cases for the webhook queue
+"""
+import unittest
+from unittest import mock
+import os
+import tempfile
+import time
+from app import app
+from services.models.webhook_queue import WebhookQueue, WebhookWorkers, STALE_ERR
+
+######################################################################
+#  WEBHOOK QUEUE TEST CASES
+######################################################################
+
+
+class TestWebhookQueue(unittest.TestCase):
+    """Test Cases for Webhook Queue & Workers"""
+
+    def setUp(self):
+        """This runs before each test"""
+        self.directory = tempfile.TemporaryDirectory()
+        self.queue = WebhookQueue(os.path.join(self.directory.name, "queue.db"))
+
+    def tearDown(self):
+        """This runs after each test"""
+        self.directory.cleanup()
+
+    ######################################################################
+    #  H E L P E R   M E T H O D S
+    ######################################################################
+
+    def _wait_done(self, receipt):
+        """Wait for the workers to process an item"""
+
+        for _ in range(50):
+            item = self.queue.find(receipt)
+            if item["status"] == "done":
+                break
+            time.sleep(0.1)
+
+        return item
+
+    ######################################################################
+    #  TEST CASES
+    ######################################################################
+
+    def test_requeue_stale(self):
+        """It should process again only the stale items with a key"""
+
+        keyed = self.queue.put({"idempotency_key": "a"})
+        unkeyed = self.queue.put({"idempotency_key": None})
+        self.queue.claim()
+        self.queue.claim()
+
+        # not stale yet
+        self.assertEqual(self.queue.requeue(lambda payload: True), 0)
+
+        requeued = self.queue.requeue(
+            lambda payload: bool(payload["idempotency_key"]), seconds=-1
+        )
+        self.assertEqual(requeued, 1)
+        self.assertEqual(self.queue.find(keyed)["status"], "queued")
+
+        item = self.queue.find(unkeyed)
+        self.assertEqual(item["status"], "done")
+        self.assertEqual(item["code"], 500)
+        self.assertEqual(item["message"], STALE_ERR)
+
+    def test_worker_survives_errors(self):
+        """It should keep processing the queue after a queue error"""
+
+        workers = WebhookWorkers(self.queue, lambda payload: (1, 200, "ok"), workers=1)
+        done = self.queue.done
+        calls = []
+
+        def done_failing_once(*args):
+            calls.append(args)
+            if len(calls) == 1:
+                raise Exception("database is locked")
+            done(*args)
+
+        with mock.patch.object(self.queue, "done", side_effect=done_failing_once):
+            first = self.queue.put({})
+            workers.start(app)
+            time.sleep(0.2)  # the first item fails
+            second = self.queue.put({})
+
+            self.assertEqual(self._wait_done(second)["code"], 200)
+
+        # left in processing, requeued or failed by the stale check
+        self.assertEqual(self.queue.find(first)["status"], "processing")
@@ -0,0 +1,64 @@
+"""
+Test cases for the JSON encoding of the lists
+"""
+import unittest
+import json
+from unittest import mock
+from flask_restful.representations.json import output_json
+from app import app
+from services.resources import encoder
+from services.resources.encoder import orjson
+from services.resources import status_codes as status
+
+# rather than referring to an app directly, use a proxy,
+# which points to the application handling the current activity
+app.app_context().push()
+
+DATA = {
+    "signals": [
+        {"rowid": 2, "timestamp": "2022-01-03 09:30:00", "slip": -0.125, "ticker": "A-B"},
+        {"rowid": 1, "timestamp": "None", "slip": None, "ticker": "ÇAY"},
+        {"rowid": 0, "timestamp": "None", "slip": float("nan"), "price": 1e16},
+        {"rowid": -1, "timestamp": "None", "slip": float("-inf"), "price": 0.1},
+    ],
+    "notoken_limit": 5,
+    "next_cursor": None,
+}
+
+######################################################################
+#  ENCODER TEST CASES
+######################################################################
+
+
+class TestEncoder(unittest.TestCase):
+    """Test Cases for the List Encoder"""
+
+    def test_json_response(self):
+        """It should encode the body of the flask_restful representation byte for byte"""
+
+        with mock.patch("services.resources.encoder.ORJSON", False):
+            response = encoder.json_response(DATA)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content_type, "application/json")
+
+        # the body of the list resources before the list encoder
+        with app.test_request_context():
+            baseline = output_json(DATA, 200)
+        self.assertEqual(response.get_data(), baseline.get_data())
+        self.assertEqual(response.get_data(as_text=True), json.dumps(DATA) + "\n")
+
+    @unittest.skipIf(encoder.orjson is None, "orjson not installed")
+    def test_json_response_orjson(self):
+        """It should encode the same keys, order & values with orjson by default"""
+
+        data = dict(DATA, signals=DATA["signals"][:2])  # no NaN, null with orjson
+
+        self.assertTrue(encoder.ORJSON)
+        response = encoder.json_response(data)
+        self.assertEqual(response.get_data(), orjson.dumps(data) + b"\n")
+
+        self.assertEqual(json.loads(response.get_data(as_text=True)), data)
+        self.assertEqual(
+            list(json.loads(response.get_data(as_text=True))["signals"][0]),
+            list(data["signals"][0]),
+        )
@@ -0,0 +1,242 @@
+"""
+Test cases for the Event Stream Resource
+"""
+import unittest
+import os
+import json
+import threading
+import time
+from unittest import mock
+from app import app
+from db import db
+from security import talisman, csrf
+from flask_jwt_extended import create_access_token
+from services.resources import events
+from services.resources import status_codes as status
+from services.models import notifier
+from services.models.changes import ChangeModel
+from services.models.signals import SignalModel
+from tests.factories import SignalFactory
+
+# rather than referring to an app directly, use a proxy,
+# which points to the application handling the current activity
+app.app_context().push()
+
+DATABASE_URI = os.environ.get("DATABASE_URI", "sqlite:///test.db")
+
+EVENTS_URL = "/v4/events"
+
+######################################################################
+#  EVENT STREAM RESOURCE TEST CASES
+######################################################################
+
+
+@mock.patch("services.resources.events.HEARTBEAT", 0.1)
+@mock.patch("services.resources.events.STREAM_DURATION", 0.5)
+class TestEvents(unittest.TestCase):
+    """Test Cases for the Event Stream Resource"""
+
+    @classmethod
+    def setUpClass(cls):
+        """This runs once before the entire test suite"""
+        app.config["TESTING"] = True
+        app.config["DEBUG"] = False
+        app.config["SQLALCHEMY_DATABASE_URI"] = DATABASE_URI
+        db.init_app(app)
+        db.create_all()
+        talisman.force_https = False
+        csrf._csrf_disable = True
+
+    @classmethod
+    def tearDownClass(cls):
+        """This runs once after the entire test suite"""
+        db.drop_all()
+
+    def setUp(self):
+        """This runs before each test"""
+        db.session.query(SignalModel).delete()  # clean up the last tests
+        db.session.query(ChangeModel).delete()  # clean up the last tests
+        db.session.commit()
+        self.client = app.test_client()
+
+    def tearDown(self):
+        """This runs after each test"""
+        db.session.remove()
+
+    ######################################################################
+    #  H E L P E R   M E T H O D S
+    ######################################################################
+    def _get_headers(self, user="user1"):
+        """Get headers with token"""
+
+        access_token = create_access_token(identity=user)
+
+        headers = {"Authorization": "Bearer {}".format(access_token)}
+
+        return headers
+
+    def _get_events(self, url, headers=None):
+        """Read a stream until it ends, returns the (id, event, data) of the events"""
+
+        response = self.client.get(url, headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.mimetype, "text/event-stream")
+        body = response.get_data(as_text=True)
+        response.close()
+
+        items = []
+        for message in body.split("\n\n"):
+            fields = dict(
+                line.split(": ", 1) for line in message.splitlines() if not line.startswith(":")
+            )
+            if "id" in fields:
+                items.append((int(fields["id"]), fields["event"], json.loads(fields["data"])))
+
+        return items
+
+    ######################################################################
+    #  TEST CASES
+    ######################################################################
+
+    def test_resume(self):
+        """It should send the changes after the Last-Event-ID"""
+
+        signals = SignalFactory.create_batch(3)
+        for signal in signals:
+            signal.insert()
+        signals[0].order_status = "filled"
+        signals[0].update(signals[0].rowid)
+        rowids = [signal.rowid for signal in signals]
+
+        items = self._get_events(EVENTS_URL + "?last_event_id=0")
+        self.assertEqual(
+            [item[1] for item in items],
+            ["signal.insert"] * 3 + ["signal.status"],
+        )
+        self.assertEqual([item[2]["rowid"] for item in items], rowids + rowids[:1])
+        self.assertEqual(items[3][2]["order_status"], "filled")
+
+        # reconnection
+        items = self._get_events(EVENTS_URL, headers={"Last-Event-ID": str(items[1][0])})
+        self.assertEqual([item[2]["rowid"] for item in items], rowids[2:] + rowids[:1])
+
+        # other topics only
+        self.assertEqual(
+            self._get_events(
+                EVENTS_URL + "?topics=ticker,pnl&last_event_id=0", headers=self._get_headers()
+            ),
+            [],
+        )
+
+    def test_live(self):
+        """It should send the changes committed while the stream is open"""
+
+        SignalFactory().insert()  # before the connection, not sent
+
+        def insert_signal():
+            time.sleep(0.2)
+            with app.app_context():
+                SignalFactory().insert()
+                db.session.remove()
+
+        thread = threading.Thread(target=insert_signal)
+        thread.start()
+        items = self._get_events(EVENTS_URL)
+        thread.join()
+
+        self.assertEqual([item[1] for item in items], ["signal.insert"])
+
+    def test_bad_arguments(self):
+        """It should not open a stream with unknown topics, bad ids or too many streams"""
+
+        response = self.client.get(EVENTS_URL + "?topics=signal,orders")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            json.loads(response.get_data(as_text=True))["message"],
+            {"topics": events.TOPICS_ERR.format("orders")},
+        )
+
+        response = self.client.get(EVENTS_URL, headers={"Last-Event-ID": "x"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with mock.patch("services.resources.events.STREAMS", threading.BoundedSemaphore(0)):
+            response = self.client.get(EVENTS_URL)
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertIn("Retry-After", response.headers)
+
+        # no request thread left to hold, e.g. taken by the long polls
+        streams = threading.BoundedSemaphore(1)
+        with mock.patch("services.resources.events.STREAMS", streams), mock.patch(
+            "services.resources.events.HELD_THREADS", notifier.ThreadBudget(0)
+        ):
+            response = self.client.get(EVENTS_URL)
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertTrue(streams.acquire(blocking=False))  # given back
+
+    def test_notoken(self):
+        """It should send the signal changes only, in smaller batches, without a token"""
+
+        # ticker & pnl topics: 401 without a token
+        for topics in ("pnl", "ticker", "signal,ticker,pnl"):
+            response = self.client.get(EVENTS_URL + "?topics=" + topics)
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(
+            json.loads(response.get_data(as_text=True))["message"],
+            {"topics": events.TOKEN_ERR.format("ticker, pnl")},
+        )
+
+        response = self.client.get(
+            EVENTS_URL + "?topics=pnl", headers=self._get_headers(), buffered=False
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response.close()
+
+        # the signal topic by default, read notoken_limit changes at once
+        SignalFactory().insert()
+        with mock.patch.object(
+            ChangeModel, "get_after", wraps=ChangeModel.get_after
+        ) as get_after:
+            items = self._get_events(EVENTS_URL + "?last_event_id=0")
+            self.assertEqual([item[1] for item in items], ["signal.insert"])
+            self.assertEqual(get_after.call_args.args[1:], (("signal",), 20))
+
+            self._get_events(EVENTS_URL + "?last_event_id=0", headers=self._get_headers())
+            self.assertEqual(get_after.call_args.args[1:], (events.TOPICS, events.BATCH_SIZE))
+
+    def test_notoken_streams(self):
+        """It should keep stream slots for the logged-in clients"""
+
+        notoken = threading.BoundedSemaphore(1)
+        with mock.patch("services.resources.events.NOTOKEN", notoken):
+            response = self.client.get(EVENTS_URL, buffered=False)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+            # the slot without a token is taken, the other ones are left
+            other = self.client.get(EVENTS_URL)
+            self.assertEqual(other.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+            other = self.client.get(EVENTS_URL, headers=self._get_headers(), buffered=False)
+            self.assertEqual(other.status_code, status.HTTP_200_OK)
+            other.close()
+
+            response.close()
+            self.assertTrue(notoken.acquire(blocking=False))  # given back
+            notoken.release()
+
+        # a stream refused for the other limits gives the slot back
+        with mock.patch("services.resources.events.NOTOKEN", notoken), mock.patch(
+            "services.resources.events.STREAMS", threading.BoundedSemaphore(0)
+        ):
+            response = self.client.get(EVENTS_URL)
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertTrue(notoken.acquire(blocking=False))
+
+    def test_held_threads(self):
+        """It should hold a request thread of the worker while the stream is open"""
+
+        budget = notifier.ThreadBudget(1)
+        with mock.patch("services.resources.events.HELD_THREADS", budget):
+            response = self.client.get(EVENTS_URL, buffered=False)
+            self.assertEqual(budget.held, 1)
+            response.close()
+
+        self.assertEqual(budget.held, 0)
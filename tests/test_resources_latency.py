@@ -0,0 +1,131 @@
+"""
+Test cases for Latency Resources
+"""
+import unittest
+from unittest import mock
+import json
+import os
+from app import app
+from db import db
+from security import talisman, csrf
+from flask_jwt_extended import create_access_token
+from services.resources import status_codes as status
+from services.models.latency import LATENCY
+from services.resources.users import UserRegister
+from tests.factories import SignalFactory
+
+# rather than referring to an app directly, use a proxy,
+# which points to the application handling the current activity
+app.app_context().push()
+
+DATABASE_URI = os.environ.get("DATABASE_URI", "sqlite:///test.db")
+
+STATS_URL = "/v4/stats/latency"
+HOOK_URL = "/v4/webhook"
+
+######################################################################
+#  LATENCY RESOURCE TEST CASES
+######################################################################
+
+
+class TestLatency(unittest.TestCase):
+    """Test Cases for Latency Resource"""
+
+    @classmethod
+    def setUpClass(cls):
+        """This runs once before the entire test suite"""
+        app.config["TESTING"] = True
+        app.config["DEBUG"] = False
+        app.config["SQLALCHEMY_DATABASE_URI"] = DATABASE_URI
+        app.config["CSRF_DISABLE"] = True
+        db.init_app(app)
+        db.create_all()
+        UserRegister.default_users()
+        talisman.force_https = False
+        csrf._csrf_disable = True
+
+    @classmethod
+    def tearDownClass(cls):
+        """This runs once after the entire test suite"""
+        db.drop_all()
+
+    def setUp(self):
+        """This runs before each test"""
+        LATENCY.reset()
+        self.client = app.test_client()
+
+    def tearDown(self):
+        """This runs after each test"""
+        db.session.remove()
+
+    ######################################################################
+    #  H E L P E R   M E T H O D S
+    ######################################################################
+    def _get_headers(self, user="admin", fresh=True):
+        """Get headers with token"""
+
+        access_token = create_access_token(identity=user, fresh=fresh)
+
+        headers = {"Authorization": "Bearer {}".format(access_token)}
+
+        return headers
+
+    def _post_signal(self):
+        """Post a signal to the webhook"""
+
+        new_body = SignalFactory().json()
+        new_body["passphrase"] = "webhook"
+        new_body.pop("timestamp")
+
+        return self.client.post(HOOK_URL, json=new_body)
+
+    ######################################################################
+    #  TEST CASES
+    ######################################################################
+
+    def test_get_latency(self):
+        """It should return the percentiles of the webhook stages"""
+
+        self._post_signal()
+
+        response = self.client.get(STATS_URL, headers=self._get_headers())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        stages = json.loads(response.get_data(as_text=True))["stages"]
+
+        for name in ("parse", "splitticker", "check_ticker_status", "insert", "total"):
+            self.assertEqual(stages["SignalWebhook.post." + name]["count"], 1)
+        self.assertGreaterEqual(
+            stages["SignalWebhook.post.total"]["p99"],
+            stages["SignalWebhook.post.insert"]["p99"],
+        )
+
+    def test_get_latency_not_admin(self):
+        """It should not return the statistics to the other users"""
+
+        response = self.client.get(STATS_URL, headers=self._get_headers("user1"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = self.client.get(STATS_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_delete_latency(self):
+        """It should reset the statistics"""
+
+        self._post_signal()
+
+        response = self.client.delete(STATS_URL, headers=self._get_headers())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(LATENCY.json(), {})
+
+    def test_server_timing(self):
+        """It should add the Server-Timing header if enabled"""
+
+        response = self._post_signal()
+        self.assertNotIn("Server-Timing", response.headers)
+
+        with mock.patch("services.resources.latency.SERVER_TIMING", True):
+            response = self._post_signal()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIn("insert;dur=", response.headers["Server-Timing"])
+        self.assertIn("total;dur=", response.headers["Server-Timing"])
@@ -0,0 +1,97 @@
+"""
+Test cases for the compiled request schemas
+"""
+import unittest
+from werkzeug.exceptions import BadRequest
+from app import app
+from services.resources.signals import SignalWebhook, SignalUpdateOrder
+
+######################################################################
+#  SCHEMA TEST CASES
+######################################################################
+
+
+class TestSchema(unittest.TestCase):
+    """Test Cases for Schema"""
+
+    ######################################################################
+    #  H E L P E R   M E T H O D S
+    ######################################################################
+
+    def _parse(self, resource, body, query_string=None):
+        """Parse the body with reqparse and the schema, return both results"""
+
+        results = []
+
+        for parse in (resource.parser.parse_args, resource.schema.parse):
+            with app.test_request_context(
+                "/", method="POST", json=body, query_string=query_string
+            ):
+                try:
+                    results.append(dict(parse()))
+                except BadRequest as e:
+                    results.append(e.data)
+
+        return results
+
+    ######################################################################
+    #  TEST CASES
+    ######################################################################
+
+    def test_webhook_parity(self):
+        """It should parse the webhooks like reqparse"""
+
+        body = {
+            "passphrase": "webhook",
+            "timestamp": "2022-01-03 09:30:00",
+            "ticker": "NYSE:LNT-1.25*NYSE:FTS",
+            "order_action": "buy",
+            "order_contracts": "100",
+            "order_price": 1,
+            "mar_pos": "long",
+            "mar_pos_size": 100,
+            "pre_mar_pos": None,
+            "bypass_ticker_status": True,
+        }
+
+        parsed_reqparse, parsed_schema = self._parse(SignalWebhook, body)
+
+        self.assertEqual(parsed_schema, parsed_reqparse)
+        self.assertEqual(parsed_schema["order_contracts"], 100)
+        self.assertEqual(parsed_schema["order_status"], "waiting")
+
+    def test_webhook_errors(self):
+        """It should return the error messages of reqparse"""
+
+        body = {"passphrase": "webhook", "ticker": "LNT", "order_action": "buy"}
+
+        # missing argument with help message
+        self.assertEqual(*self._parse(SignalWebhook, body))
+
+        # conversion errors
+        body["order_contracts"] = "many"
+        self.assertEqual(*self._parse(SignalWebhook, body))
+
+        body["order_contracts"] = 100
+        body["timestamp"] = "yesterday"
+        self.assertEqual(*self._parse(SignalWebhook, body))
+
+    def test_order_parity(self):
+        """It should parse the order fills like reqparse"""
+
+        body = {
+            "passphrase": "webhook",
+            "order_id": 12,
+            "symbol": "LNT",
+            "price": "10.5",
+            "filled_qty": 100,
+        }
+
+        self.assertEqual(*self._parse(SignalUpdateOrder, body))
+
+        # missing argument without help message
+        body.pop("order_id")
+        self.assertEqual(*self._parse(SignalUpdateOrder, body))
+
+        # query string arguments
+        self.assertEqual(*self._parse(SignalUpdateOrder, body, {"order_id": "12"}))
@@ -6,6 +6,9 @@ from unittest import mock
 from unittest.mock import patch
 import json
 import os
+import time
+import threading
+from sqlalchemy.orm import Session
 from app import app
 from db import db
 from security import talisman, csrf
@@ -14,6 +17,8 @@ from services.resources import status_codes as status
 from services.models.signals import SignalModel
 from services.models.pairs import PairModel
 from services.models.tickers import TickerModel
+from services.models.signal_keys import SignalKeyModel, RECENT_KEYS
+from services.models.changes import ChangeModel
 from tests.factories import TickerFactory
 from tests.factories import PairFactory
 from tests.factories import SignalFactory
@@ -27,8 +32,14 @@ DATABASE_URI = os.environ.get("DATABASE_URI", "sqlite:///test.db")
 
 BASE_URL = "/v4/signal"
 HOOK_URL = "/v4/webhook"
+RECEIPT_URL = "/v4/webhook/receipt/"
+BATCH_URL = "/v4/webhooks"
 ORDER_URL = "/v4/order"
+ORDERS_URL = "/v4/signal/orders"
+EXECUTIONS_URL = "/v4/signal/executions/"
 GET_URL = "/v4/signals/"
+POLL_URL = "/v4/signals/waiting/poll"
+CHANGES_URL = "/v4/signals/changes"
 LOGIN_URL = "/v4/login"
 
 ######################################################################
@@ -62,7 +73,10 @@ class TestSignal(unittest.TestCase):
         db.session.query(TickerModel).delete()  # clean up the last tests
         db.session.query(PairModel).delete()  # clean up the last tests
         db.session.query(SignalModel).delete()  # clean up the last tests
+        db.session.query(SignalKeyModel).delete()  # clean up the last tests
+        db.session.query(ChangeModel).delete()  # clean up the last tests
         db.session.commit()
+        RECENT_KEYS.clear()
         self.client = app.test_client()
 
     def tearDown(self):
@@ -231,8 +245,247 @@ class TestSignal(unittest.TestCase):
         )
         self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    def test_post_signal_async(self):
+        """It should queue a Signal and resolve the receipt to the inserted signal"""
+
+        msg_body, _ = self._create_fakes()
+        msg_body["async"] = True
+
+        response = self.client.post(
+            HOOK_URL, json=msg_body, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        receipt = json.loads(response.get_data(as_text=True))["receipt"]
+
+        # wait for the workers
+        for _ in range(50):
+            response = self.client.get(RECEIPT_URL + receipt)
+            data = json.loads(response.get_data(as_text=True))
+            if data["status"] == "done":
+                break
+            time.sleep(0.1)
+
+        self.assertEqual(data["status"], "done")
+        self.assertEqual(data["code"], status.HTTP_200_OK)
+
+        db.session.remove()  # inserted by another session
+        item = SignalModel.find_by_rowid(data["rowid"])
+        self.assertEqual(item.ticker1, "A")
+        self.assertEqual(item.order_status, "waiting")
+
+    def test_post_signal_async_wrong_pass(self):
+        """It should not queue a Signal with a wrong passphrase"""
+
+        new_body = SignalFactory().json()
+        new_body["passphrase"] = "wrongphrase"
+        new_body["async"] = True
+        new_body.pop("timestamp")
+
+        response = self.client.post(
+            HOOK_URL, json=new_body, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_post_signal_batch(self):
+        """It should insert a batch of Signals and return a result for each one"""
+
+        msg_body, _ = self._create_fakes()
+        msg_body.pop("passphrase")
+
+        problematic = dict(msg_body, ticker="UNKNOWN")
+        missing = dict(msg_body)
+        missing.pop("ticker")
+
+        response = self.client.post(
+            BATCH_URL,
+            json={"passphrase": "webhook", "signals": [msg_body, problematic, missing]},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = json.loads(response.get_data(as_text=True))["signals"]
+
+        self.assertEqual(results[0]["status"], status.HTTP_200_OK)
+        self.assertEqual(results[1]["status"], status.HTTP_201_CREATED)
+        self.assertEqual(results[1]["message"], "recorded with problematic ticker!")
+        self.assertEqual(results[2]["status"], status.HTTP_400_BAD_REQUEST)
+        self.assertIn("ticker", results[2]["message"])
+        self.assertIsNone(results[2]["rowid"])
+
+        # assert the duplicates in and across the batches
+        msg_body["idempotency_key"] = "retry-1"
+        response = self.client.post(
+            BATCH_URL,
+            json={"passphrase": "webhook", "signals": [msg_body, msg_body]},
+            content_type="application/json",
+        )
+        results_replay = json.loads(response.get_data(as_text=True))["signals"]
+        self.assertEqual(results_replay[0]["rowid"], results_replay[1]["rowid"])
+
+        response = self.client.post(
+            BATCH_URL,
+            json={"passphrase": "webhook", "signals": [msg_body]},
+            content_type="application/json",
+        )
+        results_replay2 = json.loads(response.get_data(as_text=True))["signals"]
+        self.assertEqual(results_replay2[0]["rowid"], results_replay[0]["rowid"])
+
+        # assert the inserted signals
+        self.assertEqual(SignalModel.find_by_rowid(results[0]["rowid"]).ticker1, "A")
+        self.assertEqual(
+            SignalModel.find_by_rowid(results[1]["rowid"]).order_status, "error"
+        )
+
+    def test_post_signal_batch_errors(self):
+        """It should reject a batch with a wrong passphrase or without a list"""
+
+        response = self.client.post(
+            BATCH_URL,
+            json={"passphrase": "wrongphrase", "signals": []},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = self.client.post(
+            BATCH_URL,
+            json={"passphrase": "webhook", "signals": "A-B"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_post_signal_replay(self):
+        """It should return the first signal for a retried webhook"""
+
+        msg_body, _ = self._create_fakes()
+
+        # explicit key in the header
+        headers = {"Idempotency-Key": "retry-1"}
+        response = self.client.post(HOOK_URL, json=msg_body, headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rowid = SignalModel.get_rows("0").first().rowid
+
+        response = self.client.post(HOOK_URL, json=msg_body, headers=headers)
+        data = json.loads(response.get_data(as_text=True))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(data["message"], "'signal' already registered.")
+        self.assertEqual(data["rowid"], rowid)
+
+        # key derived from the bar time
+        msg_body["timestamp"] = "2022-01-03 09:30:00"
+        self.client.post(HOOK_URL, json=msg_body)
+        response = self.client.post(HOOK_URL, json=msg_body)
+        data = json.loads(response.get_data(as_text=True))
+        self.assertEqual(data["rowid"], rowid + 1)
+
+        # without the bar time every webhook is a new signal
+        msg_body.pop("timestamp")
+        self.client.post(HOOK_URL, json=msg_body)
+
+        self.assertEqual(SignalModel.get_rows("0").count(), 4)
+
+    def test_get_receipt_not_found(self):
+        """It should try to get an unknown receipt"""
+
+        response = self.client.get(RECEIPT_URL + "unknown")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
     ### PUT METHOD ###
 
+    def test_put_orders(self):
+        """It should fill both legs of a pair in one request"""
+
+        _, rowid = self._create_fakes()
+        item = SignalModel.find_by_rowid(rowid)
+        item.order_id1 = 11
+        item.order_id2 = 12
+        item.update(rowid)
+
+        orders = [
+            {"order_id": 11, "symbol": "A", "price": 10, "filled_qty": 100},
+            {"order_id": 12, "symbol": "B", "price": 3, "filled_qty": 300},
+            {"order_id": 13, "symbol": "C", "price": 1, "filled_qty": 1},
+            {"order_id": 11, "symbol": "A"},
+        ]
+        response = self.client.put(
+            ORDERS_URL, json={"passphrase": "webhook", "orders": orders}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = json.loads(response.get_data(as_text=True))
+
+        self.assertEqual(
+            [result["status"] for result in data["orders"]], [200, 200, 404, 400]
+        )
+        self.assertEqual(len(data["signals"]), 1)
+        self.assertEqual(data["signals"][0]["order_status"], "filled")
+        self.assertEqual(data["signals"][0]["fill_price"], 1)
+
+        item = SignalModel.find_by_rowid(rowid)
+        self.assertEqual(item.order_status, "filled")
+        self.assertEqual(item.price1, 10)
+        self.assertEqual(item.price2, 3)
+
+    def test_get_executions(self):
+        """It should list the executions of the partial fills"""
+
+        _, rowid = self._create_fakes()
+        item = SignalModel.find_by_rowid(rowid)
+        item.order_id1 = 11
+        item.update(rowid)
+
+        for filled_qty, price in ((40, 10), (40, 10), (100, 11)):
+            order = {"order_id": 11, "symbol": "A", "price": price, "filled_qty": filled_qty}
+            response = self.client.put(
+                BASE_URL + "/order", json=dict(order, passphrase="webhook")
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(EXECUTIONS_URL + str(rowid))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = json.loads(response.get_data(as_text=True))
+
+        # the repeated status is not an execution
+        self.assertEqual([item["qty"] for item in data["executions"]], [40, 60])
+        self.assertEqual(data["legs"][0]["filled_qty"], 100)
+        self.assertEqual(data["legs"][0]["vwap"], 11)
+        self.assertEqual(data["legs"][1]["remaining"], 300)
+
+        response = self.client.get(EXECUTIONS_URL + "0")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_put_order_repeated(self):
+        """It should leave the signal unchanged on a repeated order status"""
+
+        _, rowid = self._create_fakes()
+        item = SignalModel.find_by_rowid(rowid)
+        item.order_id1 = 11
+        item.update(rowid)
+
+        order = {"order_id": 11, "symbol": "A", "price": 10, "filled_qty": 40, "passphrase": "webhook"}
+        self.client.put(BASE_URL + "/order", json=order)
+        item = SignalModel.find_by_rowid(rowid)
+        item.status_msg = "checked"
+        item.update(rowid)
+        seq = ChangeModel.last_seq()
+
+        response = self.client.put(BASE_URL + "/order", json=order)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = json.loads(response.get_data(as_text=True))
+        self.assertEqual(data["status_msg"], "checked")
+
+        # nothing written
+        self.assertEqual(ChangeModel.last_seq(), seq)
+        self.assertEqual(SignalModel.find_by_rowid(rowid).status_msg, "checked")
+
+    def test_put_orders_errors(self):
+        """It should reject a batch of orders without a list or passphrase"""
+
+        response = self.client.put(ORDERS_URL, json={"passphrase": "webhook"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.put(
+            ORDERS_URL, json={"passphrase": "wrong", "orders": []}
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
     def test_put_pair_update(self):
         """It should update and assert that it is updated"""
 
@@ -803,6 +1056,323 @@ class TestSignal(unittest.TestCase):
         data = json.loads(response.get_data(as_text=True))
         self.assertEqual(len(data["signals"]), 7)
 
+    def test_get_signal_list_pages(self):
+        """It should page through the signals with the next cursor"""
+
+        for signal in SignalFactory.create_batch(7):
+            signal.insert()
+        rowids = [item.rowid for item in SignalModel.get_rows("0")]
+
+        pages = []
+        url = GET_URL + "0?limit=3"
+        while url:
+            response = self.client.get(url, headers=self._get_headers())
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            data = json.loads(response.get_data(as_text=True))
+            pages.append([item["rowid"] for item in data["signals"]])
+            cursor = data["next_cursor"]
+            url = GET_URL + "0?limit=3&before=" + str(cursor) if cursor else None
+
+        self.assertEqual(pages, [rowids[:3], rowids[3:6], rowids[6:]])
+
+        # the limit is capped without authorization header
+        response = self.client.get(GET_URL + "0?limit=6&before=" + str(rowids[0]))
+        data = json.loads(response.get_data(as_text=True))
+        self.assertEqual([item["rowid"] for item in data["signals"]], rowids[1:6])
+        self.assertEqual(data["next_cursor"], rowids[5])
+
+        # status lists
+        response = self.client.get(
+            GET_URL + "status/waiting/2?before=" + str(rowids[0]), headers=self._get_headers()
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_get_signal_list_streamed(self):
+        """It should stream the full list of signals in chunks"""
+
+        for signal in SignalFactory.create_batch(5):
+            signal.insert()
+
+        with mock.patch("services.resources.streaming.CHUNK_SIZE", 2):
+            response = self.client.get(GET_URL + "0", headers=self._get_headers())
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.is_streamed)
+        self.assertEqual(response.content_type, "application/json")
+
+        data = json.loads(response.get_data(as_text=True))
+        self.assertEqual(
+            data["signals"], [item.json() for item in SignalModel.get_rows("0")]
+        )
+        self.assertEqual(data["notoken_limit"], 5)
+        self.assertIsNone(data["next_cursor"])
+
+    def test_get_signal_list_streamed_commits(self):
+        """It should not keep a transaction open while a streamed list is read"""
+
+        for signal in SignalFactory.create_batch(5):
+            signal.insert()
+        rowids = [item.rowid for item in SignalModel.get_rows("0")]
+
+        with mock.patch("services.resources.streaming.CHUNK_SIZE", 2):
+            response = self.client.get(
+                GET_URL + "0?fields=rowid", headers=self._get_headers(), buffered=False
+            )
+            body = iter(response.response)
+            parts = [next(body), next(body)]  # the first chunk only
+
+            # a webhook commits while the client reads, in another connection
+            with db.engine.begin() as connection:
+                connection.execute(
+                    SignalModel.__table__.delete().where(SignalModel.rowid == rowids[-1])
+                )
+
+            parts.extend(body)
+            response.close()
+
+        data = json.loads(b"".join(parts))
+        self.assertEqual([item["rowid"] for item in data["signals"]], rowids[:-1])
+
+    def test_get_signal_list_not_modified(self):
+        """It should tag the lists by the signals stamp & the logged-in user"""
+
+        for signal in SignalFactory.create_batch(3):
+            signal.insert()
+
+        response = self.client.get(GET_URL + "0", headers=self._get_headers())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.is_streamed)
+        etag = response.headers["ETag"]
+
+        headers = dict(self._get_headers(), **{"If-None-Match": etag})
+        response = self.client.get(GET_URL + "0", headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # shorter list without a token
+        response = self.client.get(GET_URL + "0", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # a new signal
+        SignalFactory().insert()
+        response = self.client.get(GET_URL + "0", headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_get_waiting_poll(self):
+        """It should answer the long poll with the waiting signals after a rowid"""
+
+        signals = SignalFactory.create_batch(3)
+        signals[0].order_status = "waiting"
+        signals[1].order_status = "filled"
+        signals[2].order_status = "rerouted"
+        for signal in signals:
+            signal.insert()
+        rowids = [signals[0].rowid, signals[2].rowid]
+        expected = signals[0].json()
+
+        start = time.monotonic()
+        response = self.client.get(POLL_URL + "?timeout=5", headers=self._get_headers())
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = json.loads(response.get_data(as_text=True))
+        self.assertEqual([item["rowid"] for item in data["signals"]], rowids)
+        self.assertEqual(data["signals"][0], expected)
+        self.assertEqual(data["last_rowid"], rowids[1])
+
+        # nothing newer, waits until the timeout
+        start = time.monotonic()
+        response = self.client.get(
+            POLL_URL + "?timeout=0.3&after={}".format(data["last_rowid"])
+        )
+        self.assertGreaterEqual(time.monotonic() - start, 0.3)
+        data = json.loads(response.get_data(as_text=True))
+        self.assertEqual(data, {"signals": [], "last_rowid": rowids[1]})
+
+    def test_get_waiting_poll_wakeup(self):
+        """It should wake the long poll when a waiting signal is committed"""
+
+        def insert_waiting():
+            time.sleep(0.2)
+            with app.app_context():
+                signal = SignalFactory()
+                signal.order_status = "waiting"
+                signal.insert()
+                db.session.remove()
+
+        thread = threading.Thread(target=insert_waiting)
+        thread.start()
+
+        start = time.monotonic()
+        response = self.client.get(POLL_URL + "?timeout=10")
+        thread.join()
+        self.assertLess(time.monotonic() - start, 5)
+        data = json.loads(response.get_data(as_text=True))
+        self.assertEqual(len(data["signals"]), 1)
+        self.assertEqual(data["signals"][0]["order_status"], "waiting")
+
+    def test_get_changes(self):
+        """It should get the last state of the signals changed since a sequence number"""
+
+        signals = SignalFactory.create_batch(3)
+        for signal in signals:
+            signal.insert()
+        since = ChangeModel.last_seq()
+
+        signals[0].order_status = "filled"
+        signals[0].update(signals[0].rowid)
+        signals[0].order_comment = "done"
+        signals[0].update(signals[0].rowid)
+        signals[1].delete()
+        rowids = [signal.rowid for signal in signals]
+        expected = signals[0].json()
+
+        response = self.client.get(CHANGES_URL + "?since={}".format(since), headers=self._get_headers())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = json.loads(response.get_data(as_text=True))
+        self.assertEqual(data["signals"], [expected])
+        self.assertEqual(data["deleted"], [rowids[1]])
+        self.assertEqual(data["last_seq"], since + 3)
+        self.assertFalse(data["more"])
+
+        # nothing new
+        url = CHANGES_URL + "?since={}".format(data["last_seq"])
+        data = json.loads(self.client.get(url).get_data(as_text=True))
+        self.assertEqual((data["signals"], data["deleted"]), ([], []))
+        self.assertEqual(data["last_seq"], since + 3)
+
+        # paged, from the first change kept
+        first, _ = ChangeModel.seq_range()
+        url = CHANGES_URL + "?since={}&limit=2".format(first - 1)
+        data = json.loads(self.client.get(url, headers=self._get_headers()).get_data(as_text=True))
+        self.assertEqual([item["rowid"] for item in data["signals"]], rowids[:2])
+        self.assertTrue(data["more"])
+
+    def test_get_changes_interleaved(self):
+        """It should not skip a change committed after a later transaction began"""
+
+        SignalFactory().insert()
+        since = ChangeModel.last_seq()
+        url = CHANGES_URL + "?since={}".format(since)
+        data = json.loads(self.client.get(url, headers=self._get_headers()).get_data(as_text=True))
+        self.assertEqual(data["signals"], [])
+        db.session.close()  # the request ran in the app context of the tests
+
+        first = Session(bind=db.engine)
+        second = Session(bind=db.engine)
+        first_signal = SignalFactory()
+        first.add(first_signal)
+        first.flush()  # logged, not committed
+
+        def insert_second():
+            second.add(SignalFactory())
+            second.commit()
+
+        thread = threading.Thread(target=insert_second)
+        thread.start()
+        thread.join(0.5)  # waits for the first transaction
+
+        data = json.loads(self.client.get(url, headers=self._get_headers()).get_data(as_text=True))
+        rowids = [item["rowid"] for item in data["signals"]]
+        db.session.close()
+
+        first.commit()
+        thread.join()
+
+        url = CHANGES_URL + "?since={}".format(data["last_seq"])
+        data = json.loads(self.client.get(url, headers=self._get_headers()).get_data(as_text=True))
+        rowids += [item["rowid"] for item in data["signals"]]
+
+        self.assertEqual(len(rowids), 2)
+        self.assertIn(first_signal.rowid, rowids)
+        first.close()
+        second.close()
+
+    def test_get_changes_gone(self):
+        """It should answer 410 to a sequence number older than the kept changes"""
+
+        for signal in SignalFactory.create_batch(3):
+            signal.insert()
+        last = ChangeModel.last_seq()
+        ChangeModel.prune(hours=-1)
+
+        response = self.client.get(CHANGES_URL + "?since={}".format(last - 2))
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+        self.assertEqual(json.loads(response.get_data(as_text=True))["last_seq"], last)
+
+        response = self.client.get(CHANGES_URL + "?since={}".format(last - 1))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # from another database
+        response = self.client.get(CHANGES_URL + "?since={}".format(last + 1))
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+
+        # bulk delete
+        db.session.query(SignalModel).delete()
+        db.session.commit()
+        response = self.client.get(CHANGES_URL + "?since={}".format(last))
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+
+        response = self.client.get(CHANGES_URL)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_get_signal_list_fields(self):
+        """It should get the signals with the requested fields only"""
+
+        for signal in SignalFactory.create_batch(3):
+            signal.insert()
+
+        url = GET_URL + "2?fields=rowid,ticker,order_status"
+        response = self.client.get(url, headers=self._get_headers())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = json.loads(response.get_data(as_text=True))
+        self.assertEqual(len(data["signals"]), 2)
+        for item in data["signals"]:
+            self.assertEqual(list(item), ["rowid", "ticker", "order_status"])
+        self.assertIsNotNone(data["next_cursor"])
+
+        # streamed
+        response = self.client.get(GET_URL + "0?fields=order_status", headers=self._get_headers())
+        data = json.loads(response.get_data(as_text=True))
+        self.assertEqual(len(data["signals"]), 3)
+        self.assertEqual(list(data["signals"][0]), ["order_status"])
+
+        # single item
+        item = SignalModel.get_rows("1")[0]
+        response = self.client.get(BASE_URL + "/" + str(item.rowid) + "?fields=slip")
+        self.assertEqual(json.loads(response.get_data(as_text=True)), {"slip": item.slip})
+
+        response = self.client.get(GET_URL + "2?fields=ticker,password")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        data = json.loads(response.get_data(as_text=True))
+        self.assertEqual(data["message"]["fields"], "unknown field(s): password.")
+
+    def test_get_signals_slip(self):
+        """It should get the slip statistics of a pair"""
+
+        for order_action, slip in (("buy", 1), ("buy", 3), ("sell", -2)):
+            signal = SignalFactory(
+                ticker1="C", ticker2="D", order_action=order_action, slip=slip
+            )
+            signal.insert()
+
+        response = self.client.get(GET_URL + "slip/C-D?start=2000-01-01")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = json.loads(response.get_data(as_text=True))
+        self.assertEqual(data["all"]["count"], 3)
+        self.assertEqual(data["all"]["min"], -2)
+        self.assertEqual(data["buy"]["avg"], 2)
+        self.assertAlmostEqual(data["buy"]["stddev"], 1.414214, places=5)
+        self.assertEqual(data["sell"]["count"], 1)
+        self.assertIsNone(data["sell"]["stddev"])
+
+        # no signals in the date range
+        response = self.client.get(GET_URL + "slip/C-D?end=2000-01-01 00:00:00")
+        data = json.loads(response.get_data(as_text=True))
+        self.assertEqual(data["all"]["count"], 0)
+        self.assertIsNone(data["all"]["avg"])
+
+        response = self.client.get(GET_URL + "slip/C-D?start=yesterday")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_get_signals_ticker(self):
         """It should get defined number of signals for a specific ticker"""
 
@@ -13,6 +13,8 @@ from flask_jwt_extended import create_access_token
 from services.resources import status_codes as status
 from services.models.tickers import TickerModel
 from services.models.pairs import PairModel
+from services.models.table_stamps import TABLE_STAMPS
+from services.models.table_versions import TableVersionModel
 from tests.factories import TickerFactory
 from tests.factories import PairFactory
 from services.resources.users import UserRegister
@@ -463,6 +465,97 @@ class TestTicker(unittest.TestCase):
         response = self.client.get(GET_URL + "0")
         self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    def test_get_tickers_pages(self):
+        """It should get the Tickers page by page"""
+
+        for ticker in TickerFactory.create_batch(3):
+            ticker.insert()
+
+        response = self.client.get(GET_URL + "0?limit=2")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = json.loads(response.get_data(as_text=True))
+        self.assertEqual(len(data["tickers"]), 2)
+
+        response = self.client.get(GET_URL + "2?before=" + str(data["next_cursor"]))
+        data = json.loads(response.get_data(as_text=True))
+        self.assertEqual(len(data["tickers"]), 1)
+        self.assertIsNone(data["next_cursor"])
+
+    def test_get_tickers_fields(self):
+        """It should get the Tickers with the requested fields only"""
+
+        test_ticker = TickerFactory()
+        test_ticker.insert()
+
+        response = self.client.get(GET_URL + "0?fields=symbol,active")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = json.loads(response.get_data(as_text=True))
+        self.assertEqual(
+            data["tickers"], [{"symbol": test_ticker.symbol, "active": test_ticker.active}]
+        )
+
+        response = self.client.get(BASE_URL + "/" + test_ticker.symbol + "?fields=currency")
+        self.assertEqual(
+            json.loads(response.get_data(as_text=True)), {"currency": test_ticker.currency}
+        )
+
+        response = self.client.get(GET_URL + "0?fields=rowid")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_get_tickers_not_modified(self):
+        """It should answer an unchanged poll with 304 Not Modified"""
+
+        test_ticker = TickerFactory()
+        test_ticker.insert()
+
+        response = self.client.get(GET_URL + "0")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response.headers["ETag"]
+        self.assertTrue(etag.startswith('W/"'))
+        self.assertIn("Last-Modified", response.headers)
+
+        response = self.client.get(GET_URL + "0", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.get_data(), b"")
+        self.assertEqual(response.headers["ETag"], etag)
+
+        # another page has another tag
+        response = self.client.get(GET_URL + "1", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # changed by an update
+        item = TickerModel.find_by_symbol(test_ticker.symbol)
+        item.active = not item.active
+        item.update(False)
+
+        response = self.client.get(GET_URL + "0", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+        # changed on another host: its stamp files are not the ones of this host
+        etag = response.headers["ETag"]
+        stamp = TABLE_STAMPS["tickers"].read()
+        active = not item.active
+        db.session.close()
+        table = TickerModel.__table__
+        with db.engine.begin() as connection:
+            connection.execute(
+                table.update()
+                .where(table.c.symbol == test_ticker.symbol)
+                .values(active=active)
+            )
+            TableVersionModel.bump(connection, ["tickers"])
+        self.assertEqual(TABLE_STAMPS["tickers"].read(), stamp)
+
+        response = self.client.get(GET_URL + "0", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+        # not found: no tag
+        response = self.client.get(BASE_URL + "/NOTFOUND")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertNotIn("ETag", response.headers)
+
     ### DELETE METHOD ###
 
     def test_delete_ticker(self):
@@ -241,6 +241,32 @@ class TestUser(unittest.TestCase):
     #     self.assertEqual(response.status_code, status.HTTP_200_OK)
     #     self.assertEqual(data["message"], "Successfully logged out")
 
+    def test_post_logout_session(self):
+        """It should end the session of the cookie on logout"""
+
+        UserRegister.default_users()
+        count = SessionModel.get_all().count()
+
+        response = self.client.post(
+            LOGIN_URL,
+            json={"username": "admin", "password": "password", "expire": 10},
+            content_type="application/json",
+        )
+        access_token = json.loads(response.get_data(as_text=True))["access_token"]
+
+        # looked up (& cached) by the demo pages
+        self.assertIsNotNone(SessionModel.find_active(access_token[-10:]))
+
+        self.client.set_cookie("localhost", "access_token", access_token)
+        response = self.client.post(
+            LOGOUT_URL, headers={"Authorization": "Bearer {}".format(access_token)}
+        )
+        self.client.delete_cookie("localhost", "access_token")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertIsNone(SessionModel.find_active(access_token[-10:]))
+        self.assertEqual(SessionModel.get_all().count(), count)
+
     def test_post_refresh_token(self):
         """It should refresh tokens"""
         UserRegister.default_users()